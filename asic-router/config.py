@@ -3,6 +3,39 @@ import colors
 # Cost for transitioning between layers
 VIA_COST = 2
 
+# Priority queue engine of the weighted routers: "heap", "bucket" or "radix".
+# The bucket and radix engines require integer costs (an integer VIA_COST).
+PRIORITY_QUEUE = "bucket"
+
+# Estimate of the A* based routers: "manhattan" (config.heuristic below),
+# "layer_stack", which also counts the vias forced by the layer orientations,
+# or "landmarks", which adds precomputed landmark distances for cluttered grids
+HEURISTIC = "layer_stack"
+
+# Weight of the A* estimate, above 1 trades path cost for speed: paths cost at
+# most ASTAR_WEIGHT times the optimum. With ASTAR_TIME_BUDGET seconds set, the
+# first path is improved further until the budget runs out (anytime A*).
+ASTAR_WEIGHT = 1.0
+ASTAR_TIME_BUDGET = None
+
+# Searches first run inside the bounding box of their pins grown by WINDOW_MARGIN
+# tiles. The margin is multiplied by WINDOW_GROWTH after each failed window, and
+# after WINDOW_ATTEMPTS windows the whole grid is searched. A WINDOW_MARGIN of
+# None searches the whole grid directly.
+WINDOW_MARGIN = 4
+WINDOW_GROWTH = 2
+WINDOW_ATTEMPTS = 3
+
+# Nodes kept by the route cache of each router, over all cached paths, before
+# the least recently used ones are dropped. None disables the cache.
+ROUTE_CACHE_NODES = 1_000_000
+
+# Search backend of the maze router: "bfs" (queue) or "lee" (NumPy wavefront)
+MAZE_BACKEND = "lee"
+
+# Side of a global routing cell (GCell), in tiles
+GCELL_SIZE = 5
+
 
 # Heuristic function for A*
 
@@ -33,6 +66,32 @@ TITLE = "Router"  # Title of the application window
 
 GRID_COLOR = (126, 126, 126)  # Color of the grid lines
 
+# Most redraws of the simulator window per second; searches shown live ask for
+# more and are coalesced. Slow frames are spaced further apart, so that drawing
+# takes at most RENDER_BUDGET of the time. A frame redraws only the changed
+# cells unless more than RENDER_FULL_REDRAW of the cells in view changed.
+RENDER_FPS = 60
+RENDER_BUDGET = 0.25
+RENDER_FULL_REDRAW = 0.25
+
+# Viewport of the simulator: tiles are drawn one by one, on the current layer
+# with the vias of the layers around it as hints, while they are at least
+# VIEW_DETAIL_CELL pixels wide; smaller, the layer is shown as a density
+# heatmap. The mouse wheel zooms by VIEW_ZOOM_STEP up to VIEW_MAX_CELL pixels.
+VIEW_DETAIL_CELL = 4
+VIEW_MAX_CELL = 64
+VIEW_ZOOM_STEP = 1.25
+VIEW_VIA_HINTS = True
+
+# Rendered texts of the simulator window kept for reuse, e.g. pin labels and
+# status messages
+TEXT_CACHE_SIZE = 256
+
+# Routes recorded in the simulator (R) are replayed at REPLAY_SPEED search
+# events per second; the left and right arrows seek by REPLAY_SEEK of the log
+REPLAY_SPEED = 2000
+REPLAY_SEEK = 0.1
+
 LAYERS = 5  # Number of layers in the grid
 
 # Cell Settings
@@ -1,6 +1,4 @@
 import colors
-import pygame
-from initializer import Initializer
 from enum import Enum
 
 class DrawableShape(Enum): 
@@ -157,18 +155,29 @@ class Drawable:
         """
         self.__height = val
 
-    def draw(self):
+    def draw(self, surface=None):
         """
         Draws the object as a rectangle on the screen using Pygame.
-        
+
+        Pygame is imported on first draw, so drawable objects can be used without a display.
+
+        Args:
+            surface (pygame.Surface, optional): The surface to draw on. Defaults to the window.
+
+        Returns:
+            pygame.Rect: The screen area drawn.
         """
+        import pygame
+        from initializer import Initializer
+
+        surface = surface or Initializer.win
         if self.__shape == DrawableShape.rect:
-            pygame.draw.rect(
-                Initializer.win, self.color, (self.x, self.y, self.width, self.height), border_radius=0
+            return pygame.draw.rect(
+                surface, self.color, (self.x, self.y, self.width, self.height), border_radius=0
             )
 
         elif self.__shape == DrawableShape.circle: 
             shift =8
-            pygame.draw.circle(Initializer.win , self.color ,(self.x + shift - 1, self.y + shift + 2) , shift - 2)
+            return pygame.draw.circle(surface , self.color ,(self.x + shift - 1, self.y + shift + 2) , shift - 2)
 
         
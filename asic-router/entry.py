@@ -1,7 +1,7 @@
 from initializer import Initializer
 from simulator import RouterSimulator
 from predefined_grids import CrossGrid
-from predefined_routers import AStarRouter, MazeRouter, DijkstraRouter
+from predefined_routers import AStarRouter, BidirectionalAStarRouter, JumpPointRouter, MazeRouter, DijkstraRouter
 
 
 def entry_point() -> None:
@@ -26,7 +26,12 @@ def entry_point() -> None:
     # Create a grid object for the simulation
     grid = CrossGrid()
 
-    # Choose a routing algorithm (A* Router used here by default)
+    # Choose a routing algorithm (A* Router used here by default, BidirectionalAStarRouter suits long nets,
+    # JumpPointRouter sparse designs)
+    # Multi-pin nets can use another tree engine, e.g. AStarRouter(grid, net_engine=OneSteinerEngine())
+    # and be confined to a global routing corridor, e.g. AStarRouter(grid, global_router=GlobalRouter(grid))
+    # The A* estimate is selectable per router, e.g. AStarRouter(grid, heuristic="manhattan")
+    # and AStarRouter(grid, weight=1.5, time_budget=0.1) trades path cost for speed (see AStarRouter.bound)
     router = AStarRouter(grid)
 
     # Create the router simulator with the grid and router
@@ -6,14 +6,16 @@ class RouteLoader:
     RouteLoader loads routes from a JSON file and validates them against grid constraints.
     """
 
-    def __init__(self, json_file):
+    def __init__(self, json_file, verbose=True):
         """
         Initializes the RouteLoader with a JSON file.
 
         Args:
             json_file (str): Path to the JSON file containing routes.
+            verbose (bool, optional): Whether to print the loaded routes. Defaults to True.
         """
         self.json_file = json_file
+        self.verbose = verbose
         self.__routes = self.__load_routes()
 
     @property
@@ -34,12 +36,14 @@ class RouteLoader:
         """
         with open(self.json_file, 'r') as file:
             routes = json.load(file)
-            print(routes)
+            if self.verbose:
+                print(routes)
         
         validated_routes = []
         for route in routes['routes']:
             for name ,values in route.items():
-                print(f"Working on route {name}")
+                if self.verbose:
+                    print(f"Working on route {name}")
                 current_point_route = []
                 for value in values:
                     point = list(value.values())
@@ -0,0 +1,288 @@
+import numpy as np
+
+import config
+from grid_model import LayerOrientation, TileState
+from priority_queues import make_priority_queue
+
+
+class GlobalRoute:
+    """
+    The coarse route of a net and the corridor it assigns to detailed routing.
+
+    Attributes:
+        gcells (list[int]): The coarse nodes of the route, (layer * gcell_rows + gcell_row) * gcell_cols + gcell_col.
+        corridor (np.ndarray): Flat boolean mask over the fine grid, True on the tiles detailed routing may use.
+        complete (bool): Whether every pin was reached on the coarse grid.
+    """
+
+    def __init__(self, gcells: list[int], corridor: np.ndarray, complete: bool) -> None:
+        self.gcells = gcells
+        self.corridor = corridor
+        self.complete = complete
+
+    def __repr__(self):
+        return f"GlobalRoute(gcells={len(self.gcells)}, tiles={int(self.corridor.sum())}, complete={self.complete})"
+
+
+class GlobalRouter:
+    """
+    Coarse global router over GCells, square blocks of gcell_size x gcell_size tiles.
+
+    Every GCell of every layer has a capacity, the number of free tiles it holds
+    divided by the GCell size, i.e. roughly the free tracks crossing it. A net is
+    routed on the coarse grid with the layer orientation rules of the fine grid;
+    a GCell step costs gcell_size, a via VIA_COST, and entering a GCell that is
+    already at capacity adds congestion_penalty * gcell_size per extra net.
+    The corridor of a net is the footprint of its GCells, grown by margin
+    GCells and opened on all layers, so pins and vias stay reachable.
+
+    Attributes:
+        capacity (np.ndarray): Capacity of each GCell, shape (layers, gcell_rows, gcell_cols).
+        usage (np.ndarray): Number of planned nets in each GCell, same shape.
+    """
+
+    def __init__(self, grid, gcell_size: int = None, margin: int = 1, congestion_penalty: int = 4) -> None:
+        """
+        Initializes the global router and measures the GCell capacities.
+
+        Args:
+            grid (Grid): The fine routing grid.
+            gcell_size (int, optional): Tiles per GCell side. Defaults to config.GCELL_SIZE.
+            margin (int, optional): GCells added around a route for its corridor. Defaults to 1.
+            congestion_penalty (int, optional): Extra cost per net above capacity, in GCell steps. Defaults to 4.
+        """
+        model = grid.model
+        self.__grid = grid
+        self.__size = gcell_size or config.GCELL_SIZE
+        self.__margin = margin
+        self.__penalty = congestion_penalty * self.__size
+        self.__rows = -(-model.rows // self.__size)
+        self.__cols = -(-model.cols // self.__size)
+        self.__layers = model.layer_count
+
+        shape = (self.__layers, self.__rows, self.__cols)
+        self.__capacity = np.zeros(shape, dtype=np.int32)
+        self.__free = np.zeros(shape, dtype=np.int32)
+        self.__usage = np.zeros(shape, dtype=np.int32)
+        self.update_capacity()
+
+    @property
+    def gcell_size(self) -> int:
+        """
+        Returns the number of tiles per GCell side.
+        """
+        return self.__size
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        """
+        Returns the (layers, gcell_rows, gcell_cols) shape of the coarse grid.
+        """
+        return self.__layers, self.__rows, self.__cols
+
+    @property
+    def capacity(self) -> np.ndarray:
+        """
+        Returns the capacity of each GCell.
+        """
+        return self.__capacity
+
+    @property
+    def usage(self) -> np.ndarray:
+        """
+        Returns the number of planned nets in each GCell.
+        """
+        return self.__usage
+
+    def update_capacity(self):
+        """
+        Measures the GCell capacities again from the barriers of the fine grid.
+        """
+        model = self.__grid.model
+        size = self.__size
+        free = model.states != TileState.barrier.value
+
+        # Pad the grid to whole GCells, padding tiles count as blocked
+        padded = np.zeros((self.__layers, self.__rows * size, self.__cols * size), dtype=np.int32)
+        padded[:, :model.rows, :model.cols] = free
+        self.__free[:] = padded.reshape(self.__layers, self.__rows, size, self.__cols, size).sum(axis=(2, 4))
+        self.__capacity[:] = self.__free // size
+
+    def gcell(self, node: int) -> int:
+        """
+        Returns the coarse node holding a fine grid node.
+
+        Args:
+            node (int): The fine node id.
+
+        Returns:
+            int: The coarse node id.
+        """
+        row, col, layer = self.__grid.model.position(node)
+        return (layer * self.__rows + row // self.__size) * self.__cols + col // self.__size
+
+    def overflow(self) -> int:
+        """
+        Returns the total number of nets planned above the GCell capacities.
+        """
+        return int(np.maximum(self.__usage - self.__capacity, 0).sum())
+
+    def congestion(self) -> np.ndarray:
+        """
+        Returns the usage to capacity ratio of each GCell, infinite where a used GCell has no capacity.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = self.__usage / self.__capacity
+        ratio[self.__usage == 0] = 0
+        return ratio
+
+    def __neighbors(self, gcell: int) -> list[tuple[int, int]]:
+        """
+        Returns the coarse neighbors of a GCell and the cost of the move.
+
+        Args:
+            gcell (int): The coarse node id.
+
+        Returns:
+            list[tuple[int, int]]: The (neighbor, step cost) pairs.
+        """
+        rows, cols, size = self.__rows, self.__cols, self.__size
+        layer, rest = divmod(gcell, rows * cols)
+        row, col = divmod(rest, cols)
+        orientation = self.__grid.model.orientations[layer]
+        result = []
+
+        if orientation != LayerOrientation.vertical.value:
+            if col < cols - 1:
+                result.append((gcell + 1, size))
+            if col > 0:
+                result.append((gcell - 1, size))
+        if orientation != LayerOrientation.horizontal.value:
+            if row < rows - 1:
+                result.append((gcell + cols, size))
+            if row > 0:
+                result.append((gcell - cols, size))
+
+        if layer < self.__layers - 1:
+            result.append((gcell + rows * cols, config.VIA_COST))
+        if layer > 0:
+            result.append((gcell - rows * cols, config.VIA_COST))
+        return result
+
+    def __search(self, sources: set[int], targets: set[int]) -> list[int]:
+        """
+        Finds the cheapest coarse path from a set of GCells to the closest target GCell.
+
+        Args:
+            sources (set[int]): The coarse nodes of the partial tree.
+            targets (set[int]): The coarse nodes still to connect.
+
+        Returns:
+            list[int]: The coarse path, or an empty list if no target can be reached.
+        """
+        free = self.__free.reshape(-1)
+        usage = self.__usage.reshape(-1)
+        capacity = self.__capacity.reshape(-1)
+        penalty = self.__penalty
+
+        cost = dict.fromkeys(sources, 0)
+        parent = {}
+        queue = make_priority_queue(config.PRIORITY_QUEUE)
+        for gcell in sources:
+            queue.push(0, gcell)
+
+        while queue:
+            current_cost, current = queue.pop()
+            if current_cost != cost[current]:
+                continue
+            if current in targets:
+                path = [current]
+                while path[-1] in parent:
+                    path.append(parent[path[-1]])
+                path.reverse()
+                return path
+
+            for n, step in self.__neighbors(current):
+                # A GCell without any free tile cannot be crossed
+                if not free[n] and n not in targets:
+                    continue
+                new_cost = current_cost + step
+                excess = usage[n] + 1 - capacity[n]
+                if excess > 0:
+                    new_cost += penalty * excess
+                if new_cost < cost.get(n, new_cost + 1):
+                    cost[n] = new_cost
+                    parent[n] = current
+                    queue.push(new_cost, n)
+
+        return []
+
+    def route_net(self, source: int, sinks: list[int]) -> GlobalRoute:
+        """
+        Plans a net on the coarse grid and books its GCells.
+
+        Sinks are connected closest first, each by a search seeded with the whole coarse tree.
+
+        Args:
+            source (int): The fine node id of the net driver.
+            sinks (list[int]): The fine node ids of the net loads.
+
+        Returns:
+            GlobalRoute: The coarse route and its corridor.
+        """
+        tree = {self.gcell(source)}
+        remaining = {self.gcell(sink) for sink in sinks} - tree
+        complete = True
+        while remaining:
+            path = self.__search(tree, remaining)
+            if not path:
+                complete = False
+                break
+            tree.update(path)
+            remaining.difference_update(path)
+
+        gcells = sorted(tree)
+        np.add.at(self.__usage.reshape(-1), gcells, 1)
+        return GlobalRoute(gcells, self.corridor(gcells), complete)
+
+    def release(self, route: GlobalRoute):
+        """
+        Returns the GCells booked by a route.
+
+        Args:
+            route (GlobalRoute): A route returned by route_net.
+        """
+        np.subtract.at(self.__usage.reshape(-1), route.gcells, 1)
+
+    def plan(self, nets: list) -> list[GlobalRoute]:
+        """
+        Plans a whole netlist, in order, so that its congestion is known before detailed routing.
+
+        Args:
+            nets (list[tuple[int, list[int]]]): The (source, sinks) node ids of every net.
+
+        Returns:
+            list[GlobalRoute]: The route of every net.
+        """
+        return [self.route_net(source, sinks) for source, sinks in nets]
+
+    def corridor(self, gcells: list[int]) -> np.ndarray:
+        """
+        Builds the fine grid mask of a set of GCells.
+
+        Args:
+            gcells (list[int]): Coarse node ids.
+
+        Returns:
+            np.ndarray: Flat boolean mask, True on every layer of the GCells and of their margin.
+        """
+        model = self.__grid.model
+        size, margin = self.__size, self.__margin
+
+        footprint = np.zeros((self.__rows, self.__cols), dtype=bool)
+        for gcell in gcells:
+            row, col = divmod(gcell % (self.__rows * self.__cols), self.__cols)
+            footprint[max(0, row - margin):row + margin + 1, max(0, col - margin):col + margin + 1] = True
+
+        tiles = np.repeat(np.repeat(footprint, size, axis=0), size, axis=1)[:model.rows, :model.cols]
+        return np.broadcast_to(tiles, (self.__layers, model.rows, model.cols)).reshape(-1).copy()
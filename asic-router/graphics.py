@@ -1,7 +1,4 @@
-
-
 import colors
-from config import WIDTH
 import config
 from initializer import Initializer
 import pygame 
@@ -13,12 +10,19 @@ class Graphics:
     # Must be initialized 
     update = None
 
+    # Font of every text drawn in the window
+    FONT = "Arial"
+
+    # Fonts by size and rendered texts by (text, size, antialias, color), shared by all drawings
+    __fonts: dict[int, pygame.font.Font] = {}
+    __texts: dict[tuple, pygame.Surface] = {}
+
 
     @staticmethod 
     def line(s  , e  , mili_sec_delay = 1 , color = 255) -> None:
         x_s , y_s= s.get_cordinates() 
         x_e , y_e= e.get_cordinates()
-        shift = WIDTH / 2
+        shift = s.width / 2
         win = Initializer.win
         pygame.draw.line(win , (color if color <= 255 else 255 , 0 , 0) , (x_s + shift , y_s  + shift), (x_e + shift , y_e + shift) , config.LINE_WIDTH) 
         pygame.display.update()
@@ -30,11 +34,53 @@ class Graphics:
             tile.make_path() 
 
 
+    @staticmethod
+    def font(size: int) -> pygame.font.Font:
+        """
+        Returns the font of a size, looking it up on the system only the first time.
+
+        Args:
+            size (int): The font size.
+
+        Returns:
+            pygame.font.Font: The font.
+        """
+        font = Graphics.__fonts.get(size)
+        if font is None:
+            font = Graphics.__fonts[size] = pygame.font.SysFont(Graphics.FONT, size)
+        return font
+
+    @staticmethod
+    def text(s: str, font_size: int = 12, antialias: bool = True, color=colors.RED) -> pygame.Surface:
+        """
+        Returns a rendered text, rendering it only the first time it is asked for.
+
+        Texts are kept until config.TEXT_CACHE_SIZE of them are cached, then
+        the oldest ones are dropped.
+
+        Args:
+            s (str): The text.
+            font_size (int, optional): The font size. Defaults to 12.
+            antialias (bool, optional): Whether the text is antialiased. Defaults to True.
+            color (tuple[int, int, int], optional): The text color. Defaults to colors.RED.
+
+        Returns:
+            pygame.Surface: The rendered text, which must not be drawn on.
+        """
+        key = (s, font_size, antialias, color)
+        texts = Graphics.__texts
+        text = texts.get(key)
+        if text is None:
+            text = Graphics.font(font_size).render(s, antialias, color)
+            if len(texts) >= config.TEXT_CACHE_SIZE:
+                del texts[next(iter(texts))]
+            texts[key] = text
+        return text
+
     @staticmethod 
 
-    def draw_text(s : str , x : int , y : int , font_size = 12): 
-        font = pygame.font.SysFont("Arial", font_size)
-        text = font.render(s , True , colors.RED)
+    def draw_text(s : str , x : int , y : int , font_size = 12, antialias = True, surface = None): 
+        text = Graphics.text(s, font_size, antialias)
         w , h = text.get_size() 
-        Initializer.win.blit(text , (x , y - h //2 ))
+        return (surface or Initializer.win).blit(text , (x , y - h //2 ))
 
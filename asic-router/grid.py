@@ -1,4 +1,7 @@
+import numpy as np
+
 from drawable import Drawable
+from grid_model import GridModel
 from tile import Tile, LayerOrientation, TileState, TileType, Layer
 from config import ROWS, WIDTH, LAYERS
 
@@ -6,16 +9,32 @@ class Grid(Drawable):
     """
     Represents a grid structure composed of multiple layers of tiles.
 
+    The routing data lives in a GridModel; Tile objects are only created as
+    short lived views when a tile has to be drawn or handed to the UI.
+
+    The structural adjacency is built once, in compressed sparse row form: the
+    neighbors of node n are indices[offsets[n]:offsets[n + 1]]. Barriers are
+    not taken out of it, searches test the state of a neighbor when they reach
+    it, so a barrier change costs nothing and no per node object is kept.
+
     Attributes:
-        _grid (list[list[list[Tile]]]): The 3D grid containing layers of tiles.
+        _model (GridModel): The array-backed storage of the grid tiles.
+        _offsets (np.ndarray): CSR row offsets, one per node plus one.
+        _indices (np.ndarray): CSR neighbor node ids.
     """
 
     def __init__(self):
         """
         Initializes a Grid object.
         """
-        self._grid: list[list[list[Tile]]] = []
+        self._model: GridModel = None
         self.build_grid()
+        offsets, indices = self.build_adjacency()
+        # 32 bit ids halve the adjacency of large grids
+        self._offsets = offsets.astype(np.int32 if len(indices) <= np.iinfo(np.int32).max else np.int64, copy=False)
+        self._indices = indices.astype(np.int32 if self._model.size <= np.iinfo(np.int32).max else np.int64, copy=False)
+        self.__offset_view = memoryview(self._offsets)
+        self.__index_view = memoryview(self._indices)
 
     def build_grid(self):
         """
@@ -26,45 +45,153 @@ class Grid(Drawable):
         """
         raise NotImplementedError
 
-    def update_tile_neighbors(self, tile):
+    def build_adjacency(self) -> tuple[np.ndarray, np.ndarray]:
         """
-        Updates the neighbors of a given tile. Must be implemented in subclasses.
+        Builds the structural adjacency of the grid, barriers ignored. Must be implemented in subclasses.
 
-        Args:
-            tile (Tile): The tile whose neighbors are to be updated.
+        Every edge must be listed in both directions.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The CSR offsets and indices arrays.
 
         Raises:
             NotImplementedError: If not implemented in a subclass.
         """
         raise NotImplementedError
 
-    def layers(self):
+    @property
+    def offsets(self) -> np.ndarray:
+        """
+        Returns the CSR row offsets of the adjacency.
         """
-        Returns the grid layers.
+        return self._offsets
+
+    @property
+    def indices(self) -> np.ndarray:
+        """
+        Returns the CSR neighbor node ids of the adjacency.
+        """
+        return self._indices
+
+    def neighbors(self, node: int) -> memoryview:
+        """
+        Returns the nodes adjacent to a node, barriers included.
+
+        Searches skip the neighbors whose state is BARRIER. The returned view
+        shares the memory of the adjacency and iterates as Python ints.
+
+        Args:
+            node (int): The node id whose neighbors are requested.
 
         Returns:
-            list[list[list[Tile]]]: The grid layers.
+            memoryview: The node ids of the neighbors.
+        """
+        offsets = self.__offset_view
+        return self.__index_view[offsets[node]:offsets[node + 1]]
+
+    def refresh_adjacency(self):
+        """
+        Recomputes the barrier hash of the model from the tile states.
+
+        Needed after barriers were written straight into the model's states array.
+        The adjacency itself does not depend on the barriers.
         """
-        return self._grid
+        self._model.rehash()
 
-    def idlize_tiles(self):
+    @property
+    def model(self) -> GridModel:
         """
-        Sets tiles in the grid to an idle state if they are open or closed.
+        Returns the array-backed model of the grid.
+
+        Returns:
+            GridModel: The grid model.
+        """
+        return self._model
+
+    def tile(self, row: int, col: int, layer: int, viewport=None) -> Tile:
         """
-        for grid_layer in self._grid:
-            for row in grid_layer:
-                for tile in row:
-                    if tile.state == TileState.closed or tile.state == TileState.open :
-                        tile.set_idle_state()
-                    elif tile.state == TileState.end or tile.state == TileState.start: 
-                        pass 
+        Returns a view of the tile at the given position.
 
+        Args:
+            row (int): The row index of the tile.
+            col (int): The column index of the tile.
+            layer (int): The layer index of the tile.
+            viewport (Viewport, optional): The view the tile is drawn in. Defaults to WIDTH wide tiles
+                from the window origin.
 
-    def draw(self):
+        Returns:
+            Tile: A view of the requested tile.
         """
-        Draws all tiles in the grid.
+        if viewport is None:
+            return Tile(self._model, row, col, self._model.layer(layer), WIDTH)
+        return Tile(self._model, row, col, self._model.layer(layer), int(viewport.cell), origin=(viewport.x, viewport.y))
+
+    def tile_at(self, node: int, viewport=None) -> Tile:
+        """
+        Returns a view of the tile with the given node id.
+
+        Args:
+            node (int): The node id.
+            viewport (Viewport, optional): The view the tile is drawn in. Defaults to WIDTH wide tiles
+                from the window origin.
+
+        Returns:
+            Tile: A view of the requested tile.
+        """
+        row, col, layer = self._model.position(node)
+        return self.tile(row, col, layer, viewport)
+
+    def draw(self) -> list:
+        """
+        Draws all visible tiles in the grid, pins last so their labels stay on top.
+
+        Returns:
+            list[pygame.Rect]: The screen areas covered by the pins.
+        """
+        self.draw_tiles()
+        return self.draw_pins()
+
+    def draw_tiles(self, nodes: np.ndarray = None, surface=None, viewport=None):
+        """
+        Draws the visible tiles other than pins.
+
+        Idle metal tiles without a color are invisible, so only colored tiles,
+        vias and contacts are turned into views.
+
+        Args:
+            nodes (np.ndarray, optional): The node ids of the tiles to draw. Defaults to all tiles.
+            surface (pygame.Surface, optional): The surface to draw on. Defaults to the window.
+            viewport (Viewport, optional): The view the tiles are drawn in. Defaults to WIDTH wide tiles.
+        """
+        model = self._model
+        if nodes is None:
+            nodes = np.arange(model.size, dtype=np.int64)
+        states = model.states.reshape(-1)[nodes]
+        visible = (model.paint.reshape(-1)[nodes] != 0) | (model.types.reshape(-1)[nodes] != TileType.metal.value)
+        visible &= (states != TileState.start.value) & (states != TileState.end.value)
+        for node in nodes[visible].tolist():
+            self.tile_at(node, viewport).draw(surface)
+
+    def draw_pins(self, nodes: np.ndarray = None, surface=None, viewport=None) -> list:
+        """
+        Draws the start and end tiles with their labels.
+
+        Args:
+            nodes (np.ndarray, optional): The node ids of the tiles to look for pins in. Defaults to all tiles.
+            surface (pygame.Surface, optional): The surface to draw on. Defaults to the window.
+            viewport (Viewport, optional): The view the pins are drawn in. Defaults to WIDTH wide tiles.
+
+        Returns:
+            list[pygame.Rect]: The screen areas covered by the pins.
         """
-        for grid_layer in self._grid:
-            for row in grid_layer:
-                for tile in row:
-                    tile.draw()
+        model = self._model
+        if nodes is None:
+            nodes = np.arange(model.size, dtype=np.int64)
+        states = model.states.reshape(-1)[nodes]
+        pins = (states == TileState.start.value) | (states == TileState.end.value)
+        rects = []
+        for node in nodes[pins].tolist():
+            rect = self.tile_at(node, viewport).draw(surface)
+            if rect is not None:
+                rects.append(rect)
+        return rects
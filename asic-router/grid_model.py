@@ -0,0 +1,467 @@
+from enum import Enum
+
+import numpy as np
+
+
+class LayerOrientation(Enum):
+    """
+    Enum representing the orientation of a layer in the grid.
+
+    Attributes:
+        horizontal (int): Indicates a horizontal layer orientation.
+        vertical (int): Indicates a vertical layer orientation.
+        both (int): Indicates a layer that can route a net in both orientations horizontal and vertical.
+    """
+    horizontal = 0
+    vertical = 1
+    both = 2
+
+
+class TileState(Enum):
+    """
+    Enum representing the various states a tile can have.
+
+    Attributes:
+        idle (int): Represents a tile in an idle state.
+        closed (int): Represents a tile that is closed.
+        open (int): Represents a tile that is open.
+        barrier (int): Represents a tile that is a barrier.
+        start (int): Represents a tile designated as the start of a route.
+        end (int): Represents a tile designated as the end of a route.
+    """
+    idle = 0
+    closed = 1
+    open = 2
+    barrier = 3
+    start = 4
+    end = 5
+
+
+class TileType(Enum):
+    """
+    Enum representing the different types of tiles.
+
+    Attributes:
+        via (int): Represents a via tile.
+        metal (int): Represents a metal tile.
+        contact (int): Represents a contact tile.
+    """
+    via = 0
+    metal = 1
+    contact = 2
+
+
+class Layer:
+    """
+    A class representing a layer in the grid.
+
+    Attributes:
+        index (int): The index of the layer.
+        orientation (LayerOrientation): The orientation of the layer (horizontal/vertical).
+    """
+
+    def __init__(self, index, orientation) -> None:
+        """
+        Initializes the Layer with the given index and orientation.
+
+        Args:
+            index (int): The index of the layer.
+            orientation (LayerOrientation): The orientation of the layer.
+        """
+        self.__index = index
+        self.__orientation = orientation
+
+    @property
+    def index(self):
+        """
+        Returns the index of the layer.
+        """
+        return self.__index
+
+    @property
+    def orientation(self):
+        """
+        Returns the orientation of the layer.
+        """
+        return self.__orientation
+
+
+# Owner value of a tile that does not belong to any net
+NO_NET = -1
+
+# Raw state value of a barrier tile, for comparisons against the state arrays
+BARRIER = TileState.barrier.value
+
+
+class GridModel:
+    """
+    Compact, array-backed storage for a layered routing grid.
+
+    Every per-tile attribute lives in a NumPy array of shape (layers, rows, cols).
+    Routers address tiles through a flat integer node id,
+    node = (layer * rows + row) * cols + col, and read the arrays through
+    one dimensional memoryviews, which keeps the hot loops free of Python objects.
+
+    Attributes:
+        states (np.ndarray): TileState value of each tile.
+        types (np.ndarray): TileType value of each tile.
+        owners (np.ndarray): Net id owning each tile, NO_NET if unowned.
+        paint (np.ndarray): Palette index of each tile's display color, 0 if uncolored.
+        orientations (np.ndarray): LayerOrientation value of each layer.
+        version (int): Counter of the barrier changes, with a journal of the recently changed nodes.
+        barrier_hash (int): Zobrist hash of the set of barrier tiles, equal for equal obstacle maps.
+    """
+
+    # Barrier changes kept in the journal, older ones are forgotten
+    JOURNAL_LIMIT = 1 << 16
+
+    def __init__(self, rows: int, cols: int, layers: list[Layer]) -> None:
+        """
+        Allocates the tile arrays for the given grid dimensions.
+
+        Args:
+            rows (int): The number of rows in each layer.
+            cols (int): The number of columns in each layer.
+            layers (list[Layer]): The layers of the grid, ordered by index.
+        """
+        self.__rows = rows
+        self.__cols = cols
+        self.__layers = layers
+        self.__layer_size = rows * cols
+        self.__size = len(layers) * rows * cols
+
+        shape = (len(layers), rows, cols)
+        self.__states = np.full(shape, TileState.idle.value, dtype=np.uint8)
+        self.__types = np.full(shape, TileType.metal.value, dtype=np.uint8)
+        self.__owners = np.full(shape, NO_NET, dtype=np.int32)
+        self.__paint = np.zeros(shape, dtype=np.uint8)
+        self.__orientations = np.array([layer.orientation.value for layer in layers], dtype=np.uint8)
+
+        self.__state_view = memoryview(self.__states.reshape(-1))
+        self.__type_view = memoryview(self.__types.reshape(-1))
+        self.__owner_view = memoryview(self.__owners.reshape(-1))
+        self.__paint_view = memoryview(self.__paint.reshape(-1))
+
+        # Palette index 0 is reserved for "no color"
+        self.__palette: list = [None]
+        self.__palette_index: dict = {}
+        self.__next_net = 0
+        self.__barrier_listeners = []
+
+        # A random key per node, the barrier hash is the XOR of the keys of all barriers
+        self.__zobrist = np.random.default_rng(0).integers(0, 1 << 63, self.__size, dtype=np.int64)
+        self.__zobrist_view = memoryview(self.__zobrist)
+        self.__barrier_hash = 0
+        self.__journal: list[int] = []
+        self.__journal_start = 0
+
+    @property
+    def rows(self) -> int:
+        """
+        Returns the number of rows in each layer.
+        """
+        return self.__rows
+
+    @property
+    def cols(self) -> int:
+        """
+        Returns the number of columns in each layer.
+        """
+        return self.__cols
+
+    @property
+    def layer_count(self) -> int:
+        """
+        Returns the number of layers.
+        """
+        return len(self.__layers)
+
+    @property
+    def layer_size(self) -> int:
+        """
+        Returns the number of tiles in a single layer.
+        """
+        return self.__layer_size
+
+    @property
+    def size(self) -> int:
+        """
+        Returns the total number of tiles in the grid.
+        """
+        return self.__size
+
+    @property
+    def states(self) -> np.ndarray:
+        """
+        Returns the TileState values of all tiles, shaped (layers, rows, cols).
+        """
+        return self.__states
+
+    @property
+    def types(self) -> np.ndarray:
+        """
+        Returns the TileType values of all tiles, shaped (layers, rows, cols).
+        """
+        return self.__types
+
+    @property
+    def owners(self) -> np.ndarray:
+        """
+        Returns the owning net id of all tiles, shaped (layers, rows, cols).
+        """
+        return self.__owners
+
+    @property
+    def paint(self) -> np.ndarray:
+        """
+        Returns the palette index of all tiles, shaped (layers, rows, cols).
+        """
+        return self.__paint
+
+    @property
+    def orientations(self) -> np.ndarray:
+        """
+        Returns the LayerOrientation value of every layer.
+        """
+        return self.__orientations
+
+    @property
+    def state_view(self) -> memoryview:
+        """
+        Returns a flat memoryview over the tile states, indexed by node id.
+        """
+        return self.__state_view
+
+    @property
+    def type_view(self) -> memoryview:
+        """
+        Returns a flat memoryview over the tile types, indexed by node id.
+        """
+        return self.__type_view
+
+    @property
+    def owner_view(self) -> memoryview:
+        """
+        Returns a flat memoryview over the tile owners, indexed by node id.
+        """
+        return self.__owner_view
+
+    def layer(self, index: int) -> Layer:
+        """
+        Returns the layer with the given index.
+
+        Args:
+            index (int): The index of the layer.
+
+        Returns:
+            Layer: The requested layer.
+        """
+        return self.__layers[index]
+
+    def layers(self) -> list[Layer]:
+        """
+        Returns all layers of the grid.
+
+        Returns:
+            list[Layer]: The layers, ordered by index.
+        """
+        return self.__layers
+
+    def index(self, row: int, col: int, layer: int) -> int:
+        """
+        Converts a tile position into its node id.
+
+        Args:
+            row (int): The row index of the tile.
+            col (int): The column index of the tile.
+            layer (int): The layer index of the tile.
+
+        Returns:
+            int: The node id.
+        """
+        return (layer * self.__rows + row) * self.__cols + col
+
+    def position(self, node: int) -> tuple[int, int, int]:
+        """
+        Converts a node id back into a tile position.
+
+        Args:
+            node (int): The node id.
+
+        Returns:
+            tuple[int, int, int]: The (row, col, layer_index) of the tile.
+        """
+        layer, rest = divmod(node, self.__layer_size)
+        row, col = divmod(rest, self.__cols)
+        return row, col, layer
+
+    def layer_index(self, node: int) -> int:
+        """
+        Returns the layer index of a node.
+
+        Args:
+            node (int): The node id.
+
+        Returns:
+            int: The layer index.
+        """
+        return node // self.__layer_size
+
+    def get_state(self, node: int) -> TileState:
+        """
+        Returns the state of a node.
+        """
+        return TileState(self.__state_view[node])
+
+    def set_state(self, node: int, state: TileState) -> None:
+        """
+        Sets the state of a node.
+
+        Barrier listeners are notified when the node becomes or stops being a barrier.
+        """
+        view = self.__state_view
+        was_blocked = view[node] == BARRIER
+        view[node] = state.value
+        blocked = state is TileState.barrier
+        if blocked != was_blocked:
+            self.__barrier_hash ^= self.__zobrist_view[node]
+            journal = self.__journal
+            journal.append(node)
+            if len(journal) > GridModel.JOURNAL_LIMIT:
+                dropped = len(journal) // 2
+                del journal[:dropped]
+                self.__journal_start += dropped
+            for listener in self.__barrier_listeners:
+                listener(node, blocked)
+
+    @property
+    def version(self) -> int:
+        """
+        Returns the barrier version, advanced by every barrier change.
+        """
+        return self.__journal_start + len(self.__journal)
+
+    @property
+    def barrier_hash(self) -> int:
+        """
+        Returns the Zobrist hash of the barrier tiles, which only depends on which tiles are barriers.
+        """
+        return self.__barrier_hash
+
+    def changes_since(self, version: int):
+        """
+        Returns the nodes whose barrier state changed since a version.
+
+        Args:
+            version (int): A version returned by the version property.
+
+        Returns:
+            np.ndarray | None: The changed node ids, possibly repeated, or None if the
+                journal no longer reaches back to that version.
+        """
+        if version < self.__journal_start:
+            return None
+        return np.array(self.__journal[version - self.__journal_start:], dtype=np.int64)
+
+    def rehash(self) -> None:
+        """
+        Recomputes the barrier hash from the states array and starts a new journal.
+
+        Needed after barriers were written straight into the states array.
+        """
+        blocked = self.__states.reshape(-1) == BARRIER
+        self.__barrier_hash = int(np.bitwise_xor.reduce(self.__zobrist[blocked])) if blocked.any() else 0
+        self.__journal_start = self.version + 1
+        self.__journal = []
+
+    def add_barrier_listener(self, listener) -> None:
+        """
+        Registers a callback for barrier changes made through set_state.
+
+        Writes straight into the states array are not reported.
+
+        Args:
+            listener (Callable[[int, bool], None]): Called with the node id and whether it is now a barrier.
+        """
+        self.__barrier_listeners.append(listener)
+
+    def get_type(self, node: int) -> TileType:
+        """
+        Returns the type of a node.
+        """
+        return TileType(self.__type_view[node])
+
+    def set_type(self, node: int, t: TileType) -> None:
+        """
+        Sets the type of a node.
+        """
+        self.__type_view[node] = t.value
+
+    def get_owner(self, node: int) -> int:
+        """
+        Returns the net id owning a node, NO_NET if unowned.
+        """
+        return self.__owner_view[node]
+
+    def set_owner(self, node: int, net: int) -> None:
+        """
+        Sets the net id owning a node.
+        """
+        self.__owner_view[node] = net
+
+    def get_color(self, node: int):
+        """
+        Returns the display color of a node.
+
+        Args:
+            node (int): The node id.
+
+        Returns:
+            tuple[int, int, int] | None: The RGB color, or None if the tile is uncolored.
+        """
+        return self.__palette[self.__paint_view[node]]
+
+    def set_color(self, node: int, color) -> None:
+        """
+        Sets the display color of a node.
+
+        Colors are interned in a small palette so the grid only stores one byte per tile.
+
+        Args:
+            node (int): The node id.
+            color (tuple[int, int, int] | None): The RGB color, or None to clear it.
+        """
+        self.__paint_view[node] = self.color_index(color)
+
+    def color_index(self, color) -> int:
+        """
+        Returns the palette index of a color, adding it to the palette if needed.
+
+        Args:
+            color (tuple[int, int, int] | None): The RGB color.
+
+        Returns:
+            int: The palette index, 0 for None.
+        """
+        if color is None:
+            return 0
+        color = tuple(color)
+        index = self.__palette_index.get(color)
+        if index is None:
+            index = len(self.__palette)
+            if index > np.iinfo(np.uint8).max:
+                raise ValueError("Grid color palette is full")
+            self.__palette.append(color)
+            self.__palette_index[color] = index
+        return index
+
+    def new_net(self) -> int:
+        """
+        Allocates a new net id.
+
+        Returns:
+            int: The new net id.
+        """
+        net = self.__next_net
+        self.__next_net += 1
+        return net
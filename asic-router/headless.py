@@ -0,0 +1,196 @@
+"""
+Headless batch routing of a JSON netlist, without pygame or PyQt.
+
+Usage:
+    python headless.py predefined_routes/route_2.json --router astar --output routed.json
+"""
+import argparse
+import json
+import sys
+import time
+
+import config
+from from_json import RouteLoader
+from grid_model import NO_NET, TileState
+from negotiated_router import NegotiatedCongestionRouter
+from net_engines import OneSteinerEngine, PrimDijkstraEngine, SequentialNetEngine
+from parallel_router import ParallelNetRouter
+from predefined_grids import CrossGrid
+from predefined_routers import AStarRouter, BidirectionalAStarRouter, DijkstraRouter, JumpPointRouter, MazeRouter
+
+
+# Routers selectable by name
+ROUTERS = {
+    "astar": AStarRouter,
+    "bidirectional": BidirectionalAStarRouter,
+    "jps": JumpPointRouter,
+    "dijkstra": DijkstraRouter,
+    "maze": MazeRouter,
+}
+
+# Net engines selectable by name
+NET_ENGINES = {
+    "sequential": SequentialNetEngine,
+    "prim": PrimDijkstraEngine,
+    "steiner": OneSteinerEngine,
+}
+
+# How the nets of a netlist are routed: one after the other, with negotiated congestion or in parallel batches
+MODES = ("sequential", "negotiated", "parallel")
+
+
+def make_router(grid, router: str = "astar", net_engine: str = "sequential", heuristic: str = None):
+    """
+    Creates a router that neither draws nor paints the grid.
+
+    Args:
+        grid (Grid): The grid to route on.
+        router (str, optional): The router name from ROUTERS. Defaults to "astar".
+        net_engine (str, optional): The net engine name from NET_ENGINES. Defaults to "sequential".
+        heuristic (str, optional): The heuristic name of the A* based routers. Defaults to config.HEURISTIC.
+
+    Returns:
+        Router: The router.
+
+    Raises:
+        ValueError: If a name is unknown.
+    """
+    if router not in ROUTERS:
+        raise ValueError(f"Unknown router '{router}', expected one of {list(ROUTERS)}")
+    if net_engine not in NET_ENGINES:
+        raise ValueError(f"Unknown net engine '{net_engine}', expected one of {list(NET_ENGINES)}")
+    instance = ROUTERS[router](grid, net_engine=NET_ENGINES[net_engine](), heuristic=heuristic)
+    instance.set_observer(None)
+    instance.disable_graphics_updates()
+    return instance
+
+
+def route_netlist(routes: list, router, mode: str = "sequential", workers: int = None) -> dict:
+    """
+    Routes a netlist and reports the result.
+
+    Args:
+        routes (list[list[list[int]]]): The pins of every net as [row, col, layer] points, source first,
+            in the RouteLoader format.
+        router (Router): The router, working on the grid the nets are routed on.
+        mode (str, optional): One of MODES. Defaults to "sequential".
+        workers (int, optional): The number of worker processes of the parallel mode. Defaults to the number of CPUs.
+
+    Returns:
+        dict: The JSON serializable report: the grid size, one entry per net and a summary.
+
+    Raises:
+        ValueError: If the mode is unknown.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode '{mode}', expected one of {list(MODES)}")
+
+    grid = router.grid
+    model = grid.model
+    started = time.perf_counter()
+
+    def inside(point):
+        row, col, layer = point
+        return 0 <= row < model.rows and 0 <= col < model.cols and 0 <= layer < model.layer_count
+
+    nets, indices = [], []
+    for i, route in enumerate(routes):
+        if not all(inside(point) for point in route):
+            continue
+        start = grid.tile(*route[0])
+        ends = [grid.tile(*point) for point in route[1:]]
+        start.state = TileState.start
+        for end in ends:
+            end.state = TileState.end
+        nets.append((start, ends))
+        indices.append(i)
+
+    if mode == "negotiated":
+        results = NegotiatedCongestionRouter(router).route(nets).nets
+    elif mode == "parallel":
+        results = ParallelNetRouter(router, workers).route(nets).nets
+    else:
+        results = [router.fan_out_route(start, ends) for start, ends in nets]
+
+    reports = [{"pins": route, "routed": False, "complete": False, "paths": []} for route in routes]
+    for i, (start, ends), result in zip(indices, nets, results):
+        paths = result.paths if result is not None else []
+        reached = {node for path in paths for node in path}
+        report = reports[i]
+        report["routed"] = bool(paths)
+        # A tree crossing the pin of another net loses that tile to it and is not complete
+        owners = {model.get_owner(node) for node in reached}
+        report["complete"] = (
+            reached.issuperset(end.node for end in ends if end.node != start.node)
+            and len(owners) <= 1 and NO_NET not in owners
+        )
+        report["paths"] = [[list(model.position(node)) for node in path] for path in paths]
+        if result is not None:
+            report.update(wirelength=result.wirelength, vias=result.via_count, cost=result.cost)
+
+    return {
+        "router": router.name(),
+        "mode": mode,
+        "grid": {"rows": model.rows, "cols": model.cols, "layers": model.layer_count},
+        "nets": reports,
+        "summary": {
+            "nets": len(routes),
+            "invalid": len(routes) - len(nets),
+            "routed": sum(report["routed"] for report in reports),
+            "complete": sum(report["complete"] for report in reports),
+            "wirelength": sum(report.get("wirelength", 0) for report in reports),
+            "vias": sum(report.get("vias", 0) for report in reports),
+            "cost": sum(report.get("cost", 0) for report in reports),
+            "seconds": round(time.perf_counter() - started, 3),
+        },
+    }
+
+
+def main(argv=None) -> int:
+    """
+    Command line entry point: routes a JSON netlist and writes the report.
+
+    Args:
+        argv (list[str], optional): The command line arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        int: The exit status, 0 when every valid net was completed and 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(description="Route a JSON netlist without a window.")
+    parser.add_argument("netlist", help="JSON netlist in the predefined_routes format")
+    parser.add_argument("-o", "--output", help="file the JSON report is written to, stdout if omitted")
+    parser.add_argument("--router", choices=list(ROUTERS), default="astar")
+    parser.add_argument("--net-engine", choices=list(NET_ENGINES), default="sequential")
+    parser.add_argument("--heuristic", default=None, help=f"A* heuristic, defaults to {config.HEURISTIC}")
+    parser.add_argument("--mode", choices=MODES, default="sequential")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes of the parallel mode")
+    parser.add_argument("--rows", type=int, default=config.ROWS, help="rows and columns of the grid")
+    parser.add_argument("--layers", type=int, default=config.LAYERS, help="routing layers of the grid")
+    args = parser.parse_args(argv)
+
+    routes = RouteLoader(args.netlist, verbose=False).routes
+    grid = CrossGrid(args.rows, args.layers)
+    try:
+        router = make_router(grid, args.router, args.net_engine, args.heuristic)
+        report = route_netlist(routes, router, args.mode, args.workers)
+    except ValueError as error:
+        parser.error(str(error))
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text)
+    else:
+        print(text)
+
+    summary = report["summary"]
+    print(
+        f"{report['router']} : {summary['complete']}/{summary['nets'] - summary['invalid']} nets complete ,"
+        f" wirelength {summary['wirelength']} , vias {summary['vias']} , {summary['seconds']}s",
+        file=sys.stderr,
+    )
+    return 0 if summary["complete"] == summary["nets"] - summary["invalid"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,362 @@
+import numpy as np
+
+import config
+from grid_model import BARRIER, LayerOrientation
+
+
+class Heuristic:
+    """
+    Base class for the A* estimates of the cost between two tile positions.
+
+    Positions are (row, col, layer) tuples. Heuristics must never overestimate
+    the routing cost, and the A* based routers also rely on them being
+    consistent, i.e. dropping by at most the cost of any single step.
+    """
+
+    def name(self) -> str:
+        """
+        Returns the name of the heuristic.
+
+        Raises:
+            NotImplementedError: Must be implemented in a subclass.
+        """
+        raise NotImplementedError
+
+    def __call__(self, p0: tuple[int, int, int], p1: tuple[int, int, int]) -> int:
+        """
+        Estimates the routing cost between two positions.
+
+        Args:
+            p0 (tuple[int, int, int]): The (row, col, layer) start position.
+            p1 (tuple[int, int, int]): The (row, col, layer) end position.
+
+        Returns:
+            int: A lower bound of the cost.
+
+        Raises:
+            NotImplementedError: Must be implemented in a subclass.
+        """
+        raise NotImplementedError
+
+    def estimator(self, model, targets):
+        """
+        Builds the estimate of the cost from a node to the closest of a set of targets.
+
+        Args:
+            model (GridModel): The grid model the nodes belong to.
+            targets (Iterable[int]): The node ids of the targets.
+
+        Returns:
+            Callable[[int], int]: The estimate function, taking a node id.
+        """
+        goals = [model.position(t) for t in targets]
+
+        def estimate(node):
+            position = model.position(node)
+            return min(self(position, goal) for goal in goals)
+        return estimate
+
+
+class ManhattanHeuristic(Heuristic):
+    """
+    Manhattan distance plus VIA_COST per layer of difference, as defined by config.heuristic.
+    """
+
+    def name(self) -> str:
+        return "Manhattan"
+
+    def __call__(self, p0, p1):
+        return config.heuristic(p0, p1)
+
+
+class LayerStackHeuristic(Heuristic):
+    """
+    Manhattan distance plus the fewest vias needed for the layer orientation stack.
+
+    Column changes need a layer that routes horizontally and row changes a layer
+    that routes vertically. The via part of the estimate is the shortest walk
+    over the layer stack that starts on the current layer, passes a layer for
+    every direction still to cover and ends on the target layer. It is never
+    below VIA_COST * |dz|, and since a single step changes the walk by at most
+    one layer it stays consistent.
+    """
+
+    def __init__(self, model) -> None:
+        """
+        Precomputes the via counts for every pair of layers and set of directions.
+
+        Args:
+            model (GridModel): The grid model whose layer orientations are used.
+        """
+        orientations = model.orientations.tolist()
+        count = len(orientations)
+        horizontal = [i for i, o in enumerate(orientations) if o != LayerOrientation.vertical.value]
+        vertical = [i for i, o in enumerate(orientations) if o != LayerOrientation.horizontal.value]
+
+        def walk(start, end, stops):
+            low, high = min(start, end, *stops), max(start, end, *stops)
+            return (high - low) + min(start - low + high - end, high - start + end - low)
+
+        # via_cost[z0][z1][needs], needs bit 0: columns to cover, bit 1: rows to cover
+        self.__via_cost = [[[0] * 4 for _ in range(count)] for _ in range(count)]
+        for z0 in range(count):
+            for z1 in range(count):
+                for needs in range(4):
+                    layers = [horizontal if needs & 1 else [None], vertical if needs & 2 else [None]]
+                    # A direction no layer can route is ignored, the bound stays admissible
+                    layers = [options or [None] for options in layers]
+                    steps = min(
+                        walk(z0, z1, [z for z in (h, v) if z is not None])
+                        for h in layers[0]
+                        for v in layers[1]
+                    )
+                    self.__via_cost[z0][z1][needs] = config.VIA_COST * steps
+
+    @property
+    def via_costs(self) -> list[list[list[int]]]:
+        """
+        Returns the via part of the estimate, indexed by layer, target layer and needed directions
+        (bit 0 set when columns remain to be covered, bit 1 when rows remain).
+        """
+        return self.__via_cost
+
+    def name(self) -> str:
+        return "Layer stack"
+
+    def __call__(self, p0, p1):
+        row0, col0, layer0 = p0
+        row1, col1, layer1 = p1
+        rows, cols = abs(row0 - row1), abs(col0 - col1)
+        return rows + cols + self.__via_cost[layer0][layer1][(cols > 0) | (rows > 0) << 1]
+
+
+class LandmarkHeuristic(Heuristic):
+    """
+    ALT estimate: landmark distances and the triangle inequality, on top of the layer stack estimate.
+
+    The exact routing cost from a few landmark tiles to every tile is computed
+    once, with unit steps, VIA_COST per via and barriers blocking. For any
+    landmark L, |d(L, t) - d(L, n)| is then a lower bound of the cost from n to
+    t, and the estimate is the largest such bound. The tables are kept as one
+    int32 array and serve every search until a barrier is removed; added
+    barriers only make paths longer, so the tables stay admissible and
+    consistent until then.
+
+    Landmarks are spread by farthest point selection, starting from the first
+    free tile. Tiles a landmark does not reach, such as barriers at the time
+    the tables were built, get no bound from it.
+    """
+
+    UNREACHED = -1
+
+    # Target sets up to this size get an exact estimate, larger ones fall back to the layer stack
+    TARGET_LIMIT = 16
+
+    def __init__(self, grid, count: int = 8) -> None:
+        """
+        Initializes the heuristic, the tables are built on first use.
+
+        Args:
+            grid (Grid): The grid whose adjacency and barriers are used.
+            count (int, optional): The number of landmarks. Defaults to 8.
+        """
+        model = grid.model
+        self.__grid = grid
+        self.__count = count
+        self.__base = LayerStackHeuristic(model)
+        self.__tables: np.ndarray = None
+        self.__blocked: np.ndarray = None
+        self.__version = None
+        self.__landmarks: list[int] = []
+
+    @property
+    def landmarks(self) -> list[int]:
+        """
+        Returns the node ids of the landmarks, empty until the tables are built.
+        """
+        return self.__landmarks
+
+    @property
+    def tables(self) -> np.ndarray:
+        """
+        Returns the (landmarks, nodes) distance tables, UNREACHED where a landmark does not reach a node.
+        """
+        self.__update()
+        return self.__tables
+
+    def name(self) -> str:
+        return "Landmarks"
+
+    def invalidate(self):
+        """
+        Drops the distance tables, they are rebuilt by the next search.
+        """
+        self.__tables = None
+
+    def __update(self):
+        """
+        Rebuilds the distance tables if they were never built or a barrier was removed since.
+
+        Only the barrier changes journaled by the model since the last check are
+        looked at; the states are scanned when the journal does not reach back.
+        """
+        model = self.__grid.model
+        if self.__tables is not None:
+            changed = model.changes_since(self.__version)
+            if changed is None:
+                removed = (self.__blocked & (model.states.reshape(-1) != BARRIER)).any()
+            else:
+                removed = (self.__blocked[changed] & (model.states.reshape(-1)[changed] != BARRIER)).any()
+            self.__version = model.version
+            if not removed:
+                return
+
+        self.invalidate()
+        blocked = model.states.reshape(-1) == BARRIER
+        self.__blocked = blocked
+        self.__version = model.version
+        free = np.flatnonzero(~blocked)
+        tables = np.full((self.__count, blocked.size), LandmarkHeuristic.UNREACHED, dtype=np.int32)
+        landmarks = []
+        if free.size:
+            landmark = int(free[0])
+            # Sum of the distances to the chosen landmarks, -1 excludes a tile from selection
+            spread = np.zeros(blocked.size, dtype=np.int64)
+            for i in range(self.__count):
+                landmarks.append(landmark)
+                tables[i] = self.__distances(landmark, blocked)
+                reached = tables[i] != LandmarkHeuristic.UNREACHED
+                spread = np.where(reached & (spread >= 0), spread + tables[i], -1)
+                spread[landmarks] = -1
+                if spread.max() <= 0:
+                    tables = tables[:i + 1]
+                    break
+                landmark = int(spread.argmax())
+        self.__tables = tables
+        self.__landmarks = landmarks
+
+    def __distances(self, source: int, blocked: np.ndarray) -> np.ndarray:
+        """
+        Computes the routing cost from a node to every free node, one cost level per step.
+
+        Args:
+            source (int): The node id to start from.
+            blocked (np.ndarray): Flat mask of the barrier nodes.
+
+        Returns:
+            np.ndarray: The int32 costs, UNREACHED for the nodes that cannot be reached.
+        """
+        grid = self.__grid
+        offsets, indices = grid.offsets, grid.indices
+        layer_size = grid.model.layer_size
+        dist = np.full(blocked.size, LandmarkHeuristic.UNREACHED, dtype=np.int32)
+        dist[source] = 0
+        pending = {0: [np.array([source], dtype=np.int64)]}
+        level = 0
+        while pending:
+            if level not in pending:
+                level += 1
+                continue
+            frontier = np.unique(np.concatenate(pending.pop(level)))
+            frontier = frontier[dist[frontier] == level]
+
+            starts = offsets[frontier]
+            counts = offsets[frontier + 1] - starts
+            owner = np.repeat(frontier, counts)
+            edge = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts - starts, counts)
+            candidates = indices[edge]
+
+            cost = level + np.where(owner // layer_size != candidates // layer_size, config.VIA_COST, 1)
+            current = dist[candidates]
+            better = ~blocked[candidates] & ((current == LandmarkHeuristic.UNREACHED) | (cost < current))
+            candidates, cost = candidates[better], cost[better]
+            # The cheapest cost wins when a node is reached several times
+            order = np.argsort(cost, kind="stable")
+            candidates, cost = candidates[order], cost[order]
+            new, first = np.unique(candidates, return_index=True)
+            dist[new] = cost[first]
+            for step in np.unique(cost[first]).tolist():
+                pending.setdefault(step, []).append(new[cost[first] == step])
+            level += 1
+        return dist
+
+    def estimator(self, model, targets):
+        """
+        Builds the estimate of the cost from a node to the closest of a set of targets.
+
+        The bound of a node is computed from its column of the tables the first
+        time the search asks for it, and kept for the rest of the search.
+
+        Args:
+            model (GridModel): The grid model the nodes belong to.
+            targets (Iterable[int]): The node ids of the targets.
+
+        Returns:
+            Callable[[int], int]: The estimate function, taking a node id.
+        """
+        targets = frozenset(targets)
+        if len(targets) > LandmarkHeuristic.TARGET_LIMIT:
+            return self.__base.estimator(model, targets)
+
+        self.__update()
+        base = self.__base
+        tables = self.__tables
+        unreached = LandmarkHeuristic.UNREACHED
+        goals = [(model.position(t), tables[:, t].tolist()) for t in targets]
+        known: dict[int, int] = {}
+
+        def estimate(node):
+            value = known.get(node)
+            if value is None:
+                position = model.position(node)
+                column = tables[:, node].tolist()
+                value = None
+                for goal, goal_column in goals:
+                    bound = base(position, goal)
+                    for a, b in zip(column, goal_column):
+                        if a != unreached and b != unreached and abs(a - b) > bound:
+                            bound = abs(a - b)
+                    if value is None or bound < value:
+                        value = bound
+                known[node] = value = value or 0
+            return value
+        return estimate
+
+    def __call__(self, p0, p1):
+        self.__update()
+        model = self.__grid.model
+        node, target = model.index(*p0), model.index(*p1)
+        estimate = self.__base(p0, p1)
+        for table in self.__tables:
+            if table[node] != LandmarkHeuristic.UNREACHED and table[target] != LandmarkHeuristic.UNREACHED:
+                estimate = max(estimate, abs(int(table[node]) - int(table[target])))
+        return estimate
+
+
+# Heuristics selectable by name
+HEURISTICS = {
+    "manhattan": lambda grid: ManhattanHeuristic(),
+    "layer_stack": lambda grid: LayerStackHeuristic(grid.model),
+    "landmarks": LandmarkHeuristic,
+}
+
+
+def make_heuristic(heuristic, grid) -> Heuristic:
+    """
+    Creates the heuristic of a router.
+
+    Args:
+        heuristic (str | Heuristic): The heuristic name from HEURISTICS or a heuristic instance.
+        grid (Grid): The grid the heuristic works on.
+
+    Returns:
+        Heuristic: The heuristic.
+
+    Raises:
+        ValueError: If the heuristic name is unknown.
+    """
+    if isinstance(heuristic, str):
+        if heuristic not in HEURISTICS:
+            raise ValueError(f"Unknown heuristic '{heuristic}', expected one of {list(HEURISTICS)}")
+        return HEURISTICS[heuristic](grid)
+    return heuristic
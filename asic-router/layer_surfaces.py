@@ -0,0 +1,87 @@
+import numpy as np
+import pygame
+
+
+class LayerSurfaces:
+    """
+    Off-screen surfaces holding the drawn tiles of the layers in view.
+
+    A layer is drawn into a transparent surface the size of the window the
+    first time it is shown, culled to the tiles in view, and afterwards only
+    the tiles that changed are cleared and drawn again; a frame blits it
+    instead of drawing every tile. The surfaces are dropped when the viewport
+    moves or zooms. Pins are not cached: their labels overflow their cell and
+    are drawn over the layers by Grid.draw_pins.
+    """
+
+    def __init__(self, grid, viewport, size: tuple[int, int]) -> None:
+        """
+        Initializes an empty cache.
+
+        Args:
+            grid (Grid): The grid whose layers are cached.
+            viewport (Viewport): The view the layers are drawn in.
+            size (tuple[int, int]): The width and height of the surfaces, in pixels.
+        """
+        self.__grid = grid
+        self.__viewport = viewport
+        self.__size = size
+        self.__revision = viewport.revision
+        self.__surfaces: dict[int, pygame.Surface] = {}
+
+    def surface(self, layer: int) -> pygame.Surface:
+        """
+        Returns the surface of a layer, drawing it if it is not cached for the current view.
+
+        Args:
+            layer (int): The layer index.
+
+        Returns:
+            pygame.Surface: The drawn tiles of the layer in view.
+        """
+        viewport = self.__viewport
+        if self.__revision != viewport.revision:
+            self.__revision = viewport.revision
+            self.__surfaces.clear()
+
+        surface = self.__surfaces.get(layer)
+        if surface is None:
+            surface = pygame.Surface(self.__size, pygame.SRCALPHA)
+            self.__grid.draw_tiles(viewport.nodes(self.__grid.model, [layer]), surface, viewport)
+            self.__surfaces[layer] = surface
+        return surface
+
+    def update(self, layer: int, changed: np.ndarray):
+        """
+        Redraws the tiles of a cached layer that changed since the last update.
+
+        Args:
+            layer (int): The layer index.
+            changed (np.ndarray): (rows, cols) boolean mask of the changed tiles over the tiles in view.
+        """
+        surface = self.__surfaces.get(layer)
+        if surface is None or self.__revision != self.__viewport.revision:
+            return
+
+        viewport = self.__viewport
+        model = self.__grid.model
+        min_row, _, min_col, _ = viewport.window()
+        cells = np.argwhere(changed) + (min_row, min_col)
+        for row, col in cells.tolist():
+            surface.fill((0, 0, 0, 0), viewport.rect(row, col))
+        nodes = layer * model.layer_size + cells[:, 0] * model.cols + cells[:, 1]
+        self.__grid.draw_tiles(nodes, surface, viewport)
+
+    def blit(self, target, layer: int, rect=None):
+        """
+        Draws a cached layer over a surface.
+
+        Args:
+            target (pygame.Surface): The surface drawn on, usually the window.
+            layer (int): The layer index.
+            rect (pygame.Rect, optional): The area to draw. Defaults to the whole surface.
+        """
+        if rect is None:
+            target.blit(self.surface(layer), (0, 0))
+        else:
+            target.blit(self.surface(layer), rect, rect)
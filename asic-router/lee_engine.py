@@ -0,0 +1,105 @@
+import numpy as np
+
+from grid_model import BARRIER
+from search_workspace import NO_PARENT
+
+
+class LeeEngine:
+    """
+    Lee-algorithm wavefront search with NumPy, expanding a whole frontier per step.
+
+    The neighbors of all frontier nodes are gathered from the grid's CSR
+    adjacency in one go, so the layer orientation rules of the grid apply
+    unchanged. Barriers, already visited nodes and nodes outside the router's
+    region are masked out, and every new node keeps the first frontier node
+    that reached it as its parent. The depths and parents are written into the
+    router's search workspace, which gives the usual backtrace.
+
+    Paths have the same length as the ones of the queue based BFS; when several
+    shortest paths exist, another one of them may be returned.
+    """
+
+    def search(self, router, sources, targets, show_update=False) -> list[int]:
+        """
+        Search from a set of sources to the closest of a set of targets.
+
+        Args:
+            router (Router): The router providing the grid, workspace and region.
+            sources (Iterable[int] | dict[int, int]): The node ids the path may start from,
+                optionally mapped to the depth they are seeded with.
+            targets (set[int]): The node ids the path may end at.
+            show_update (bool, optional): Whether to show graphical updates. Defaults to False.
+
+        Returns:
+            list[int]: The node ids of the calculated path, or an empty list if no path is found.
+        """
+        grid = router.grid
+        offsets, indices = grid.offsets, grid.indices
+        states = grid.model.states.reshape(-1)
+        region = None if router.region is None else np.asarray(router.region)
+        observer = router.observer
+
+        workspace = router.workspace()
+        generation = workspace.reset()
+        stamp = np.asarray(workspace.stamp_view)
+        depth = np.asarray(workspace.cost_view)
+        parent = np.asarray(workspace.parent_view)
+
+        goals = np.fromiter(targets, dtype=np.int64, count=len(targets))
+        seeds = sorted(router.seeds(sources), key=lambda seed: seed[1])
+        next_seed = 0
+
+        frontier = np.empty(0, dtype=np.int64)
+        level = seeds[0][1] if seeds else 0
+
+        while frontier.size or next_seed < len(seeds):
+            # Sources seeded at this depth join the wavefront
+            injected = []
+            while next_seed < len(seeds) and seeds[next_seed][1] <= level:
+                node, seed = seeds[next_seed]
+                next_seed += 1
+                if stamp[node] != generation:
+                    workspace.visit(node, seed)
+                    injected.append(node)
+            if injected:
+                frontier = np.concatenate((frontier, np.array(injected, dtype=np.int64)))
+
+            if not frontier.size:
+                level = seeds[next_seed][1]
+                continue
+
+            reached = frontier[np.isin(frontier, goals)]
+            if reached.size:
+                if observer is not None:
+                    observer.finished()
+                return router.reconstruct_path(int(reached.min()), show_update)
+
+            # Gather the CSR rows of the whole frontier
+            starts = offsets[frontier]
+            counts = offsets[frontier + 1] - starts
+            owner = np.repeat(frontier, counts)
+            edge = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts - starts, counts)
+            candidates = indices[edge]
+
+            keep = (stamp[candidates] != generation) & (states[candidates] != BARRIER)
+            if region is not None:
+                keep &= region[candidates]
+            candidates, owner = candidates[keep], owner[keep]
+
+            new, first = np.unique(candidates, return_index=True)
+            level += 1
+            stamp[new] = generation
+            depth[new] = level
+            parent[new] = owner[first]
+
+            # Sources are never reported as closed
+            if observer is not None:
+                observer.wavefront(new, frontier[parent[frontier] != NO_PARENT])
+            if show_update:
+                router.update()
+
+            frontier = new
+
+        if observer is not None:
+            observer.finished()
+        return []
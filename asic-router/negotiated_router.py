@@ -0,0 +1,188 @@
+import numpy as np
+
+from grid_model import NO_NET, TileState
+from net_engines import NetResult
+
+
+class NegotiationResult:
+    """
+    Outcome of a negotiated-congestion run over a netlist.
+
+    Attributes:
+        nets (list[NetResult]): The routed tree of every net, in netlist order.
+        net_ids (list[int]): The grid net id each tree was committed under, NO_NET if it was not committed.
+        iterations (int): The number of negotiation iterations that were run.
+        rerouted (list[int]): The number of nets routed in each iteration.
+        overused (int): The number of tiles still shared by several nets after the last iteration.
+        legal (bool): Whether negotiation ended without any shared tile.
+        fallback (list[int]): Indices of the nets that were still in conflict and were routed
+            against the committed barriers instead.
+    """
+
+    def __init__(self) -> None:
+        self.nets: list[NetResult] = []
+        self.net_ids: list[int] = []
+        self.iterations = 0
+        self.rerouted: list[int] = []
+        self.overused = 0
+        self.legal = False
+        self.fallback: list[int] = []
+
+    def __repr__(self):
+        return (
+            f"NegotiationResult(iterations={self.iterations}, legal={self.legal}, "
+            f"overused={self.overused}, fallback={len(self.fallback)})"
+        )
+
+
+class NegotiatedCongestionRouter:
+    """
+    PathFinder-style negotiated-congestion routing of a whole netlist.
+
+    Every net is first routed as if it were alone. Tiles may then be shared, and
+    entering a tile costs history[n] + present * usage[n] on top of the normal
+    step and via cost, where usage counts the other nets on the tile. After each
+    iteration the history of every overused tile grows and the present factor
+    is raised, and only the nets that touch an overused tile are ripped up and
+    rerouted. Once no tile is shared, the trees are committed to the grid.
+
+    All congestion costs are integers so the bucket and radix queue engines still
+    apply. The present factor is capped to keep the path costs, and with them the
+    number of buckets of a bucket queue, small.
+    """
+
+    def __init__(self, router, max_iterations: int = 30, history_increment: int = 1, present_growth: int = 2,
+                 max_present: int = 64) -> None:
+        """
+        Initializes the negotiated-congestion router.
+
+        Args:
+            router (Router): A weighted router; its net engine builds the trees.
+            max_iterations (int, optional): The maximum number of rip-up and reroute iterations. Defaults to 30.
+            history_increment (int, optional): History cost added per extra net on an overused tile. Defaults to 1.
+            present_growth (int, optional): Factor applied to the present congestion cost after each iteration. Defaults to 2.
+            max_present (int, optional): The highest present congestion factor. Defaults to 64.
+
+        Raises:
+            ValueError: If the router does not use weighted edges.
+        """
+        if not router.is_weighted():
+            raise ValueError(f"{router.name()} does not support congestion costs, use a weighted router")
+        self.__router = router
+        self.__max_iterations = max_iterations
+        self.__history_increment = history_increment
+        self.__present_growth = present_growth
+        self.__max_present = max_present
+
+    def route(self, nets: list) -> NegotiationResult:
+        """
+        Routes and commits a netlist.
+
+        Nets of the list that were already committed to the grid are ripped up first.
+
+        Args:
+            nets (list[tuple[Tile, list[Tile]]]): The (start, ends) pins of every net.
+
+        Returns:
+            NegotiationResult: The routed trees and the negotiation statistics.
+        """
+        router = self.__router
+        grid = router.grid
+        model = grid.model
+        engine = router.net_engine
+
+        pins = [(start.node, [e.node for e in ends if e.node != start.node]) for start, ends in nets]
+        # Nets whose ends all sit on their start have nothing to route
+        routable = [i for i, (_, sinks) in enumerate(pins) if sinks]
+
+        # Nets routed before are ripped up, and the pins of the netlist are made routable
+        for source, sinks in pins:
+            for pin in [source, *sinks]:
+                owner = model.get_owner(pin)
+                if owner != NO_NET:
+                    router.remove_net(owner)
+        for source, sinks in pins:
+            model.set_state(source, TileState.start)
+            for sink in sinks:
+                model.set_state(sink, TileState.end)
+
+        usage = np.zeros(model.size, dtype=np.int32)
+        history = np.zeros(model.size, dtype=np.int32)
+        costs = np.zeros(model.size, dtype=np.int32)
+        present = 0
+
+        # Pins always belong to their own net, so other nets pay for crossing them
+        net_nodes = [np.array([source, *sinks], dtype=np.int64) for source, sinks in pins]
+        for nodes in net_nodes:
+            np.add.at(usage, nodes, 1)
+
+        result = NegotiationResult()
+        result.nets = [NetResult(model, []) for _ in pins]
+        router.set_node_costs(costs)
+        try:
+            for iteration in range(self.__max_iterations):
+                if iteration == 0:
+                    pending = routable
+                else:
+                    pending = [i for i in routable if (usage[net_nodes[i]] > 1).any()]
+
+                for i in pending:
+                    source, sinks = pins[i]
+
+                    # Rip up the net so that it only pays for the other nets
+                    nodes = net_nodes[i]
+                    np.subtract.at(usage, nodes, 1)
+                    costs[nodes] = history[nodes] + present * usage[nodes]
+
+                    if router.observer is not None:
+                        router.observer.net_started(source, sinks)
+                    tree = engine.route_net(router, source, sinks)
+                    result.nets[i] = tree
+
+                    nodes = np.unique(np.array([source, *sinks, *(n for path in tree.paths for n in path)], dtype=np.int64))
+                    net_nodes[i] = nodes
+                    usage[nodes] += 1
+                    costs[nodes] = history[nodes] + present * usage[nodes]
+
+                result.iterations = iteration + 1
+                result.rerouted.append(len(pending))
+
+                overused = usage > 1
+                result.overused = int(overused.sum())
+                if not result.overused:
+                    result.legal = True
+                    break
+
+                history[overused] += self.__history_increment * (usage[overused] - 1)
+                present = 1 if present == 0 else min(present * self.__present_growth, self.__max_present)
+                np.add(history, present * usage, out=costs)
+        finally:
+            router.set_node_costs(None)
+
+        # Commit in netlist order, nets still sharing tiles with a committed net are routed again around it
+        committed = np.zeros(model.size, dtype=bool)
+        result.net_ids = [NO_NET] * len(pins)
+        for i in routable:
+            source, sinks = pins[i]
+            tree = result.nets[i]
+            if committed[net_nodes[i]].any():
+                result.fallback.append(i)
+                continue
+            if tree.paths:
+                result.net_ids[i] = router.commit_net(source, sinks, tree)
+                committed[net_nodes[i]] = True
+
+        for i in result.fallback:
+            source, sinks = pins[i]
+            # A pin crossed by a committed net cannot be connected without shorting the two nets
+            if any(model.get_owner(pin) != NO_NET for pin in [source, *sinks]):
+                result.nets[i] = NetResult(model, [])
+                continue
+            if router.observer is not None:
+                router.observer.net_started(source, sinks)
+            tree = engine.route_net(router, source, sinks)
+            result.nets[i] = tree
+            if tree.paths:
+                result.net_ids[i] = router.commit_net(source, sinks, tree)
+
+        return result
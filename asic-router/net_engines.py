@@ -0,0 +1,438 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from priority_queues import BucketQueue
+from grid_model import BARRIER, TileState
+
+
+class NetResult:
+    """
+    The routed tree of a multi-pin net and its quality metrics.
+
+    Attributes:
+        paths (list[list[int]]): The paths of the tree, in the order they were connected.
+            Every path after the first starts on a tile of an earlier path.
+        steiner_points (list[int]): The Steiner nodes the tree was built through.
+        wirelength (int): The number of same-layer steps in the tree.
+        via_count (int): The number of layer changes in the tree.
+        cost (int): The routing cost of the tree, wirelength + VIA_COST * via_count.
+    """
+
+    def __init__(self, model, paths: list[list[int]], steiner_points=()) -> None:
+        """
+        Measures the given tree.
+
+        Args:
+            model (GridModel): The grid model the paths live in.
+            paths (list[list[int]]): The paths of the tree.
+            steiner_points (Iterable[int], optional): The Steiner nodes of the tree. Defaults to ().
+        """
+        self.paths = paths
+        self.steiner_points = list(steiner_points)
+        self.wirelength = 0
+        self.via_count = 0
+        for path in paths:
+            for a, b in zip(path, path[1:]):
+                if model.layer_index(a) != model.layer_index(b):
+                    self.via_count += 1
+                else:
+                    self.wirelength += 1
+        self.cost = self.wirelength + config.VIA_COST * self.via_count
+
+    def __repr__(self):
+        return f"NetResult(wirelength={self.wirelength}, via_count={self.via_count}, cost={self.cost})"
+
+
+class NetEngine:
+    """
+    Base class for the multi-pin net engines used by Router.fan_out_route.
+
+    An engine decides how the tree of a net is grown and asks the router for the
+    individual connections. It only returns the paths; committing them to the
+    grid is left to the router.
+    """
+
+    def name(self) -> str:
+        """
+        Returns the name of the engine.
+
+        Raises:
+            NotImplementedError: Must be implemented in a subclass.
+        """
+        raise NotImplementedError
+
+    def route_net(self, router, source: int, sinks: list[int], show_update=False) -> NetResult:
+        """
+        Builds the tree connecting the source to all sinks.
+
+        Args:
+            router (Router): The router used for the point-to-tree searches.
+            source (int): The node id of the net driver.
+            sinks (list[int]): The node ids of the net loads.
+            show_update (bool, optional): Whether the first search shows graphical updates. Defaults to False.
+
+        Returns:
+            NetResult: The routed tree.
+
+        Raises:
+            NotImplementedError: Must be implemented in a subclass.
+        """
+        raise NotImplementedError
+
+
+class SequentialNetEngine(NetEngine):
+    """
+    Connects the closest end first, then every other end in the given order.
+
+    Each end is reached by one search seeded with the whole partial tree.
+    """
+
+    def name(self) -> str:
+        return "Sequential"
+
+    def route_net(self, router, source, sinks, show_update=False) -> NetResult:
+        model = router.grid.model
+        first = router.windowed_search([source], set(sinks), show_update)
+        if not first:
+            return NetResult(model, [])
+
+        paths = [first]
+        tree = list(first)
+        in_tree = set(first)
+        for sink in sinks:
+            if sink in in_tree:
+                continue
+            path = router.windowed_search(tree, {sink})
+            if path:
+                paths.append(path)
+                tree += path[1:]
+                in_tree.update(path)
+
+        return NetResult(model, paths)
+
+
+class PrimDijkstraEngine(NetEngine):
+    """
+    Prim-Dijkstra trade-off tree construction (Alpert et al.).
+
+    Each step connects the sink that is cheapest to reach from the tree, where a
+    tree tile is seeded with alpha times its path cost back to the source.
+    alpha = 0 gives Prim's minimum wirelength tree, alpha = 1 gives Dijkstra's
+    shortest path tree. Seeds are rounded to integers for the integer queues.
+    """
+
+    def __init__(self, alpha: float = 0.0) -> None:
+        """
+        Initializes the engine.
+
+        Args:
+            alpha (float, optional): Weight of the source path length, between 0 and 1. Defaults to 0.0.
+        """
+        self.__alpha = alpha
+
+    def name(self) -> str:
+        return f"Prim-Dijkstra (alpha={self.__alpha})"
+
+    def route_net(self, router, source, sinks, show_update=False) -> NetResult:
+        model = router.grid.model
+        alpha = self.__alpha
+
+        # Path cost from the source along the tree
+        source_cost = {source: 0}
+        remaining = set(sinks)
+        paths = []
+
+        while remaining:
+            seeds = {node: round(alpha * cost) for node, cost in source_cost.items()}
+            path = router.windowed_search(seeds, remaining, show_update and not paths)
+            if not path:
+                break
+
+            paths.append(path)
+            cost = source_cost[path[0]]
+            for a, b in zip(path, path[1:]):
+                cost += config.VIA_COST if model.layer_index(a) != model.layer_index(b) else 1
+                if b not in source_cost or cost < source_cost[b]:
+                    source_cost[b] = cost
+            remaining.difference_update(source_cost)
+
+        return NetResult(model, paths)
+
+
+def distance_field(grid, source: int, bounds) -> dict[int, int]:
+    """
+    Computes the routing cost from a node to every free node inside a window.
+
+    Args:
+        grid (Grid): The routing grid.
+        source (int): The node id to measure from.
+        bounds (tuple[int, int, int, int]): The (min_row, max_row, min_col, max_col) window, inclusive.
+
+    Returns:
+        dict[int, int]: The cost of every reachable node of the window.
+    """
+    model = grid.model
+    state = model.state_view
+    min_row, max_row, min_col, max_col = bounds
+    distance = {source: 0}
+    queue = BucketQueue()
+    queue.push(0, source)
+
+    while queue:
+        cost, current = queue.pop()
+        if cost != distance[current]:
+            continue
+        layer = model.layer_index(current)
+        for n in grid.neighbors(current):
+            if state[n] == BARRIER:
+                continue
+            row, col, n_layer = model.position(n)
+            if not (min_row <= row <= max_row and min_col <= col <= max_col):
+                continue
+            new_cost = cost + (config.VIA_COST if n_layer != layer else 1)
+            if new_cost < distance.get(n, new_cost + 1):
+                distance[n] = new_cost
+                queue.push(new_cost, n)
+
+    return distance
+
+
+class OneSteinerEngine(NetEngine):
+    """
+    Iterated 1-Steiner tree construction (Kahng and Robins) on the layered grid.
+
+    The distances between pins are exact routing costs, vias included, taken from
+    one distance field per pin. Hanan points of the pins on every layer are the
+    Steiner candidates. The candidate that lowers the minimum spanning tree cost
+    the most is added until no candidate helps, and Steiner points left with a
+    tree degree of two or less are dropped again. The spanning tree is finally
+    routed edge by edge, in Prim order from the source, with tree seeded searches.
+
+    The distance fields and the candidate evaluations are independent and only
+    read the grid, so they can run on a thread pool. Every field keeps its own
+    search buffers, and results are gathered in order, which keeps the tree
+    identical to a sequential run. Threads only pay off on a free-threaded
+    Python build, so by default the engine runs sequentially when the GIL is on.
+    """
+
+    def __init__(self, margin: int = 2, max_rounds: int = None, workers: int = None) -> None:
+        """
+        Initializes the engine.
+
+        Args:
+            margin (int, optional): Tiles added around the pins' bounding box for the distance fields. Defaults to 2.
+            max_rounds (int, optional): The maximum number of candidates to add. Defaults to the number of pins.
+            workers (int, optional): The number of threads, 1 to run sequentially. Defaults to the number
+                of CPUs on a free-threaded build and to 1 otherwise.
+        """
+        self.__margin = margin
+        self.__max_rounds = max_rounds
+        if workers is None:
+            gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+            workers = 1 if gil_enabled else os.cpu_count() or 1
+        self.__workers = workers
+        self.__executor: ThreadPoolExecutor = None
+
+    @property
+    def workers(self) -> int:
+        """
+        Returns the number of threads the engine evaluates on, 1 when it runs sequentially.
+        """
+        return self.__workers
+
+    def __map(self, function, items: list) -> list:
+        """
+        Applies a function to every item, split in one chunk per thread when a pool is used.
+
+        Args:
+            function (Callable): The function to apply.
+            items (list): The items.
+
+        Returns:
+            list: The results, in the order of the items.
+        """
+        workers = self.__workers
+        if workers <= 1 or len(items) < 2:
+            return [function(item) for item in items]
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(workers, thread_name_prefix="steiner")
+        size = -(-len(items) // workers)
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        results = self.__executor.map(lambda chunk: [function(item) for item in chunk], chunks)
+        return [result for chunk in results for result in chunk]
+
+    def name(self) -> str:
+        return "Iterated 1-Steiner"
+
+    def distance_fields(self, grid, nodes: list[int], bounds) -> list[dict[int, int]]:
+        """
+        Computes the distance field of every node.
+
+        Args:
+            grid (Grid): The routing grid.
+            nodes (list[int]): The node ids to measure from.
+            bounds (tuple[int, int, int, int]): The window of the fields.
+
+        Returns:
+            list[dict[int, int]]: The distance field of each node, in order.
+        """
+        return self.__map(lambda node: distance_field(grid, node, bounds), list(nodes))
+
+    @staticmethod
+    def spanning_tree(matrix: list[list[float]]) -> tuple[float, list[tuple[int, int]]]:
+        """
+        Computes a minimum spanning tree with Prim's algorithm, rooted at the first point.
+
+        Args:
+            matrix (list[list[float]]): The symmetric distance matrix of the points.
+
+        Returns:
+            tuple[float, list[tuple[int, int]]]: The tree cost and its (parent, child) index
+                pairs in the order the children were added.
+        """
+        count = len(matrix)
+        inf = float("inf")
+        best = list(matrix[0])
+        link = [0] * count
+        pending = set(range(1, count))
+
+        total = 0
+        edges = []
+        while pending:
+            child = min(pending, key=best.__getitem__)
+            if best[child] == inf:
+                return inf, edges
+            pending.discard(child)
+            total += best[child]
+            edges.append((link[child], child))
+            row = matrix[child]
+            for i in pending:
+                if row[i] < best[i]:
+                    best[i] = row[i]
+                    link[i] = child
+        return total, edges
+
+    def route_net(self, router, source, sinks, show_update=False) -> NetResult:
+        grid = router.grid
+        model = grid.model
+        terminals = [source] + [sink for sink in dict.fromkeys(sinks) if sink != source]
+
+        rows = [model.position(t)[0] for t in terminals]
+        cols = [model.position(t)[1] for t in terminals]
+        margin = self.__margin
+        bounds = (
+            max(0, min(rows) - margin),
+            min(model.rows - 1, max(rows) + margin),
+            max(0, min(cols) - margin),
+            min(model.cols - 1, max(cols) + margin),
+        )
+
+        points = list(terminals)
+        fields = self.distance_fields(grid, points, bounds)
+        inf = float("inf")
+
+        def distance_matrix():
+            return [[field.get(q, inf) for q in points] for field in fields]
+
+        state = model.state_view
+        barrier = TileState.barrier.value
+        taken = set(terminals)
+        candidates = [
+            model.index(row, col, layer)
+            for row in sorted(set(rows))
+            for col in sorted(set(cols))
+            for layer in range(model.layer_count)
+            if model.index(row, col, layer) not in taken and state[model.index(row, col, layer)] != barrier
+        ]
+
+        rounds = self.__max_rounds if self.__max_rounds is not None else len(terminals)
+        matrix = distance_matrix()
+        base_cost, edges = self.spanning_tree(matrix)
+        for _ in range(rounds):
+            def evaluate(candidate):
+                column = [field.get(candidate, inf) for field in fields]
+                extended = [row + [d] for row, d in zip(matrix, column)]
+                extended.append(column + [0])
+                return self.spanning_tree(extended)[0]
+
+            pending = [candidate for candidate in candidates if candidate not in taken]
+            best, best_cost = None, base_cost
+            for candidate, cost in zip(pending, self.__map(evaluate, pending)):
+                if cost < best_cost:
+                    best, best_cost = candidate, cost
+            if best is None:
+                break
+
+            points.append(best)
+            taken.add(best)
+            fields += self.distance_fields(grid, [best], bounds)
+
+            # Drop Steiner points that no longer branch the tree
+            matrix = distance_matrix()
+            base_cost, edges = self.spanning_tree(matrix)
+            degree = [0] * len(points)
+            for a, b in edges:
+                degree[a] += 1
+                degree[b] += 1
+            keep = [i for i in range(len(points)) if i < len(terminals) or degree[i] > 2]
+            if len(keep) != len(points):
+                points = [points[i] for i in keep]
+                fields = [fields[i] for i in keep]
+                matrix = distance_matrix()
+                base_cost, edges = self.spanning_tree(matrix)
+
+        steiner_points = points[len(terminals):]
+
+        # Route the spanning tree in Prim order, every connection may attach anywhere on the tree
+        paths = []
+        tree = [source]
+        in_tree = {source}
+        for _, child in edges:
+            target = points[child]
+            if target in in_tree:
+                continue
+            path = router.windowed_search(tree, {target}, show_update and not paths)
+            if path:
+                paths.append(path)
+                tree += path[1:]
+                in_tree.update(path)
+
+        # Terminals the spanning tree could not reach still get a direct attempt
+        for sink in terminals[1:]:
+            if sink not in in_tree:
+                path = router.windowed_search(tree, {sink})
+                if path:
+                    paths.append(path)
+                    tree += path[1:]
+                    in_tree.update(path)
+
+        paths = self.__prune(paths, set(terminals))
+        used = {node for path in paths for node in path}
+        return NetResult(model, paths, [p for p in steiner_points if p in used])
+
+    @staticmethod
+    def __prune(paths: list[list[int]], terminals: set[int]) -> list[list[int]]:
+        """
+        Removes branches that end at a Steiner point without feeding any other branch.
+
+        Args:
+            paths (list[list[int]]): The routed paths, each attached at its first tile.
+            terminals (set[int]): The pins of the net.
+
+        Returns:
+            list[list[int]]: The remaining paths.
+        """
+        pruned = True
+        while pruned:
+            pruned = False
+            attach = {path[0] for path in paths}
+            for i, path in enumerate(paths):
+                if path[-1] in terminals:
+                    continue
+                if not any(node in attach for node in path[1:]) and not terminals.intersection(path[1:]):
+                    del paths[i]
+                    pruned = True
+                    break
+        return paths
@@ -0,0 +1,299 @@
+import multiprocessing
+import os
+
+import numpy as np
+
+from grid_model import BARRIER, NO_NET, TileState
+from net_engines import NetResult
+
+
+# State of a worker process, inherited from the parent when the pool is forked
+_worker_router = None
+# Mask of the box searched by a task, allocated once per process and cleared after every task
+_box_region: np.ndarray = None
+
+
+class ParallelRouteResult:
+    """
+    Outcome of a parallel batch run over a netlist.
+
+    Attributes:
+        nets (list[NetResult]): The routed tree of every net, in netlist order.
+        net_ids (list[int]): The grid net id each tree was committed under, NO_NET if it was not committed.
+        batches (list[list[int]]): Indices of the nets routed together, in commit order.
+        fallback (list[int]): Indices of the nets that could not be completed inside their
+            bounding box and were routed afterwards on the whole grid.
+        workers (int): The number of worker processes, 1 when the batches were routed in process.
+    """
+
+    def __init__(self) -> None:
+        self.nets: list[NetResult] = []
+        self.net_ids: list[int] = []
+        self.batches: list[list[int]] = []
+        self.fallback: list[int] = []
+        self.workers = 1
+
+    def __repr__(self):
+        return (
+            f"ParallelRouteResult(nets={len(self.nets)}, batches={len(self.batches)}, "
+            f"fallback={len(self.fallback)}, workers={self.workers})"
+        )
+
+
+class ParallelNetRouter:
+    """
+    Routes a netlist in batches of spatially independent nets over a process pool.
+
+    Every net is confined to the bounding box of its pins grown by a margin. Nets
+    whose boxes overlap conflict, and a greedy coloring of the conflict graph in
+    netlist order splits the netlist into batches of nets that cannot touch each
+    other. The nets of a batch are routed in parallel by worker processes, then
+    committed by the parent in netlist order before the next batch starts.
+
+    Every task carries the barrier changes the parent journaled inside its box
+    since the pool was forked, and the worker applies them to its own copy of
+    the grid before routing. Since a net only sees the grid as it was at the
+    start of its batch and only searches its own box, the result does not
+    depend on the number of workers or on their timing. Nets that cannot be
+    completed inside their box are routed afterwards, one by one on the whole
+    grid. Nets routed before on the pins of the netlist are ripped up first.
+
+    Workers are forked from the parent and inherit its router, so the pool needs
+    the fork start method; where it is not available the batches are routed in
+    process, with the same results. Heuristics that keep state between searches,
+    such as the landmark tables, may break ties differently in each worker.
+    """
+
+    def __init__(self, router, workers: int = None, margin: int = 4) -> None:
+        """
+        Initializes the parallel router.
+
+        Args:
+            router (Router): The router whose net engine builds the trees, in the parent and in every worker.
+            workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+            margin (int, optional): Tiles added around the bounding box of each net. Defaults to 4.
+        """
+        self.__router = router
+        self.__workers = workers or os.cpu_count() or 1
+        self.__margin = margin
+
+    def boxes(self, pins: list) -> np.ndarray:
+        """
+        Computes the routing box of every net.
+
+        Args:
+            pins (list[tuple[int, list[int]]]): The (source, sinks) node ids of every net.
+
+        Returns:
+            np.ndarray: (nets, 4) array of (min_row, max_row, min_col, max_col), clipped to the grid.
+        """
+        model = self.__router.grid.model
+        margin = self.__margin
+        boxes = np.empty((len(pins), 4), dtype=np.int64)
+        for i, (source, sinks) in enumerate(pins):
+            nodes = np.array([source, *sinks], dtype=np.int64)
+            rows, cols = nodes % model.layer_size // model.cols, nodes % model.cols
+            boxes[i] = (
+                max(0, rows.min() - margin), min(model.rows - 1, rows.max() + margin),
+                max(0, cols.min() - margin), min(model.cols - 1, cols.max() + margin),
+            )
+        return boxes
+
+    @staticmethod
+    def conflict_graph(boxes: np.ndarray, bucket: int = 16) -> list[set[int]]:
+        """
+        Finds the nets whose boxes overlap.
+
+        Boxes are hashed into square buckets so that only nets sharing a bucket are compared.
+
+        Args:
+            boxes (np.ndarray): (nets, 4) array of (min_row, max_row, min_col, max_col).
+            bucket (int, optional): Side of the hash buckets, in tiles. Defaults to 16.
+
+        Returns:
+            list[set[int]]: The indices of the conflicting nets of every net.
+        """
+        buckets: dict[tuple[int, int], list[int]] = {}
+        for i, (min_row, max_row, min_col, max_col) in enumerate(boxes.tolist()):
+            for row in range(min_row // bucket, max_row // bucket + 1):
+                for col in range(min_col // bucket, max_col // bucket + 1):
+                    buckets.setdefault((row, col), []).append(i)
+
+        conflicts = [set() for _ in range(len(boxes))]
+        for members in buckets.values():
+            for k, i in enumerate(members):
+                a = boxes[i]
+                for j in members[k + 1:]:
+                    if j in conflicts[i]:
+                        continue
+                    b = boxes[j]
+                    if a[0] <= b[1] and b[0] <= a[1] and a[2] <= b[3] and b[2] <= a[3]:
+                        conflicts[i].add(j)
+                        conflicts[j].add(i)
+        return conflicts
+
+    @staticmethod
+    def batches(conflicts: list[set[int]]) -> list[list[int]]:
+        """
+        Splits the nets into batches without conflicts, by greedy coloring in netlist order.
+
+        Args:
+            conflicts (list[set[int]]): The conflicting nets of every net.
+
+        Returns:
+            list[list[int]]: The nets of every batch, in netlist order.
+        """
+        colors = [0] * len(conflicts)
+        batches: list[list[int]] = []
+        for i, neighbors in enumerate(conflicts):
+            used = {colors[j] for j in neighbors if j < i}
+            color = 0
+            while color in used:
+                color += 1
+            colors[i] = color
+            if color == len(batches):
+                batches.append([])
+            batches[color].append(i)
+        return batches
+
+    def route(self, nets: list) -> ParallelRouteResult:
+        """
+        Routes and commits a netlist.
+
+        Args:
+            nets (list[tuple[Tile, list[Tile]]]): The (start, ends) pins of every net.
+
+        Returns:
+            ParallelRouteResult: The routed trees and the batches they were routed in.
+        """
+        global _worker_router, _box_region
+
+        router = self.__router
+        model = router.grid.model
+        pins = [(start.node, [e.node for e in ends if e.node != start.node]) for start, ends in nets]
+
+        # Nets routed before are ripped up, and the pins of the netlist are made routable
+        for source, sinks in pins:
+            for pin in [source, *sinks]:
+                owner = model.get_owner(pin)
+                if owner != NO_NET:
+                    router.remove_net(owner)
+        for source, sinks in pins:
+            model.set_state(source, TileState.start)
+            for sink in sinks:
+                model.set_state(sink, TileState.end)
+
+        boxes = self.boxes(pins)
+        result = ParallelRouteResult()
+        result.batches = ParallelNetRouter.batches(ParallelNetRouter.conflict_graph(boxes))
+        result.nets = [NetResult(model, []) for _ in pins]
+        result.net_ids = [NO_NET] * len(pins)
+
+        use_pool = self.__workers > 1 and "fork" in multiprocessing.get_all_start_methods()
+        states = model.states.reshape(-1)
+        # Nodes whose barrier state changed since the fork, the workers still see them as they were
+        changed = np.empty(0, dtype=np.int64)
+        version = model.version
+        pool = None
+        try:
+            if use_pool:
+                _worker_router = router
+                pool = multiprocessing.get_context("fork").Pool(self.__workers, initializer=_init_worker)
+                result.workers = self.__workers
+
+            for batch in result.batches:
+                # Nets without a sink other than their source have nothing to route
+                batch = [i for i in batch if pins[i][1]]
+                if pool is not None:
+                    journal = model.changes_since(version)
+                    if journal is None:
+                        # The journal no longer reaches back: only barriers were added, send them all
+                        journal = np.flatnonzero(states == BARRIER)
+                    changed = np.union1d(changed, journal)
+                    version = model.version
+                    rows, cols = changed % model.layer_size // model.cols, changed % model.cols
+                    tasks = []
+                    for i in batch:
+                        min_row, max_row, min_col, max_col = box = tuple(boxes[i].tolist())
+                        nodes = changed[(rows >= min_row) & (rows <= max_row) & (cols >= min_col) & (cols <= max_col)]
+                        tasks.append((i, pins[i][0], pins[i][1], box, nodes, states[nodes]))
+                else:
+                    tasks = [(i, pins[i][0], pins[i][1], tuple(boxes[i].tolist()), None, None) for i in batch]
+
+                if pool is not None:
+                    routed = pool.map(_route_in_box, tasks, chunksize=max(1, len(tasks) // (4 * self.__workers)))
+                else:
+                    routed = [_route_in_box(task, router) for task in tasks]
+
+                # Commit in netlist order, incomplete nets wait for the fallback pass
+                for i, paths, steiner_points in routed:
+                    source, sinks = pins[i]
+                    tree = NetResult(model, paths, steiner_points)
+                    reached = {node for path in paths for node in path}
+                    if not reached.issuperset(sinks):
+                        result.fallback.append(i)
+                        continue
+                    result.nets[i] = tree
+                    result.net_ids[i] = router.commit_net(source, sinks, tree)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+            _worker_router, _box_region = None, None
+
+        result.fallback.sort()
+        for i in result.fallback:
+            source, sinks = pins[i]
+            if router.observer is not None:
+                router.observer.net_started(source, sinks)
+            tree = router.net_engine.route_net(router, source, sinks)
+            result.nets[i] = tree
+            if tree.paths:
+                result.net_ids[i] = router.commit_net(source, sinks, tree)
+
+        return result
+
+
+def _init_worker():
+    """
+    Prepares the inherited router of a worker process: searches are not displayed.
+    """
+    _worker_router.set_observer(None)
+    _worker_router.disable_graphics_updates()
+
+
+def _route_in_box(task, router=None) -> tuple:
+    """
+    Routes one net inside its box, on the grid as the parent left it at the start of the batch.
+
+    Args:
+        task (tuple): The net index, source node, sink nodes, (min_row, max_row, min_col, max_col) box,
+            and the node ids and states of the barrier changes inside the box, None in process.
+        router (Router, optional): The router to use. Defaults to the router of the worker process.
+
+    Returns:
+        tuple: The net index, the paths of its tree and its Steiner points.
+    """
+    global _box_region
+
+    index, source, sinks, (min_row, max_row, min_col, max_col), nodes, values = task
+    if router is None:
+        router = _worker_router
+    model = router.grid.model
+    if nodes is not None:
+        # Replay the changes committed by the parent inside the box
+        for node, value in zip(nodes.tolist(), values.tolist()):
+            model.set_state(node, TileState(value))
+
+    shape = (model.layer_count, model.rows, model.cols)
+    if _box_region is None or _box_region.shape != shape:
+        _box_region = np.zeros(shape, dtype=bool)
+    box = (slice(None), slice(min_row, max_row + 1), slice(min_col, max_col + 1))
+    _box_region[box] = True
+    router.set_region(_box_region)
+    try:
+        tree = router.net_engine.route_net(router, source, sinks)
+    finally:
+        router.set_region(None)
+        _box_region[box] = False
+    return index, tree.paths, tree.steiner_points
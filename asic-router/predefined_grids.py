@@ -1,8 +1,11 @@
 
 
-from config import LAYERS, ROWS, WIDTH
+import numpy as np
+
+from config import LAYERS, ROWS
 from grid import Grid
-from tile import Layer, LayerOrientation, Tile, TileState, TileType
+from grid_model import GridModel
+from tile import Layer, LayerOrientation
 
 
 class CrossGrid(Grid):
@@ -10,33 +13,24 @@ class CrossGrid(Grid):
     Represents a cross-layer grid structure with specific layer orientations.
     """
 
-    def __init__(self):
+    def __init__(self, rows: int = ROWS, layers: int = LAYERS):
         """
         Initializes a CrossGrid object and builds the grid structure.
+
+        Args:
+            rows (int, optional): The number of rows and columns of each layer. Defaults to ROWS.
+            layers (int, optional): The number of routing layers. Defaults to LAYERS.
         """
+        self.__rows = rows
+        self.__layers = layers
         super().__init__()
 
     def build_grid(self):
         """
         Builds the cross-layer grid with specific dimensions and tile types.
         """
-        tile_width = WIDTH
-        layers = self.build_cross_grid_layers(LAYERS)
-
-        for layer in layers: 
-            print(layer.index)
-
-        for layer in layers:
-            grid_layer = []
-
-            for i in range(ROWS):
-                grid_layer.append([])
-
-                for j in range(ROWS):
-                    tile = Tile(i, j, layer, tile_width, TileType.metal)
-                    grid_layer[i].append(tile)
-
-            self._grid.append(grid_layer)
+        layers = self.build_cross_grid_layers(self.__layers)
+        self._model = GridModel(self.__rows, self.__rows, layers)
 
     def build_cross_grid_layers(
         self, count, initial_orientation=LayerOrientation.horizontal
@@ -61,73 +55,50 @@ class CrossGrid(Grid):
 
         return layers
 
-    def update_tile_neighbors(self, tile: Tile):
+    def build_adjacency(self) -> tuple[np.ndarray, np.ndarray]:
         """
-        Updates the neighbors of a given tile based on its position and orientation.
+        Builds the adjacency of the grid based on the layer orientations.
 
-        Args:
-            tile (Tile): The tile whose neighbors are to be updated.
+        Horizontal layers move along the columns, vertical layers along the rows,
+        and every layer can switch to the layers directly above and below it.
+        Neighbors are listed East, West, South, North, Up, Down.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The CSR offsets and indices arrays.
         """
-        tile.clear_neighbors()
-
-        row, col, index = tile.get_position()
-
-        # Same Layer
-        step = 1
-
-        if tile.layer.orientation == LayerOrientation.horizontal:
-
-            # EAST
-            if col < ROWS - step and not (
-                self._grid[index][row][col + step].state
-                == TileState.barrier
-            ):
-                tile.neighbors.append(
-                    self._grid[index][row][col + step]
-                )
-            # WEST
-            if col > step and not (
-                self._grid[index][row][col - step].state
-                == TileState.barrier
-            ):
-                tile.neighbors.append(
-                    self._grid[index][row][col - step]
-                )
-
-        elif tile.layer.orientation == LayerOrientation.vertical:
-
-            # South
-            if row < ROWS - step and not (
-                self._grid[index][row + step][col].state
-                == TileState.barrier
-            ):
-                tile.neighbors.append(
-                    self._grid[index][row + step][col]
-                )
-            # North
-            if row > step and not (
-                self._grid[index][row - step][col].state
-                == TileState.barrier
-            ):
-                tile.neighbors.append(
-                    self._grid[index][row - step][col]
-                )
-
-        # Different Layer
-
-        # Up
-        if index < LAYERS and not (
-            self._grid[index + 1][row][col].state
-            == TileState.barrier
-        ):
-            tile.neighbors.append(
-                self._grid[index + 1][row][col]
-            )
-        # Down
-        if index > 0 and not (
-            self._grid[index - 1][row][col].state
-            == TileState.barrier
-        ):
-            tile.neighbors.append(
-                self._grid[index - 1][row][col]
-            )
+        model = self._model
+        rows, cols, layer_size = model.rows, model.cols, model.layer_size
+        # Built one layer at a time, with 32 bit ids when they fit, to bound the temporary arrays
+        node_type = np.int32 if model.size <= np.iinfo(np.int32).max else np.int64
+        edge_type = np.int32 if 6 * model.size <= np.iinfo(np.int32).max else np.int64
+        row, col = np.divmod(np.arange(layer_size, dtype=node_type), cols)
+
+        def moves(layer):
+            orientation = model.orientations[layer]
+            horizontal = orientation != LayerOrientation.vertical.value
+            vertical = orientation != LayerOrientation.horizontal.value
+            everywhere = np.ones(layer_size, dtype=bool)
+            return [
+                (col < cols - 1 if horizontal else ~everywhere, 1),                     # East
+                (col >= 1 if horizontal else ~everywhere, -1),                          # West
+                (row < rows - 1 if vertical else ~everywhere, cols),                    # South
+                (row >= 1 if vertical else ~everywhere, -cols),                         # North
+                (everywhere if layer < model.layer_count - 1 else ~everywhere, layer_size),  # Up
+                (everywhere if layer > 0 else ~everywhere, -layer_size),                # Down
+            ]
+
+        offsets = np.zeros(model.size + 1, dtype=edge_type)
+        for layer in range(model.layer_count):
+            base = layer * layer_size
+            offsets[base + 1:base + layer_size + 1] = sum(mask.astype(edge_type) for mask, _ in moves(layer))
+        np.cumsum(offsets, out=offsets)
+
+        indices = np.empty(int(offsets[-1]), dtype=node_type)
+        cells = np.arange(layer_size, dtype=node_type)
+        for layer in range(model.layer_count):
+            base = layer * layer_size
+            layer_moves = moves(layer)
+            valid = np.stack([mask for mask, _ in layer_moves], axis=1)
+            targets = np.stack([cells + (base + step) for _, step in layer_moves], axis=1)
+            indices[offsets[base]:offsets[base + layer_size]] = targets[valid]
+        return offsets, indices
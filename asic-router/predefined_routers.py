@@ -1,10 +1,14 @@
 from collections import deque
 import heapq
-from queue import PriorityQueue
+import time
+import numpy as np
+
 import config
-from graphics import Graphics
+from grid_model import BARRIER, LayerOrientation
+from lee_engine import LeeEngine
+from priority_queues import BinaryHeapQueue, make_priority_queue
 from router import Router
-from tile import Tile, TileState
+from search_workspace import NO_PARENT, SearchWorkspace
 
 
 
@@ -12,16 +16,85 @@ from tile import Tile, TileState
 class AStarRouter(Router):
     """
     Router implementation using the A* algorithm.
+
+    With a weight above 1 the router runs weighted A*, ordering the queue by
+    g + weight * h, and returns paths costing at most weight times the optimum.
+    With a time budget it turns into anytime weighted A*: the search goes on
+    after the first path, reopening nodes reached more cheaply and pruning
+    those that cannot beat the best path, until the queue runs dry or the
+    budget is spent. After every search, bound holds the proven ratio between
+    the cost of the returned path and the optimal cost.
     """
 
-    def __init__(self, grid):
+    # Expansions between two checks of the anytime time budget
+    CLOCK_INTERVAL = 64
+
+    def __init__(self, grid, weight: float = None, time_budget: float = None, **kwargs):
         """
         Initialize the AStarRouter object.
 
         Args:
             grid (Grid): The grid object representing the routing area.
+            weight (float, optional): The weight of the estimate, at least 1. Defaults to config.ASTAR_WEIGHT.
+            time_budget (float, optional): Seconds spent improving the first path, None to return it at once.
+                Defaults to config.ASTAR_TIME_BUDGET.
+            kwargs: Router options (queue_engine, net_engine, global_router, heuristic).
+
+        Raises:
+            ValueError: If the weight is below 1.
+        """
+        super().__init__(grid, **kwargs)
+        self.__weight = 1.0
+        self.__time_budget = None
+        self.__bound = 1.0
+        self.__heap: BinaryHeapQueue = None
+        self.set_weight(config.ASTAR_WEIGHT if weight is None else weight,
+                        config.ASTAR_TIME_BUDGET if time_budget is None else time_budget)
+
+    @property
+    def weight(self) -> float:
+        """
+        Returns the weight of the estimate.
         """
-        super().__init__(grid)
+        return self.__weight
+
+    @property
+    def time_budget(self) -> float:
+        """
+        Returns the seconds spent improving the first path, None if it is returned at once.
+        """
+        return self.__time_budget
+
+    @property
+    def bound(self) -> float:
+        """
+        Returns the proven suboptimality bound of the last search: its path costs at most bound times the optimum.
+        """
+        return self.__bound
+
+    def set_weight(self, weight: float, time_budget: float = None):
+        """
+        Selects the quality of the searches.
+
+        Args:
+            weight (float): The weight of the estimate, 1 for optimal paths.
+            time_budget (float, optional): Seconds spent improving the first path, None to return it at once.
+                Defaults to None.
+
+        Raises:
+            ValueError: If the weight is below 1.
+        """
+        if weight < 1:
+            raise ValueError(f"The A* weight must be at least 1, got {weight}")
+        self.__weight = weight
+        self.__time_budget = time_budget
+        self.clear_route_cache()
+
+    def search_info(self):
+        return self.__bound
+
+    def restore_search_info(self, info):
+        self.__bound = info
 
     def fan_out_route(self, start, ends):
         """Perform a fan-out routing using the A* algorithm."""
@@ -47,190 +120,740 @@ class AStarRouter(Router):
         """
         return config.heuristic(p0 , p1)
 
-    def route(self, start: Tile, end: Tile, show_update=False):
+    def search(self, sources, targets, show_update=False):
         """
-        Route between two points using A*.
+        Search from a set of sources to the closest of a set of targets using A*.
+
+        The heuristic of a tile is its lowest estimate to any of the targets, which
+        stays admissible when several targets are searched at once.
 
         Args:
-            start (Tile): The starting tile.
-            end (Tile): The destination tile.
+            sources (Iterable[int] | dict[int, int]): The node ids the path may start from,
+                optionally mapped to the cost they are seeded with.
+            targets (set[int]): The node ids the path may end at.
             show_update (bool, optional): Whether to show graphical updates. Defaults to False.
 
         Returns:
-            list[Tile]: The calculated path, or an empty list if no path is found.
-        """
-        count = 0
-        open_set = PriorityQueue()
-        came_from = {}
-
-        # Initialize scores
-        g_score = {
-            tile: float("inf") for grid_layer in self._grid.layers() for row in grid_layer for tile in row
-        }
-        g_score[start] = 0
-
-        f_score = {
-            tile: float("inf") for grid_layer in self._grid.layers() for row in grid_layer for tile in row
-        }
-        f_score[start] = AStarRouter.h(start.get_position(), end.get_position())
-        open_set.put((f_score[start], count, start))
-
-        visited = {start}
-
-        while not open_set.empty():
-            current: Tile = open_set.get()[2]
-            visited.remove(current)
-
-            # Check if we've reached the destination
-            if current == end:
-                self._grid.idlize_tiles()
-                path = self.reconstruct_path(came_from, current)
+            list[int]: The node ids of the calculated path, or an empty list if no path is found.
+        """
+        if self.__weight != 1 or self.__time_budget is not None:
+            return self.__bounded_search(sources, targets, show_update)
+        self.__bound = 1.0
+
+        grid = self._grid
+        model = grid.model
+        state = model.state_view
+        estimate = self._heuristic.estimator(model, targets)
+
+        workspace = self.workspace()
+        generation = workspace.reset()
+        stamp = workspace.stamp_view
+        g_score = workspace.cost_view
+        closed = workspace.closed_view
+        node_costs = self._node_costs
+        region = self._region
+        observer = self._observer
+
+        parent = workspace.parent_view
+
+        open_set = self.priority_queue()
+        for start, seed in Router.seeds(sources):
+            if stamp[start] != generation or seed < g_score[start]:
+                workspace.visit(start, seed)
+                open_set.push(seed + estimate(start), start)
+
+        while open_set:
+            _, current = open_set.pop()
+
+            # Skip queue entries of tiles that were already expanded through a cheaper path
+            if closed[current] == generation:
+                continue
+            closed[current] = generation
+            current_g = g_score[current]
+
+            # Check if we've reached a destination
+            if current in targets:
+                if observer is not None:
+                    observer.finished()
+                path = self.reconstruct_path(current)
                 return path
 
-            for n in current.neighbors:
-                
+            for n in grid.neighbors(current):
+                if closed[n] == generation or state[n] == BARRIER or (region is not None and not region[n]):
+                    continue
+
                 # Calculate the cost to move to the neighbor tile
                 transition_cost = 1
-                if current.layer.index != n.layer.index:
+                if model.layer_index(current) != model.layer_index(n):
                         transition_cost =  config.VIA_COST  # Add higher cost for layer transition
 
-                current_g_score = g_score[current] + transition_cost
-
-                if current_g_score < g_score[n]:
-                    came_from[n] = current
-                    g_score[n] = current_g_score
-                    f_score[n] = current_g_score + AStarRouter.h(n.get_position(), end.get_position())
+                tentative_g_score = current_g + transition_cost
+                if node_costs is not None:
+                    tentative_g_score += node_costs[n]
 
-                    if n not in visited:
-                        count += 1
-                        open_set.put((f_score[n], count, n))
-                        visited.add(n)
-                        n.set_open_state()
+                if stamp[n] != generation or tentative_g_score < g_score[n]:
+                    workspace.visit(n, tentative_g_score, current)
+                    f_score = tentative_g_score + estimate(n)
+                    open_set.push(f_score, n)
+                    if observer is not None:
+                        observer.opened(n)
             
             if show_update:
                 self.update()
 
-            if current != start:
-                current.set_closed_state()
+            # Sources are never reported as closed
+            if observer is not None and parent[current] != NO_PARENT:
+                observer.closed(current)
 
+        if observer is not None:
+            observer.finished()
         return []
 
-class MazeRouter(Router):
+    def __bounded_search(self, sources, targets, show_update=False) -> list[int]:
+        """
+        Weighted and anytime A* search from a set of sources to the closest of a set of targets.
+
+        Queue keys are floats, so the search always uses a binary heap. Beside
+        it, a second heap keeps g + h of the open nodes; its smallest valid entry
+        is a lower bound of the optimal cost, which gives the proven bound of
+        the returned path.
+
+        Args:
+            sources (Iterable[int] | dict[int, int]): The node ids the path may start from,
+                optionally mapped to the cost they are seeded with.
+            targets (set[int]): The node ids the path may end at.
+            show_update (bool, optional): Whether to show graphical updates. Defaults to False.
+
+        Returns:
+            list[int]: The node ids of the best path found, or an empty list if no path is found.
+        """
+        grid = self._grid
+        model = grid.model
+        state = model.state_view
+        estimate = self._heuristic.estimator(model, targets)
+        weight = self.__weight
+        deadline = None if self.__time_budget is None else time.perf_counter() + self.__time_budget
+
+        workspace = self.workspace()
+        generation = workspace.reset()
+        stamp = workspace.stamp_view
+        g_score = workspace.cost_view
+        closed = workspace.closed_view
+        parent = workspace.parent_view
+        node_costs = self._node_costs
+        region = self._region
+        observer = self._observer
+
+        if self.__heap is None:
+            self.__heap = BinaryHeapQueue()
+        open_set = self.__heap
+        open_set.clear()
+        # (g + h, g, node) of every queued node, stale entries are skipped lazily
+        lower = []
+
+        best_path, best_cost = [], float("inf")
+        for start, seed in Router.seeds(sources):
+            if stamp[start] != generation or seed < g_score[start]:
+                workspace.visit(start, seed)
+                h = estimate(start)
+                open_set.push(seed + weight * h, start)
+                heapq.heappush(lower, (seed + h, seed, start))
+
+        expansions = 0
+        while open_set:
+            key, current = open_set.pop()
+            if closed[current] == generation:
+                continue
+            current_g = g_score[current]
+            h = estimate(current)
+            # Entries pushed before the node was reached more cheaply are stale
+            if key != current_g + weight * h:
+                continue
+            if current_g + h >= best_cost:
+                continue
+            closed[current] = generation
+
+            if current in targets:
+                best_path, best_cost = self.reconstruct_path(current), current_g
+                # With a weight of 1 the first path is already optimal
+                if deadline is None or weight == 1:
+                    break
+                continue
+
+            for n in grid.neighbors(current):
+                if state[n] == BARRIER or (region is not None and not region[n]):
+                    continue
+
+                transition_cost = 1
+                if model.layer_index(current) != model.layer_index(n):
+                    transition_cost = config.VIA_COST
+
+                tentative_g_score = current_g + transition_cost
+                if node_costs is not None:
+                    tentative_g_score += node_costs[n]
+
+                if stamp[n] != generation or tentative_g_score < g_score[n]:
+                    h = estimate(n)
+                    if tentative_g_score + h >= best_cost:
+                        continue
+                    workspace.visit(n, tentative_g_score, current)
+                    # A closed node reached more cheaply is reopened
+                    closed[n] = generation - 1
+                    open_set.push(tentative_g_score + weight * h, n)
+                    heapq.heappush(lower, (tentative_g_score + h, tentative_g_score, n))
+                    if observer is not None:
+                        observer.opened(n)
+
+            if show_update:
+                self.update()
+
+            if observer is not None and parent[current] != NO_PARENT:
+                observer.closed(current)
+
+            expansions += 1
+            if (best_path and expansions % AStarRouter.CLOCK_INTERVAL == 0
+                    and time.perf_counter() > deadline):
+                break
+
+        # The cheapest open node bounds the optimal cost from below
+        while lower and (closed[lower[0][2]] == generation or lower[0][1] != g_score[lower[0][2]]):
+            heapq.heappop(lower)
+        optimum = min(lower[0][0], best_cost) if lower else best_cost
+        if not best_path or best_cost == optimum:
+            self.__bound = 1.0
+        else:
+            self.__bound = min(weight, best_cost / optimum) if optimum > 0 else weight
+
+        if observer is not None:
+            observer.finished()
+        return best_path
+
+class BidirectionalAStarRouter(Router):
     """
-    Router implementation using a maze-solving algorithm with BFS.
+    Router implementation using bidirectional A* with balanced potentials.
+
+    A forward search from the sources and a backward search from the targets
+    run in turn, always advancing the side with the smaller frontier. Both use
+    the average potential p(v) = (h_targets(v) - h_sources(v)) / 2, forward with
+    +p and backward with -p, which keeps every reduced edge cost non-negative
+    for consistent heuristics. Keys are doubled to stay integers. The best
+    meeting cost mu is optimal once the two lowest keys add up to 2 * mu.
+
+    The backward search pays for entering a node (step or via cost, plus any
+    node cost) when it leaves that node, so both sides add up to the forward
+    path cost. Sources the forward search may leave but not enter (barriers or
+    tiles outside the region) are still reachable backwards from their neighbors.
     """
 
-    def __init__(self, grid):
+    # Above this many nodes, the estimate to a node set uses their bounding box
+    EXACT_ESTIMATE_LIMIT = 16
+
+    def __init__(self, grid, **kwargs):
         """
-        Initialize the MazeRouter object.
+        Initialize the BidirectionalAStarRouter object.
 
         Args:
             grid (Grid): The grid object representing the routing area.
+            kwargs: Router options (queue_engine, net_engine, global_router, heuristic).
         """
-        super().__init__(grid)
+        super().__init__(grid, **kwargs)
+        self.__backward: SearchWorkspace = None
+        self.__backward_queue = None
 
     def is_weighted(self):
-        return False 
-    
-    def name(self): 
-        return "Maze Router"
+        return True
+
+    def name(self):
+        return "Bidirectional A* Router"
+
+    def __estimator(self, nodes):
+        """
+        Builds an admissible, consistent estimate of the cost from a node to the closest of a node set.
+
+        Args:
+            nodes (Iterable[int]): The node ids to estimate the cost to.
+
+        Returns:
+            Callable[[int], int]: The estimate function.
+        """
+        model = self._grid.model
+        positions = [model.position(n) for n in nodes]
+        if len(positions) <= BidirectionalAStarRouter.EXACT_ESTIMATE_LIMIT:
+            return self._heuristic.estimator(model, nodes)
+
+        rows, cols, layers = zip(*positions)
+        min_row, max_row = min(rows), max(rows)
+        min_col, max_col = min(cols), max(cols)
+        min_layer, max_layer = min(layers), max(layers)
+
+        def estimate(node):
+            row, col, layer = model.position(node)
+            return (
+                max(min_row - row, 0, row - max_row)
+                + max(min_col - col, 0, col - max_col)
+                + config.VIA_COST * max(min_layer - layer, 0, layer - max_layer)
+            )
+        return estimate
+
+    def backward_workspace(self) -> SearchWorkspace:
+        """
+        Returns the buffers of the backward search, allocating them on first use.
+
+        Returns:
+            SearchWorkspace: The backward search workspace.
+        """
+        size = self._grid.model.size
+        if self.__backward is None or self.__backward.size != size:
+            self.__backward = SearchWorkspace(size)
+        return self.__backward
 
-    def route(self, start: Tile, end: Tile, show_update=False):
+    def search(self, sources, targets, show_update=False):
         """
-        Route between two points using BFS (Breadth-First Search) algorithm.
+        Search from a set of sources to the closest of a set of targets using bidirectional A*.
 
         Args:
-            start (Tile): The starting tile.
-            end (Tile): The destination tile.
+            sources (Iterable[int] | dict[int, int]): The node ids the path may start from,
+                optionally mapped to the cost they are seeded with.
+            targets (set[int]): The node ids the path may end at.
             show_update (bool, optional): Whether to show graphical updates. Defaults to False.
 
         Returns:
-            list[Tile]: The calculated path, or an empty list if no path is found.
+            list[int]: The node ids of the calculated path, or an empty list if no path is found.
         """
-        queue = deque([start])  # BFS uses a queue to explore the grid
-        came_from = {start: None}  # To track the path
+        grid = self._grid
+        model = grid.model
+        state = model.state_view
+        node_costs = self._node_costs
+        region = self._region
+        observer = self._observer
+        seeds = dict(Router.seeds(sources))
+
+        def enterable(node):
+            return state[node] != BARRIER and (region is None or region[node])
+
+        # Targets the forward search could never enter cannot end a path
+        goals = {t for t in targets if t in seeds or enterable(t)}
+        if not seeds or not goals:
+            return []
+
+        to_targets = self.__estimator(goals)
+        to_sources = self.__estimator(seeds)
+
+        def forward_key(node, g):
+            return 2 * g + to_targets(node) - to_sources(node)
+
+        def backward_key(node, g):
+            return 2 * g + to_sources(node) - to_targets(node)
+
+        forward = self.workspace()
+        backward = self.backward_workspace()
+        forward_generation = forward.reset()
+        backward_generation = backward.reset()
+
+        best, meeting = float("inf"), None
+        forward_start = []
+        for start, seed in seeds.items():
+            if forward.stamp_view[start] != forward_generation or seed < forward.cost_view[start]:
+                forward.visit(start, seed)
+                forward_start.append((forward_key(start, seed), start))
+        backward_start = []
+        for goal in goals:
+            backward.visit(goal, 0)
+            backward_start.append((backward_key(goal, 0), goal))
+            if goal in seeds and seeds[goal] < best:
+                best, meeting = seeds[goal], goal
+
+        # Keys never drop below the first ones, the offsets keep them non-negative for the integer queues
+        forward_offset = -min(forward_start)[0]
+        backward_offset = -min(backward_start)[0]
+        forward_queue = self.priority_queue()
+        if self.__backward_queue is None:
+            self.__backward_queue = make_priority_queue(self._queue_engine)
+        backward_queue = self.__backward_queue
+        backward_queue.clear()
+        for key, node in forward_start:
+            forward_queue.push(key + forward_offset, node)
+        for key, node in backward_start:
+            backward_queue.push(key + backward_offset, node)
+
+        sides = (
+            (forward, forward_generation, forward_queue, forward_key, forward_offset, backward, backward_generation),
+            (backward, backward_generation, backward_queue, backward_key, backward_offset, forward, forward_generation),
+        )
+        # Lowest key of each side, without offset
+        top = [-forward_offset, -backward_offset]
+
+        while forward_queue and backward_queue:
+            is_backward = len(backward_queue) < len(forward_queue)
+            workspace, generation, queue, key_of, offset, other, other_generation = sides[is_backward]
+            stamp, g_score = workspace.stamp_view, workspace.cost_view
+            closed = workspace.closed_view
+
+            key, current = queue.pop()
+            if closed[current] == generation:
+                continue
+            top[is_backward] = key - offset
+            if top[0] + top[1] >= 2 * best:
+                break
+            closed[current] = generation
+            current_g = g_score[current]
+
+            # Leaving a node backwards pays for entering it forwards
+            entry = node_costs[current] if is_backward and node_costs is not None else 0
+
+            for n in grid.neighbors(current):
+                if closed[n] == generation or (region is not None and not region[n] and n not in seeds):
+                    continue
+                # The backward search may end on a blocked source
+                if state[n] == BARRIER and (not is_backward or n not in seeds):
+                    continue
 
-        # Mark the start tile
-        start.set_open_state()
+                transition_cost = 1
+                if model.layer_index(current) != model.layer_index(n):
+                    transition_cost = config.VIA_COST  # Add higher cost for layer transition
 
-        while queue:
-            current = queue.popleft()  # Pop the first element from the queue
+                tentative_g_score = current_g + transition_cost + entry
+                if not is_backward and node_costs is not None:
+                    tentative_g_score += node_costs[n]
 
-            if current == end:
-                # Reconstruct path when destination is found
-                self._grid.idlize_tiles()
-                path = self.reconstruct_path(came_from, current, show_update)
-                return path
+                if stamp[n] != generation or tentative_g_score < g_score[n]:
+                    workspace.visit(n, tentative_g_score, current)
+                    queue.push(key_of(n, tentative_g_score) + offset, n)
+                    if observer is not None:
+                        observer.opened(n)
 
-            for neighbor in current.neighbors:
-                # If the neighbor is not visited and is not a metal tile (blocked)
-                if neighbor not in came_from and neighbor.state != TileState.barrier:
-                    queue.append(neighbor)
-                    came_from[neighbor] = current
-                    neighbor.set_open_state()
+                    # A node labeled by both searches closes a candidate path
+                    if other.stamp_view[n] == other_generation:
+                        total = tentative_g_score + other.cost_view[n]
+                        if total < best:
+                            best, meeting = total, n
 
             if show_update:
                 self.update()
 
-            current.set_closed_state()
+            if observer is not None and workspace.parent_view[current] != NO_PARENT:
+                observer.closed(current)
 
-        return []  # Return an empty list if no path is found
+        if observer is not None:
+            observer.finished()
+        if meeting is None:
+            return []
+
+        path = self.reconstruct_path(meeting)
+        tail = backward.path(meeting)
+        tail.reverse()
+        return path + tail[1:]
 
-    def reconstruct_path(self, came_from, current, show_update=False) -> list[Tile]:
+
+class JumpPointRouter(Router):
+    """
+    Router implementation using a Jump Point Search variant of A* for preferred-direction layers.
+
+    On a layer, a search does not stop on every tile of a track. It jumps along
+    the track until it reaches a target or a tile on a line where a turn or a
+    via may be needed: the rows and columns of the pins, the grid border, and
+    the lines next to a blocked tile on any layer. With unit steps and a fixed
+    VIA_COST, any optimal path can be slid sideways onto these lines without
+    changing its length or via count, so the paths stay optimal while free
+    tracks cost one queue operation per jump instead of one per tile.
+
+    Jumps assume uniform tile costs. While node costs are set, every tile is a
+    jump point and the search behaves like A*.
+    """
+
+    def __init__(self, grid, **kwargs):
         """
-        Reconstruct the path from a dictionary of visited tiles.
+        Initialize the JumpPointRouter object.
 
         Args:
-            came_from (dict): Dictionary mapping tiles to their predecessors.
-            current (Tile): The end tile of the path.
-            show_update (bool, optional): Whether to show updates during reconstruction. Defaults to False.
+            grid (Grid): The grid object representing the routing area.
+            kwargs: Router options (queue_engine, net_engine, global_router, heuristic).
+        """
+        super().__init__(grid, **kwargs)
+
+    def is_weighted(self):
+        return True
+
+    def name(self):
+        return "Jump Point Router"
+
+    def jump_lines(self, nodes) -> tuple[list[bool], list[bool]]:
+        """
+        Finds the rows and columns on which a path may turn or change layers.
+
+        Args:
+            nodes (Iterable[int]): The pins of the search, their rows and columns are always lines.
 
         Returns:
-            list[Tile]: The reconstructed path.
+            tuple[list[bool], list[bool]]: Whether each row and each column is a line.
+        """
+        model = self._grid.model
+        if self._node_costs is not None:
+            return [True] * model.rows, [True] * model.cols
+
+        blocked = model.states == BARRIER
+        if self._region is not None:
+            blocked |= ~np.asarray(self._region).reshape(blocked.shape)
+
+        lines = []
+        for axis in ((0, 2), (0, 1)):
+            has_block = blocked.any(axis=axis)
+            line = has_block.copy()
+            line[1:] |= has_block[:-1]
+            line[:-1] |= has_block[1:]
+            line[0] = line[-1] = True
+            lines.append(line)
+
+        row_lines, col_lines = lines
+        for node in nodes:
+            row, col, _ = model.position(node)
+            row_lines[row] = col_lines[col] = True
+        return row_lines.tolist(), col_lines.tolist()
+
+    def search(self, sources, targets, show_update=False):
         """
-        path = [current]
-        while current in came_from and came_from[current] is not None:
-            current = came_from[current]
-            path.append(current)
+        Search from a set of sources to the closest of a set of targets with jump point A*.
+
+        Args:
+            sources (Iterable[int] | dict[int, int]): The node ids the path may start from,
+                optionally mapped to the cost they are seeded with.
+            targets (set[int]): The node ids the path may end at.
+            show_update (bool, optional): Whether to show graphical updates. Defaults to False.
+
+        Returns:
+            list[int]: The node ids of the calculated path, or an empty list if no path is found.
+        """
+        grid = self._grid
+        model = grid.model
+        rows, cols, layer_size = model.rows, model.cols, model.layer_size
+        layer_count = model.layer_count
+        state = model.state_view
+        node_costs = self._node_costs
+        region = self._region
+        observer = self._observer
+        seeds = dict(Router.seeds(sources))
+        estimate = self._heuristic.estimator(model, targets)
+
+        row_lines, col_lines = self.jump_lines(list(seeds) + list(targets))
+        orientations = model.orientations.tolist()
+        horizontal_only = LayerOrientation.horizontal.value
+        vertical_only = LayerOrientation.vertical.value
+
+        workspace = self.workspace()
+        generation = workspace.reset()
+        stamp = workspace.stamp_view
+        g_score = workspace.cost_view
+        closed = workspace.closed_view
+        parent = workspace.parent_view
+
+        open_set = self.priority_queue()
+        for start, seed in seeds.items():
+            if stamp[start] != generation or seed < g_score[start]:
+                workspace.visit(start, seed)
+                open_set.push(seed + estimate(start), start)
+
+        def relax(n, cost, current):
+            if node_costs is not None:
+                cost += node_costs[n]
+            if stamp[n] != generation or cost < g_score[n]:
+                workspace.visit(n, cost, current)
+                open_set.push(cost + estimate(n), n)
+                if observer is not None:
+                    observer.opened(n)
+
+        while open_set:
+            _, current = open_set.pop()
+
+            # Skip queue entries of tiles that were already expanded through a cheaper path
+            if closed[current] == generation:
+                continue
+            closed[current] = generation
+            current_g = g_score[current]
+
+            if current in targets:
+                if observer is not None:
+                    observer.finished()
+                return self.__unfold(self.reconstruct_path(current, show_update))
+
+            layer, rest = divmod(current, layer_size)
+            row, col = divmod(rest, cols)
+            orientation = orientations[layer]
+
+            # Jump along the tracks of the layer: (step, tiles to the border, line of each tile)
+            jumps = []
+            if orientation != vertical_only:
+                jumps += [(1, cols - 1 - col, col, col_lines), (-1, col, col, col_lines)]
+            if orientation != horizontal_only:
+                jumps += [(cols, rows - 1 - row, row, row_lines), (-cols, row, row, row_lines)]
+
+            for step, limit, coordinate, lines in jumps:
+                direction = 1 if step > 0 else -1
+                n = current
+                for distance in range(1, limit + 1):
+                    n += step
+                    if state[n] == BARRIER or (region is not None and not region[n]):
+                        break
+                    if closed[n] == generation:
+                        break
+                    if n in targets or lines[coordinate + direction * distance]:
+                        relax(n, current_g + distance, current)
+                        break
+
+            # Vias, only taken on jump points
+            for n in (current + layer_size, current - layer_size):
+                if 0 <= n < layer_count * layer_size and closed[n] != generation:
+                    if state[n] == BARRIER or (region is not None and not region[n]):
+                        continue
+                    relax(n, current_g + config.VIA_COST, current)
+
             if show_update:
                 self.update()
-        path.reverse()  # Reverse to get the path from start to end
-        return path
 
-    def update(self):
-        """Update the graphical display."""
-        Graphics.update()
+            # Sources are never reported as closed
+            if observer is not None and parent[current] != NO_PARENT:
+                observer.closed(current)
+
+        if observer is not None:
+            observer.finished()
+        return []
+
+    def __unfold(self, jumps: list[int]) -> list[int]:
+        """
+        Expands a path of jump points into the tiles it runs over.
+
+        Args:
+            jumps (list[int]): The jump points of the path.
+
+        Returns:
+            list[int]: Every node of the path.
+        """
+        cols, layer_size = self._grid.model.cols, self._grid.model.layer_size
+        path = jumps[:1]
+        for a, b in zip(jumps, jumps[1:]):
+            if abs(b - a) == layer_size:
+                path.append(b)
+                continue
+            step = (1 if b > a else -1) * (1 if abs(b - a) < cols else cols)
+            path.extend(range(a + step, b + step, step))
+        return path
 
 
-class WeightedTile:
+class MazeRouter(Router):
     """
-    A class to wrap a Tile with its cost to make it comparable for use in a priority queue.
+    Router implementation using a maze-solving algorithm with BFS.
+
+    The "bfs" backend expands one tile at a time from a queue, the "lee" backend
+    expands the whole wavefront per step with NumPy (LeeEngine).
     """
-    def __init__(self, tile: Tile, cost: int):
-        self.tile = tile
-        self.cost = cost
 
-    def __lt__(self, other):
-        """Compare WeightedTile objects based on their cost."""
-        return self.cost < other.cost
+    BACKENDS = ("bfs", "lee")
+
+    def __init__(self, grid, backend=None, **kwargs):
+        """
+        Initialize the MazeRouter object.
 
-    def __repr__(self):
-        """String representation for debugging."""
-        return f"WeightedTile(tile={self.tile}, cost={self.cost})"
+        Args:
+            grid (Grid): The grid object representing the routing area.
+            backend (str, optional): The search backend, "bfs" or "lee". Defaults to config.MAZE_BACKEND.
+            kwargs: Router options (net_engine, global_router).
+
+        Raises:
+            ValueError: If the backend name is unknown.
+        """
+        super().__init__(grid, **kwargs)
+        backend = backend or config.MAZE_BACKEND
+        if backend not in MazeRouter.BACKENDS:
+            raise ValueError(f"Unknown maze backend '{backend}', expected one of {list(MazeRouter.BACKENDS)}")
+        self.__lee = LeeEngine() if backend == "lee" else None
+
+    def is_weighted(self):
+        return False 
     
+    def name(self): 
+        return "Maze Router"
+
+    def search(self, sources, targets, show_update=False):
+        """
+        Search from a set of sources to the closest of a set of targets using BFS (Breadth-First Search).
+
+        Args:
+            sources (Iterable[int] | dict[int, int]): The node ids the path may start from,
+                optionally mapped to the cost they are seeded with.
+            targets (set[int]): The node ids the path may end at.
+            show_update (bool, optional): Whether to show graphical updates. Defaults to False.
+
+        Returns:
+            list[int]: The node ids of the calculated path, or an empty list if no path is found.
+        """
+        if self.__lee is not None:
+            return self.__lee.search(self, sources, targets, show_update)
+
+        grid = self._grid
+        state = grid.model.state_view
+        workspace = self.workspace()
+        generation = workspace.reset()
+        stamp = workspace.stamp_view
+        depth = workspace.cost_view
+        parent = workspace.parent_view
+        region = self._region
+        observer = self._observer
+
+        # Sources seeded deeper than 0 join the wavefront once it reaches their depth
+        seeds = sorted(Router.seeds(sources), key=lambda seed: seed[1], reverse=True)
+        queue = deque()  # BFS uses a queue to explore the grid
+
+        while queue or seeds:
+            threshold = depth[queue[0]] if queue else seeds[-1][1]
+            while seeds and seeds[-1][1] <= threshold:
+                start, seed = seeds.pop()
+                if stamp[start] != generation:
+                    queue.appendleft(start)
+                    workspace.visit(start, seed)  # To track the path
+
+            current = queue.popleft()  # Pop the first element from the queue
+
+            if current in targets:
+                # Reconstruct path when destination is found
+                if observer is not None:
+                    observer.finished()
+                path = self.reconstruct_path(current, show_update)
+                return path
+
+            for neighbor in grid.neighbors(current):
+                # Skip barriers, visited tiles and tiles outside the region
+                if stamp[neighbor] != generation and state[neighbor] != BARRIER and (region is None or region[neighbor]):
+                    queue.append(neighbor)
+                    workspace.visit(neighbor, depth[current] + 1, current)
+                    if observer is not None:
+                        observer.opened(neighbor)
+
+            if show_update:
+                self.update()
+
+            # Sources are never reported as closed
+            if observer is not None and parent[current] != NO_PARENT:
+                observer.closed(current)
+
+        if observer is not None:
+            observer.finished()
+        return []  # Return an empty list if no path is found
+
+
+
 class DijkstraRouter(Router):
     """
     Router implementation using Dijkstra's algorithm with layer transition cost.
     """
 
-    def __init__(self, grid):
+    def __init__(self, grid, **kwargs):
         """
         Initialize the DijkstraRouter object.
 
         Args:
             grid (Grid): The grid object representing the routing area.
+            kwargs: Router options (queue_engine, net_engine).
         """
-        super().__init__(grid)
+        super().__init__(grid, **kwargs)
 
 
     
@@ -258,87 +881,82 @@ class DijkstraRouter(Router):
         """
         return "Dijkstra Router"
 
-    def route(self, start: Tile, end: Tile, show_update=False):
+    def search(self, sources, targets, show_update=False):
         """
-        Route between two points using Dijkstra's algorithm with layer transition cost.
+        Search from a set of sources to the closest of a set of targets using Dijkstra's algorithm
+        with layer transition cost.
 
         Args:
-            start (Tile): The starting tile.
-            end (Tile): The destination tile.
+            sources (Iterable[int] | dict[int, int]): The node ids the path may start from,
+                optionally mapped to the cost they are seeded with.
+            targets (set[int]): The node ids the path may end at.
             show_update (bool, optional): Whether to show graphical updates. Defaults to False.
 
         Returns:
-            list[Tile]: The calculated path, or an empty list if no path is found.
+            list[int]: The node ids of the calculated path, or an empty list if no path is found.
         """
-        # Min-heap for Dijkstra's algorithm (priority queue)
-        open_set = []
-        heapq.heappush(open_set, WeightedTile(start, 0))  # Push the start tile with a cost of 0
-
-        # Dictionaries to track the shortest cost and the path
-        cost = {start: 0}
-        came_from = {start: None}
-
-        # Mark the start tile as open
-        start.set_open_state()
+        grid = self._grid
+        model = grid.model
+        state = model.state_view
+        workspace = self.workspace()
+        generation = workspace.reset()
+        stamp = workspace.stamp_view
+        cost = workspace.cost_view
+        closed = workspace.closed_view
+        parent = workspace.parent_view
+        node_costs = self._node_costs
+        region = self._region
+        observer = self._observer
+
+        # Priority queue keyed by the path cost
+        open_set = self.priority_queue()
+        for start, seed in Router.seeds(sources):
+            if stamp[start] != generation or seed < cost[start]:
+                open_set.push(seed, start)  # Push every start tile with its seed cost
+                workspace.visit(start, seed)
 
         while open_set:
-            current_weighted_tile = heapq.heappop(open_set)  # Pop the tile with the smallest cost
-            current = current_weighted_tile.tile
-            current_cost = current_weighted_tile.cost
+            current_cost, current = open_set.pop()  # Pop the tile with the smallest cost
+
+            # Skip queue entries of tiles that were already settled through a cheaper path
+            if closed[current] == generation:
+                continue
+            closed[current] = generation
 
             # If we've reached the destination, reconstruct the path
-            if current == end:
-                print(f"Current Cost at position : {end.get_position()} = {current_weighted_tile.cost}")
-                self._grid.idlize_tiles()
-                path = self.reconstruct_path(came_from, current, show_update)
+            if current in targets:
+                if observer is not None:
+                    observer.finished()
+                path = self.reconstruct_path(current, show_update)
                 return path
 
-            for neighbor in current.neighbors:
-                # If the neighbor is not visited and is not a metal tile (blocked)
-                if neighbor not in came_from and neighbor.state != TileState.barrier:
-                    # Calculate the cost to move to the neighbor tile
-                    transition_cost = 1
-                    if current.layer.index != neighbor.layer.index:
-                        transition_cost =  config.VIA_COST  # Add higher cost for layer transition
+            for neighbor in grid.neighbors(current):
+                if closed[neighbor] == generation or state[neighbor] == BARRIER or (region is not None and not region[neighbor]):
+                    continue
 
-                    new_cost = current_cost + transition_cost
+                # Calculate the cost to move to the neighbor tile
+                transition_cost = 1
+                if model.layer_index(current) != model.layer_index(neighbor):
+                    transition_cost =  config.VIA_COST  # Add higher cost for layer transition
 
-                    # If the new cost is cheaper, update it and push to the priority queue
-                    if neighbor not in cost or new_cost < cost[neighbor]:
-                        cost[neighbor] = new_cost
-                        came_from[neighbor] = current
-                        heapq.heappush(open_set, WeightedTile(neighbor, new_cost))  # Store WeightedTile object
-                        neighbor.set_open_state()
+                new_cost = current_cost + transition_cost
+                if node_costs is not None:
+                    new_cost += node_costs[neighbor]
+
+                # If the new cost is cheaper, update it and push to the priority queue
+                if stamp[neighbor] != generation or new_cost < cost[neighbor]:
+                    workspace.visit(neighbor, new_cost, current)
+                    open_set.push(new_cost, neighbor)
+                    if observer is not None:
+                        observer.opened(neighbor)
 
             if show_update:
                 self.update()
 
-            # Mark the current tile as closed (visited)
-            current.set_closed_state()
+            # Report the current tile as closed (visited), sources are never reported
+            if observer is not None and parent[current] != NO_PARENT:
+                observer.closed(current)
 
+        if observer is not None:
+            observer.finished()
         return []  # Return an empty list if no path is found
-
-    def reconstruct_path(self, came_from, current, show_update=False) -> list[Tile]:
-        """
-        Reconstruct the path from a dictionary of visited tiles.
-
-        Args:
-            came_from (dict): Dictionary mapping tiles to their predecessors.
-            current (Tile): The end tile of the path.
-            show_update (bool, optional): Whether to show updates during reconstruction. Defaults to False.
-
-        Returns:
-            list[Tile]: The reconstructed path.
-        """
-        path = [current]
-        while current in came_from and came_from[current] is not None:
-            current = came_from[current]
-            path.append(current)
-            if show_update:
-                self.update()
-        path.reverse()  # Reverse to get the path from start to end
-        return path
-
-    def update(self):
-        """Update the graphical display."""
-        Graphics.update()
\ No newline at end of file
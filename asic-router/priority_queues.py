@@ -0,0 +1,202 @@
+import heapq
+
+
+class PriorityQueueEngine:
+    """
+    Base class for the priority queues used by the weighted routers.
+
+    Entries are (priority, node) pairs. Queues never update entries in place;
+    routers push a node again when they find a cheaper path and skip the stale
+    entries when they are popped.
+    """
+
+    def push(self, priority, node: int) -> None:
+        """
+        Adds a node to the queue.
+
+        Args:
+            priority (int | float): The priority of the node, lower is popped first.
+            node (int): The node id.
+
+        Raises:
+            NotImplementedError: Must be implemented in a subclass.
+        """
+        raise NotImplementedError
+
+    def pop(self) -> tuple:
+        """
+        Removes and returns the entry with the lowest priority.
+
+        Returns:
+            tuple: The (priority, node) pair.
+
+        Raises:
+            NotImplementedError: Must be implemented in a subclass.
+        """
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """
+        Removes all entries from the queue.
+
+        Raises:
+            NotImplementedError: Must be implemented in a subclass.
+        """
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+
+class BinaryHeapQueue(PriorityQueueEngine):
+    """
+    Binary heap queue built on heapq. Accepts any comparable priority, including floats.
+
+    Ties are broken in insertion order, like the original PriorityQueue based A*.
+    """
+
+    def __init__(self) -> None:
+        self.__heap = []
+        self.__count = 0
+
+    def push(self, priority, node: int) -> None:
+        self.__count += 1
+        heapq.heappush(self.__heap, (priority, self.__count, node))
+
+    def pop(self) -> tuple:
+        priority, _, node = heapq.heappop(self.__heap)
+        return priority, node
+
+    def clear(self) -> None:
+        self.__heap.clear()
+        self.__count = 0
+
+    def __len__(self) -> int:
+        return len(self.__heap)
+
+
+class BucketQueue(PriorityQueueEngine):
+    """
+    Dial's bucket queue for small non-negative integer priorities.
+
+    Every priority value owns a plain list of nodes and a cursor tracks the
+    lowest non-empty bucket. With unit and via edge costs the priorities of a
+    search only grow by a few steps at a time, so push and pop are O(1) and no
+    tuple or wrapper object is allocated per entry. Nodes with equal priority
+    are popped last-in first-out, which favours the most recently extended path.
+    """
+
+    def __init__(self) -> None:
+        self.__buckets: list[list[int]] = []
+        self.__cursor = 0
+        self.__size = 0
+
+    def push(self, priority: int, node: int) -> None:
+        buckets = self.__buckets
+        if priority >= len(buckets):
+            buckets.extend([] for _ in range(priority + 1 - len(buckets)))
+        buckets[priority].append(node)
+        if priority < self.__cursor:
+            self.__cursor = priority
+        self.__size += 1
+
+    def pop(self) -> tuple:
+        if not self.__size:
+            raise IndexError("pop from an empty bucket queue")
+        buckets = self.__buckets
+        cursor = self.__cursor
+        while not buckets[cursor]:
+            cursor += 1
+        self.__cursor = cursor
+        self.__size -= 1
+        return cursor, buckets[cursor].pop()
+
+    def clear(self) -> None:
+        for bucket in self.__buckets:
+            bucket.clear()
+        self.__cursor = 0
+        self.__size = 0
+
+    def __len__(self) -> int:
+        return self.__size
+
+
+class RadixHeap(PriorityQueueEngine):
+    """
+    Radix heap for monotone non-negative integer priorities.
+
+    Entries are grouped by the highest bit in which their priority differs from
+    the last popped priority. Popping only redistributes the first non-empty
+    bucket, so each entry moves at most once per bit of the priority range.
+
+    Raises:
+        ValueError: If a priority lower than the last popped one is pushed.
+    """
+
+    def __init__(self) -> None:
+        self.__buckets: list[list[tuple[int, int]]] = [[] for _ in range(65)]
+        self.__last = 0
+        self.__size = 0
+
+    def push(self, priority: int, node: int) -> None:
+        if priority < self.__last:
+            raise ValueError("RadixHeap priorities must be monotone")
+        self.__buckets[(priority ^ self.__last).bit_length()].append((priority, node))
+        self.__size += 1
+
+    def pop(self) -> tuple:
+        if not self.__size:
+            raise IndexError("pop from an empty radix heap")
+        buckets = self.__buckets
+        if not buckets[0]:
+            index = 1
+            while not buckets[index]:
+                index += 1
+            entries = buckets[index]
+            last = min(entries)[0]
+            for entry in entries:
+                buckets[(entry[0] ^ last).bit_length()].append(entry)
+            entries.clear()
+            self.__last = last
+        self.__size -= 1
+        return buckets[0].pop()
+
+    def clear(self) -> None:
+        for bucket in self.__buckets:
+            bucket.clear()
+        self.__last = 0
+        self.__size = 0
+
+    def __len__(self) -> int:
+        return self.__size
+
+
+# Priority queue engines selectable by name
+PRIORITY_QUEUES = {
+    "heap": BinaryHeapQueue,
+    "bucket": BucketQueue,
+    "radix": RadixHeap,
+}
+
+
+def make_priority_queue(engine) -> PriorityQueueEngine:
+    """
+    Creates a priority queue engine.
+
+    Args:
+        engine (str | type[PriorityQueueEngine]): The engine name from PRIORITY_QUEUES or an engine class.
+
+    Returns:
+        PriorityQueueEngine: A new, empty queue.
+
+    Raises:
+        ValueError: If the engine name is unknown.
+    """
+    if isinstance(engine, str):
+        if engine not in PRIORITY_QUEUES:
+            raise ValueError(f"Unknown priority queue engine '{engine}', expected one of {list(PRIORITY_QUEUES)}")
+        engine = PRIORITY_QUEUES[engine]
+    return engine()
@@ -0,0 +1,309 @@
+import math
+import time
+
+import numpy as np
+import pygame
+
+import colors
+import config
+from config import SCREEN_HEIGHT, SCREEN_WIDTH, layer_color_map
+from grid_model import BARRIER, TileType
+from initializer import Initializer
+from layer_surfaces import LayerSurfaces
+from viewport import Viewport
+
+
+class RenderScheduler:
+    """
+    Redraws the simulator window at most config.RENDER_FPS times per second.
+
+    Searches ask for a redraw after every expansion. Frames are spaced so that
+    drawing takes at most config.RENDER_BUDGET of the time, and the scheduler coalesces
+    these requests: between two frames the grid is not looked at, and a frame
+    compares the paint, states and types of the tiles in view with the
+    previous frame to find the tiles that changed. The window shows the
+    current layer through a Viewport that can zoom and pan. Its tiles are
+    kept drawn in an off-screen surface (LayerSurfaces), where only the
+    changed tiles are drawn again; a frame blits it into the cells that
+    changed, marks the vias of the layers above and below, and pushes those
+    cells to the screen with pygame.display.update(rects). The pins of all
+    layers are drawn last in every frame, so their labels stay on top of the
+    cells redrawn around them.
+
+    The whole view is recomposed on the first frame, after invalidate, when
+    the view moves, zooms or changes layer, and when more than
+    config.RENDER_FULL_REDRAW of the cells in view changed. Once tiles are
+    narrower than config.VIEW_DETAIL_CELL pixels, the layer is drawn as a
+    heatmap of the share of used tiles instead, whose cost depends on the
+    tiles in view but not on how many of them are wired.
+
+    Attributes:
+        frames (int): The number of frames drawn.
+        full_frames (int): The number of frames that redrew the whole window.
+        skipped (int): The number of refresh requests coalesced into a later frame.
+    """
+
+    def __init__(self, grid, ui, fps: int = None, background=colors.SLATE_GRAY, line_color=config.GRID_COLOR) -> None:
+        """
+        Initializes the scheduler, with a view of the whole grid.
+
+        Args:
+            grid (Grid): The grid shown in the window.
+            ui (UI): The user interface drawn over the grid.
+            fps (int, optional): The most frames per second. Defaults to config.RENDER_FPS.
+            background (tuple[int, int, int], optional): The window background color. Defaults to colors.SLATE_GRAY.
+            line_color (tuple[int, int, int], optional): The color of the grid lines. Defaults to config.GRID_COLOR.
+        """
+        model = grid.model
+        self.__grid = grid
+        self.__ui = ui
+        self.__period = 1 / (fps or config.RENDER_FPS)
+        self.__background = background
+        self.__line_color = line_color
+        self.__next_frame = float("-inf")
+        self.__invalid = True
+        self.__ui_revision = None
+        self.__viewport = Viewport(model.rows, model.cols, SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.__view_revision = None
+        self.__layers = LayerSurfaces(grid, self.__viewport, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.__layer = 0
+        self.__via_hints = config.VIEW_VIA_HINTS
+
+        self.__arrays = (model.paint, model.states, model.types)
+        self.__shown = tuple(array.copy() for array in self.__arrays)
+        self.frames = 0
+        self.full_frames = 0
+        self.skipped = 0
+
+    @property
+    def viewport(self) -> Viewport:
+        """
+        Returns the view of the grid shown in the window.
+        """
+        return self.__viewport
+
+    @property
+    def layer(self) -> int:
+        """
+        Returns the index of the layer shown.
+        """
+        return self.__layer
+
+    def set_layer(self, layer: int):
+        """
+        Shows another layer.
+
+        Args:
+            layer (int): The layer index.
+        """
+        layer = min(max(layer, 0), self.__grid.model.layer_count - 1)
+        if layer != self.__layer:
+            self.__layer = layer
+            self.__invalid = True
+
+    @property
+    def via_hints(self) -> bool:
+        """
+        Returns whether the vias of the layers above and below the shown one are marked.
+        """
+        return self.__via_hints
+
+    def set_via_hints(self, enabled: bool):
+        """
+        Shows or hides the vias of the layers above and below the shown one.
+
+        Args:
+            enabled (bool): Whether the vias are marked.
+        """
+        self.__via_hints = enabled
+        self.__invalid = True
+
+    def invalidate(self):
+        """
+        Makes the next frame redraw the whole window, e.g. after drawing straight into it.
+        """
+        self.__invalid = True
+
+    def refresh(self) -> bool:
+        """
+        Draws a frame if the time for the next one has come.
+
+        Returns:
+            bool: Whether a frame was drawn.
+        """
+        if time.perf_counter() < self.__next_frame:
+            self.skipped += 1
+            return False
+        self.flush()
+        return True
+
+    def flush(self):
+        """
+        Draws a frame now, showing every change made since the last frame.
+        """
+        start = time.perf_counter()
+        self.frames += 1
+        self.__draw_frame()
+        self.__next_frame = start + max(self.__period, (time.perf_counter() - start) / config.RENDER_BUDGET)
+
+    def __draw_frame(self):
+        """
+        Draws the changes made since the last frame, or the whole window when needed.
+        """
+
+        viewport = self.__viewport
+        if viewport.revision != self.__view_revision:
+            self.__view_revision = viewport.revision
+            self.__invalid = True
+
+        # Tiles of the layers shown, hints included, that changed in view
+        low, high = self.__shown_layers()
+        min_row, max_row, min_col, max_col = viewport.window()
+        view = np.s_[low:high, min_row:max_row, min_col:max_col]
+        changed = np.zeros((high - low, max_row - min_row, max_col - min_col), dtype=bool)
+        for current, shown in zip(self.__arrays, self.__shown):
+            changed |= current[view] != shown[view]
+            shown[view] = current[view]
+
+        if not viewport.detailed:
+            if self.__invalid or self.__ui.revision != self.__ui_revision or changed.any():
+                self.__draw_heatmap()
+            return
+
+        for layer in range(low, high):
+            self.__layers.update(layer, changed[layer - low])
+
+        cells = changed.any(axis=0)
+        if self.__invalid or np.count_nonzero(cells) > config.RENDER_FULL_REDRAW * cells.size:
+            self.__draw_window()
+        else:
+            self.__draw_cells(cells)
+
+    def __shown_layers(self) -> tuple[int, int]:
+        """
+        Returns the layers whose tiles are shown: the current one and, in detail with via hints, its neighbors.
+
+        Returns:
+            tuple[int, int]: The first layer and the layer after the last.
+        """
+        if not self.__via_hints or not self.__viewport.detailed:
+            return self.__layer, self.__layer + 1
+        return max(0, self.__layer - 1), min(self.__grid.model.layer_count, self.__layer + 2)
+
+    def __draw_window(self):
+        """
+        Redraws the whole window with the tiles in view.
+        """
+        self.full_frames += 1
+        self.__invalid = False
+        self.__ui_revision = self.__ui.revision
+        win = Initializer.win
+        viewport = self.__viewport
+        win.fill(self.__background)
+        self.__ui.draw_grid(viewport, color=self.__line_color)
+        self.__layers.blit(win, self.__layer)
+        self.__draw_hints()
+        self.__grid.draw_pins(viewport.nodes(self.__grid.model, range(self.__grid.model.layer_count)), viewport=viewport)
+        self.__ui.draw_ui()
+        pygame.display.update()
+
+    def __draw_cells(self, cells: np.ndarray):
+        """
+        Redraws the given cells from the layer surface, the pins and, when needed, the user interface.
+
+        Args:
+            cells (np.ndarray): (rows, cols) boolean mask over the tiles in view of the cells that changed.
+        """
+        win = Initializer.win
+        viewport = self.__viewport
+        min_row, _, min_col, _ = viewport.window()
+        rects = []
+        for row, col in (np.argwhere(cells) + (min_row, min_col)).tolist():
+            rect = pygame.Rect(viewport.rect(row, col))
+            win.fill(self.__background, rect)
+            self.__ui.draw_grid_cell(viewport, row, col, color=self.__line_color)
+            self.__layers.blit(win, self.__layer, rect)
+            rects.append(rect)
+        if rects:
+            self.__draw_hints(cells)
+
+        model = self.__grid.model
+        for rect in self.__grid.draw_pins(viewport.nodes(model, range(model.layer_count)), viewport=viewport):
+            if rect.collidelist(rects) != -1:
+                rects.append(rect)
+
+        panels = self.__ui.panels()
+        if self.__ui.revision != self.__ui_revision or any(panel.collidelist(rects) != -1 for panel in panels):
+            self.__ui_revision = self.__ui.revision
+            self.__ui.draw_ui()
+            rects.extend(panels)
+
+        if rects:
+            pygame.display.update(rects)
+
+    def __draw_hints(self, cells: np.ndarray = None):
+        """
+        Marks the tiles in view where the layer above or below has a via or contact.
+
+        Args:
+            cells (np.ndarray, optional): (rows, cols) boolean mask over the tiles in view of the tiles to mark.
+                Defaults to all tiles in view.
+        """
+        low, high = self.__shown_layers()
+        if high - low < 2:
+            return
+
+        viewport = self.__viewport
+        min_row, max_row, min_col, max_col = viewport.window()
+        types = self.__grid.model.types[:, min_row:max_row, min_col:max_col]
+        metal = TileType.metal.value
+        hints = np.zeros(types.shape[1:], dtype=bool)
+        for layer in range(low, high):
+            if layer != self.__layer:
+                hints |= types[layer] != metal
+        hints &= types[self.__layer] == metal
+        if cells is not None:
+            hints &= cells
+
+        win = Initializer.win
+        inset = int(viewport.cell) // 4
+        for row, col in (np.argwhere(hints) + (min_row, min_col)).tolist():
+            rect = pygame.Rect(viewport.rect(row, col)).inflate(-2 * inset, -2 * inset)
+            pygame.draw.rect(win, colors.SILVER_VIA, rect, 1)
+
+    def __draw_heatmap(self):
+        """
+        Redraws the whole window with the share of used tiles of the current layer, per block of tiles.
+        """
+        self.full_frames += 1
+        self.__invalid = False
+        self.__ui_revision = self.__ui.revision
+        win = Initializer.win
+        viewport = self.__viewport
+        model = self.__grid.model
+        win.fill(self.__background)
+
+        min_row, max_row, min_col, max_col = viewport.window()
+        if max_row > min_row and max_col > min_col:
+            view = np.s_[self.__layer, min_row:max_row, min_col:max_col]
+            used = (model.states[view] == BARRIER) | (model.paint[view] != 0)
+
+            # One pixel or more per block of tiles, the used tiles of each block counted with strided sums
+            block = max(1, math.ceil(1 / viewport.cell))
+            rows, cols = used.shape
+            used = np.pad(used, ((0, -rows % block), (0, -cols % block))).view(np.uint8)
+            counts = sum(used[i::block].astype(np.uint16) for i in range(block))
+            counts = sum(counts[:, i::block] for i in range(block))
+
+            background = np.array(self.__background, dtype=np.float64)
+            color = np.array(layer_color_map[self.__layer % len(layer_color_map)], dtype=np.float64)
+            shades = np.linspace(0, 1, block * block + 1)[:, None]
+            image = (background + (color - background) * shades).astype(np.uint8)[counts]
+            size = (max(1, round(used.shape[0] * viewport.cell)), max(1, round(used.shape[1] * viewport.cell)))
+            heatmap = pygame.transform.scale(pygame.surfarray.make_surface(image), size)
+            win.blit(heatmap, (round(min_row * viewport.cell) + viewport.x, round(min_col * viewport.cell) + viewport.y))
+
+        extent = (viewport.x, viewport.y, round(model.rows * viewport.cell), round(model.cols * viewport.cell))
+        pygame.draw.rect(win, self.__line_color, extent, 1)
+        self.__ui.draw_ui()
+        pygame.display.update()
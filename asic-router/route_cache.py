@@ -0,0 +1,216 @@
+from collections import OrderedDict
+
+import numpy as np
+
+import config
+
+
+class CachedRoute:
+    """
+    A cached search result and the obstacle map it was found on.
+
+    Attributes:
+        path (list[int]): The node ids of the path, empty if no path was found.
+        version (int): The barrier version the result was last known valid at.
+        barrier_hash (int): The barrier hash at that version.
+        bounds (tuple[int, int, int, int] | None): Rows and columns (min_row, max_row, min_col, max_col),
+            on all layers, where a barrier change can alter the result; None for the whole grid.
+        size (int): The number of nodes held by the entry, path and key included.
+        info (object): What the search left on the router besides the path, see Router.search_info.
+    """
+
+    def __init__(self, path, version, barrier_hash, bounds, size, info=None) -> None:
+        self.path = path
+        self.version = version
+        self.barrier_hash = barrier_hash
+        self.bounds = bounds
+        self.size = size
+        self.info = info
+
+
+class RouteCache:
+    """
+    LRU cache of search results, validated against the barrier map of the grid.
+
+    A result is reused as is when the barrier hash equals the one it was found
+    on, so replaying the same routes on the same obstacle map hits the cache.
+    Otherwise the barrier changes since the result was stored are read from
+    the model's journal, and the result only stays valid if none of them lies
+    in its bounds: the area a path at most as costly as the cached one can
+    reach, which is the bounding box of the end points grown by half the cost
+    not explained by their distance. Failed searches are invalidated by any
+    change.
+
+    The memory cap counts the nodes held by all entries; the least recently
+    used entries are dropped first. The key only holds the end points of a
+    search, the router clears the cache when its search settings change.
+    """
+
+    def __init__(self, max_nodes: int = None) -> None:
+        """
+        Initializes an empty cache.
+
+        Args:
+            max_nodes (int, optional): The most nodes held over all entries. Defaults to config.ROUTE_CACHE_NODES.
+        """
+        self.__max_nodes = config.ROUTE_CACHE_NODES if max_nodes is None else max_nodes
+        self.__entries: OrderedDict = OrderedDict()
+        self.__nodes = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+
+    @staticmethod
+    def key(sources, targets) -> tuple:
+        """
+        Builds the cache key of a search.
+
+        Args:
+            sources (Iterable[int] | dict[int, int]): The search sources, optionally mapped to their seed cost.
+            targets (set[int]): The search targets.
+
+        Returns:
+            tuple: A hashable key, independent of the order of the sources and targets.
+        """
+        if isinstance(sources, dict):
+            sources = frozenset(sources.items())
+        else:
+            sources = frozenset(sources)
+        return sources, frozenset(targets)
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    @property
+    def nodes(self) -> int:
+        """
+        Returns the number of nodes held by all entries.
+        """
+        return self.__nodes
+
+    def clear(self):
+        """
+        Drops all entries.
+        """
+        self.__entries.clear()
+        self.__nodes = 0
+
+    def get(self, model, key):
+        """
+        Looks up a search result that is still valid on the current barrier map.
+
+        Args:
+            model (GridModel): The grid model searched.
+            key (tuple): The key from RouteCache.key.
+
+        Returns:
+            tuple[list[int], object] | None: A copy of the cached path, possibly empty, and the search
+                info stored with it, or None on a miss.
+        """
+        entry = self.__entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        barrier_hash = model.barrier_hash
+        if entry.barrier_hash != barrier_hash and not self.__unchanged(model, entry):
+            self.__drop(key)
+            self.invalidated += 1
+            self.misses += 1
+            return None
+
+        entry.version = model.version
+        entry.barrier_hash = barrier_hash
+        self.__entries.move_to_end(key)
+        self.hits += 1
+        return list(entry.path), entry.info
+
+    def __unchanged(self, model, entry: CachedRoute) -> bool:
+        """
+        Checks that no barrier change since the entry was validated lies in its bounds.
+
+        Args:
+            model (GridModel): The grid model searched.
+            entry (CachedRoute): The cached result.
+
+        Returns:
+            bool: Whether the entry is still valid.
+        """
+        changes = model.changes_since(entry.version)
+        if changes is None:
+            return False
+        if not changes.size:
+            return True
+        if entry.bounds is None:
+            return False
+        min_row, max_row, min_col, max_col = entry.bounds
+        rows = changes % model.layer_size // model.cols
+        cols = changes % model.cols
+        inside = (rows >= min_row) & (rows <= max_row) & (cols >= min_col) & (cols <= max_col)
+        return not inside.any()
+
+    def put(self, model, key, sources, targets, path: list[int], info=None):
+        """
+        Stores a search result found on the current barrier map.
+
+        Args:
+            model (GridModel): The grid model searched.
+            key (tuple): The key from RouteCache.key.
+            sources (Iterable[int] | dict[int, int]): The search sources, optionally mapped to their seed cost.
+            targets (set[int]): The search targets.
+            path (list[int]): The path found, empty if none was found.
+            info (object, optional): The search info to restore on a hit. Defaults to None.
+        """
+        bounds = None
+        if path:
+            seeds = sources if isinstance(sources, dict) else {}
+            cost = seeds.get(path[0], 0) + RouteCache.cost(model, path)
+
+            ends = np.fromiter(key[0] if not seeds else seeds.keys(), dtype=np.int64)
+            goals = np.fromiter(key[1], dtype=np.int64)
+            rows, cols = ends % model.layer_size // model.cols, ends % model.cols
+            goal_rows, goal_cols = goals % model.layer_size // model.cols, goals % model.cols
+            distance = int((np.abs(rows[:, None] - goal_rows) + np.abs(cols[:, None] - goal_cols)).min())
+            slack = (cost - distance + 1) // 2
+            all_rows, all_cols = np.concatenate((rows, goal_rows)), np.concatenate((cols, goal_cols))
+            bounds = (int(all_rows.min()) - slack, int(all_rows.max()) + slack,
+                      int(all_cols.min()) - slack, int(all_cols.max()) + slack)
+
+        if key in self.__entries:
+            self.__drop(key)
+        size = len(path) + len(key[0]) + len(key[1])
+        self.__entries[key] = CachedRoute(list(path), model.version, model.barrier_hash, bounds, size, info)
+        self.__nodes += size
+        while self.__nodes > self.__max_nodes and self.__entries:
+            self.__drop(next(iter(self.__entries)))
+
+    @staticmethod
+    def cost(model, path: list[int]) -> int:
+        """
+        Returns the routing cost of a path: one per step and VIA_COST per via.
+
+        Args:
+            model (GridModel): The grid model of the path.
+            path (list[int]): The node ids of the path.
+
+        Returns:
+            int: The cost of the path.
+        """
+        layers = np.fromiter(path, dtype=np.int64) // model.layer_size
+        vias = int(np.count_nonzero(layers[1:] != layers[:-1]))
+        return (len(path) - 1 - vias) + vias * config.VIA_COST
+
+    def __drop(self, key):
+        """
+        Removes an entry.
+
+        Args:
+            key (tuple): The key of the entry.
+        """
+        self.__nodes -= self.__entries.pop(key).size
+
+    def __repr__(self):
+        return (
+            f"RouteCache(entries={len(self.__entries)}, nodes={self.__nodes}, hits={self.hits}, "
+            f"misses={self.misses}, invalidated={self.invalidated})"
+        )
@@ -0,0 +1,40 @@
+class RouteDisplay:
+    """
+    Shows the progress of fan-out routing to the user.
+
+    Routers report through a display instead of drawing themselves, so the
+    routing core runs without a window. The base class shows nothing and is
+    the display of headless runs; the simulator installs a UIDisplay.
+    """
+
+    def status(self, text: str) -> None:
+        """
+        Shows a status message.
+
+        Args:
+            text (str): The message.
+        """
+
+    def connection(self, grid, path: list[int], cost: int) -> None:
+        """
+        Shows the straight connection a tree branch makes between its end points.
+
+        Args:
+            grid (Grid): The routed grid.
+            path (list[int]): The node ids of the branch.
+            cost (int): The routing cost of the branch.
+        """
+
+    def path(self, grid, nodes: list[int]) -> None:
+        """
+        Shows the tiles of a routed tree.
+
+        Args:
+            grid (Grid): The routed grid.
+            nodes (list[int]): The node ids of the tree so far.
+        """
+
+    def refresh(self) -> None:
+        """
+        Redraws the display after the grid changed.
+        """
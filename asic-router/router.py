@@ -1,13 +1,19 @@
-import heapq
-from queue import PriorityQueue
-from config import LAYERS
+import numpy as np
+
 import config
-from graphics import Graphics
+from config import layer_color_map
+from grid_model import NO_NET
 from tile import Tile, TileState, TileType
 from grid import Grid
-from collections import deque
-
-from ui import UI
+from heuristics import Heuristic, make_heuristic
+from global_router import GlobalRouter
+from net_engines import NetEngine, NetResult, SequentialNetEngine
+from priority_queues import PriorityQueueEngine, make_priority_queue
+from search_observer import GridPainter, SearchObserver
+from route_cache import RouteCache
+from route_display import RouteDisplay
+from search_window import SearchWindow
+from search_workspace import SearchWorkspace
 
 class Router:
     """
@@ -16,29 +22,326 @@ class Router:
     Attributes:
         _grid (Grid): The grid representing the layout of the routing area.
         _show_updates (bool): Whether to display graphical updates during routing.
+        _workspace (SearchWorkspace): Reusable search buffers, allocated on first use.
+        _queue_engine (str | type[PriorityQueueEngine]): The priority queue engine of weighted searches.
+        _net_engine (NetEngine): The engine building the trees of multi-pin nets.
+        _node_costs (memoryview): Optional extra cost of entering each node, used by weighted searches.
+        _region (memoryview): Optional mask of the nodes searches may enter, None for the whole grid.
+        _global_router (GlobalRouter): Optional coarse router giving each fan-out net a corridor.
+        _observer (SearchObserver): Receives the search progress for display, None to search silently.
+        _heuristic (Heuristic): The estimate of the A* based searches.
+        _window (SearchWindow): Optional window routing searches run in first, None to search the whole grid.
+        _route_cache (RouteCache): Optional cache of the routing search results, None to always search.
+        _display (RouteDisplay): Shows the routing progress, a RouteDisplay that shows nothing by default.
     """
 
-    def __init__(self, grid):
+    def __init__(self, grid, queue_engine=None, net_engine=None, global_router=None, heuristic=None, window=None,
+                 route_cache=None):
         """
         Initialize the Router object with a grid.
 
         Args:
             grid (Grid): The grid object representing the routing area.
+            queue_engine (str | type[PriorityQueueEngine], optional): Priority queue engine
+                of weighted searches. Defaults to config.PRIORITY_QUEUE.
+            net_engine (NetEngine, optional): The multi-pin engine used by fan_out_route.
+                Defaults to SequentialNetEngine.
+            global_router (GlobalRouter, optional): Coarse router restricting fan_out_route to a corridor.
+                Defaults to None, which searches the whole grid.
+            heuristic (str | Heuristic, optional): The estimate of the A* based searches.
+                Defaults to config.HEURISTIC.
+            window (SearchWindow, optional): The window route and the net engines search in first.
+                Defaults to a SearchWindow with the config settings, or None if config.WINDOW_MARGIN is None.
+            route_cache (RouteCache, optional): The cache of route and net engine search results.
+                Defaults to a RouteCache, or None if config.ROUTE_CACHE_NODES is None.
         """
         self._grid: Grid = grid
         self._show_updates = True
+        self._workspace: SearchWorkspace = None
+        self._queue_engine = queue_engine or config.PRIORITY_QUEUE
+        self._queue: PriorityQueueEngine = None
+        self._net_engine: NetEngine = net_engine or SequentialNetEngine()
+        self._node_costs: memoryview = None
+        self._region: memoryview = None
+        self._global_router: GlobalRouter = global_router
+        self._observer: SearchObserver = GridPainter(grid)
+        self._heuristic: Heuristic = make_heuristic(heuristic or config.HEURISTIC, grid)
+        if window is None and config.WINDOW_MARGIN is not None:
+            window = SearchWindow()
+        self._window: SearchWindow = window
+        if route_cache is None and config.ROUTE_CACHE_NODES is not None:
+            route_cache = RouteCache()
+        self._route_cache: RouteCache = route_cache
+        self._display: RouteDisplay = RouteDisplay()
         self.name()
 
     def is_weighted(self): 
         return NotImplementedError
 
-    def route(self, start, end):
+    @property
+    def grid(self) -> Grid:
+        """
+        Returns the grid the router works on.
+        """
+        return self._grid
+
+    @property
+    def net_engine(self) -> NetEngine:
+        """
+        Returns the engine that builds the trees of multi-pin nets.
+        """
+        return self._net_engine
+
+    def set_net_engine(self, engine: NetEngine):
+        """
+        Selects the engine that builds the trees of multi-pin nets.
+
+        Args:
+            engine (NetEngine): The net engine, e.g. SequentialNetEngine, PrimDijkstraEngine or OneSteinerEngine.
+        """
+        self._net_engine = engine
+
+    def set_node_costs(self, costs):
+        """
+        Sets an extra, non-negative cost for entering each node.
+
+        Weighted searches add it to the step and via costs, which keeps their
+        heuristics admissible. Unweighted searches ignore it.
+
+        Args:
+            costs (np.ndarray | None): Flat integer array indexed by node id, or None to clear it.
+        """
+        self._node_costs = None if costs is None else memoryview(costs.reshape(-1))
+
+    @property
+    def node_costs(self) -> memoryview:
+        """
+        Returns the extra cost of entering each node, None when there is none.
+        """
+        return self._node_costs
+
+    @property
+    def heuristic(self) -> Heuristic:
         """
-        Abstract method for routing between two points.
+        Returns the estimate used by the A* based searches.
+        """
+        return self._heuristic
+
+    def set_heuristic(self, heuristic):
+        """
+        Selects the estimate used by the A* based searches.
+
+        Args:
+            heuristic (str | Heuristic): A name from heuristics.HEURISTICS or a heuristic instance.
+        """
+        self._heuristic = make_heuristic(heuristic, self._grid)
+        self.clear_route_cache()
+
+    @property
+    def observer(self) -> SearchObserver:
+        """
+        Returns the observer of the searches, None if searches are not observed.
+        """
+        return self._observer
+
+    def set_observer(self, observer: SearchObserver):
+        """
+        Selects the observer that receives the progress of every search.
+
+        Searches keep their bookkeeping in the router's workspace, the observer is
+        only needed for display. Without one the grid is not written during a search.
+
+        Args:
+            observer (SearchObserver | None): The observer, e.g. GridPainter, or None.
+        """
+        self._observer = observer
+
+    @property
+    def region(self) -> memoryview:
+        """
+        Returns the mask of the nodes searches may enter, None when the whole grid is searched.
+        """
+        return self._region
+
+    def set_region(self, mask):
+        """
+        Restricts all searches to a region of the grid.
+
+        Sources are always expanded, every other node must lie inside the region.
+
+        Args:
+            mask (np.ndarray | None): Flat boolean array indexed by node id, or None to search the whole grid.
+        """
+        self._region = None if mask is None else memoryview(mask.reshape(-1))
+
+    @property
+    def window(self) -> SearchWindow:
+        """
+        Returns the window routing searches run in first, None if they search the whole grid.
+        """
+        return self._window
+
+    def set_window(self, window: SearchWindow):
+        """
+        Selects the window routing searches run in first.
+
+        Args:
+            window (SearchWindow | None): The window, or None to search the whole grid.
+        """
+        self._window = window
+        self.clear_route_cache()
+
+    @property
+    def route_cache(self) -> RouteCache:
+        """
+        Returns the cache of the routing search results, None if every search is run.
+        """
+        return self._route_cache
+
+    def set_route_cache(self, route_cache: RouteCache):
+        """
+        Selects the cache of the routing search results.
+
+        Args:
+            route_cache (RouteCache | None): The cache, or None to always search.
+        """
+        self._route_cache = route_cache
+
+    def clear_route_cache(self):
+        """
+        Drops the cached search results, needed whenever a setting changes the paths searches find.
+        """
+        if self._route_cache is not None:
+            self._route_cache.clear()
+
+    def search_info(self):
+        """
+        Returns what the last search left on the router besides its path, cached with the path.
+
+        Returns:
+            object: None, subclasses keep e.g. the bound of the search.
+        """
+        return None
+
+    def restore_search_info(self, info):
+        """
+        Restores what a search left on the router when its result is taken from the route cache.
+
+        Args:
+            info (object): The value search_info returned after the search.
+        """
+
+    @property
+    def display(self) -> RouteDisplay:
+        """
+        Returns the display the routing progress is shown on.
+        """
+        return self._display
+
+    def set_display(self, display: RouteDisplay):
+        """
+        Selects the display the routing progress is shown on.
+
+        Args:
+            display (RouteDisplay): The display, e.g. a UIDisplay, or a plain RouteDisplay to show nothing.
+        """
+        self._display = display
+
+    def set_global_router(self, global_router: GlobalRouter):
+        """
+        Selects the coarse router that gives fan-out nets their corridor.
+
+        Args:
+            global_router (GlobalRouter | None): The global router, or None to search the whole grid.
+        """
+        self._global_router = global_router
+
+    @staticmethod
+    def seeds(sources):
+        """
+        Normalizes search sources into (node, seed cost) pairs.
+
+        Args:
+            sources (Iterable[int] | dict[int, int]): Source nodes, optionally mapped to their seed cost.
+
+        Returns:
+            Iterable[tuple[int, int]]: The sources with their seed cost, 0 when none is given.
+        """
+        if isinstance(sources, dict):
+            return sources.items()
+        return ((source, 0) for source in sources)
+
+    def route(self, start, end, show_update=False):
+        """
+        Route between two points.
         
         Args:
-            start (Tile): The starting tile.
-            end (Tile): The destination tile.
+            start (int): The node id of the starting tile.
+            end (int): The node id of the destination tile.
+            show_update (bool, optional): Whether to show graphical updates. Defaults to False.
+
+        Returns:
+            list[int]: The node ids of the calculated path, or an empty list if no path is found.
+        """
+        return self.windowed_search([start], {end}, show_update)
+
+    def windowed_search(self, sources, targets, show_update=False):
+        """
+        Runs a search inside the router's search window, growing it until a path is found.
+
+        Without a window this is a plain search of the whole grid. Results are
+        taken from the route cache while the barriers around them are unchanged;
+        searches with node costs or a region are not cached.
+
+        Args:
+            sources (Iterable[int] | dict[int, int]): The node ids the path may start from,
+                optionally mapped to the cost they are seeded with.
+            targets (set[int]): The node ids the path may end at.
+            show_update (bool, optional): Whether to show graphical updates. Defaults to False.
+
+        Returns:
+            list[int]: The node ids of the calculated path, or an empty list if no path is found.
+        """
+        cache = self._route_cache
+        if cache is None or self._node_costs is not None or self._region is not None:
+            return self.__search_in_window(sources, targets, show_update)
+
+        model = self._grid.model
+        key = RouteCache.key(sources, targets)
+        cached = cache.get(model, key)
+        if cached is None:
+            path = self.__search_in_window(sources, targets, show_update)
+            cache.put(model, key, sources, targets, path, self.search_info())
+        else:
+            path, info = cached
+            self.restore_search_info(info)
+        return path
+
+    def __search_in_window(self, sources, targets, show_update=False):
+        """
+        Runs a search inside the router's search window, if any.
+        """
+        if self._window is None:
+            return self.search(sources, targets, show_update)
+        return self._window.search(self, sources, targets, show_update)
+
+    def search(self, sources, targets, show_update=False):
+        """
+        Abstract method for a multi-source, multi-target search.
+
+        Every source is seeded into the frontier, at cost 0 unless a seed cost is
+        given, and the search stops at the first target it settles, which is the
+        target closest to any source.
+
+        Args:
+            sources (Iterable[int] | dict[int, int]): The node ids the path may start from,
+                optionally mapped to the cost they are seeded with.
+            targets (set[int]): The node ids the path may end at.
+            show_update (bool, optional): Whether to show graphical updates. Defaults to False.
+
+        Returns:
+            list[int]: The node ids of the path from a source to the reached target,
+                or an empty list if no target is reachable.
 
         Raises:
             NotImplementedError: Must be implemented in a subclass.
@@ -53,189 +356,243 @@ class Router:
         """Disable graphical updates."""
         self._show_updates = False
 
-    def __remove_path(self, path: list[Tile]):
+    def __remove_path(self, path: list[int]):
         """
         Reset tiles in a given path.
 
         Args:
-            path (list[Tile]): The path to reset.
+            path (list[int]): The node ids of the path to reset.
         """
-        for tile in path:
-            tile.type = TileType.metal
-            tile.set_idle_state()
-            tile.reset()
-
-    def __calc_cost(self, path: list[Tile]) -> int:
+        model = self._grid.model
+        for node in path:
+            model.set_type(node, TileType.metal)
+            model.set_state(node, TileState.idle)
+            model.set_color(node, None)
+            model.set_owner(node, NO_NET)
+
+    def __calc_cost(self, path: list[int]) -> int:
         """
         Calculate the cost of a path.
 
         Args:
-            path (list[Tile]): The path to calculate the cost for.
+            path (list[int]): The node ids of the path to calculate the cost for.
 
         Returns:
-            int: The total cost of the path.
+            int: The total cost of the path, infinite for an empty (failed) path.
         """
+        if not path:
+            return float("inf")
+
         if not self.is_weighted(): 
             return len(path)
 
+        model = self._grid.model
         total_cost = 0
-        for i, tile in enumerate(path):
-            if i > 0:
-                if path[i - 1].layer.index != path[i].layer.index:
-                    total_cost += config.VIA_COST  # Layer switching penalty
-                else:
-                    total_cost += 1  # Regular tile traversal cost
+        for i in range(1, len(path)):
+            if model.layer_index(path[i - 1]) != model.layer_index(path[i]):
+                total_cost += config.VIA_COST  # Layer switching penalty
+            else:
+                total_cost += 1  # Regular tile traversal cost
         return total_cost
 
-    def __find_opt_path(self, paths: list[list[Tile]]) -> tuple[int, list[Tile]]:
+    def __build_path_tiles(self, path: list[int], net: int):
+        """
+        Set the type, state and owner of tiles in a path.
+
+        Args:
+            path (list[int]): The node ids of the path to process.
+            net (int): The net id the path belongs to.
+        """
+
+        if not path: 
+            return
+
+        model = self._grid.model
+        
+        if model.get_type(path[0]) == TileType.metal:
+            model.set_type(path[0], TileType.contact)
+        if model.get_type(path[-1]) == TileType.metal:
+            model.set_type(path[-1], TileType.contact)
+
+        for i, node in enumerate(path):
+            layer = model.layer_index(node)
+            if i > 0:
+                if layer != model.layer_index(path[i - 1]):
+                    model.set_type(node, TileType.via)
+                    model.set_type(path[i - 1], TileType.via)
+            model.set_state(node, TileState.barrier)
+            model.set_owner(node, net)
+            model.set_color(node, layer_color_map[layer % len(layer_color_map)])
+
+    def fan_out_route(self, start: Tile, ends: list[Tile]) -> NetResult:
         """
-        Find the optimal path with the lowest cost.
+        Route from a starting tile to multiple endpoints (fan-out).
+
+        The tree is built by the router's net engine and committed to the grid path by path.
 
         Args:
-            paths (list[list[Tile]]): A list of possible paths.
+            start (Tile): The starting tile.
+            ends (list[Tile]): List of endpoint tiles.
 
         Returns:
-            tuple[int, list[Tile]]: The index and the optimal path.
-        """
-        best_cost = float("inf")
-        if not len(paths):
-            return -1, []
-
-        best_path = paths[0]
-        best_index = 0
-        for i, p in enumerate(paths):
-            cost = self.__calc_cost(p)
-            if cost < best_cost:
-                best_cost = cost
-                best_path = p
-                best_index = i
-            else:
-                self.__remove_path(p)
+            NetResult: The routed tree with its wirelength and via count, or None if there was nothing to route.
+        """
+        model = self._grid.model
+        net = model.new_net()
+        source = start.node
+        sinks = [e.node for e in ends if e.node != source]
 
-        return best_index, best_path
+        if not sinks:
+            return None
 
+        self._display.status(f"{self.name()} is currently running : Trying to find the best route !")
+        if self._observer is not None:
+            self._observer.net_started(source, sinks)
+        result = self.__route_in_corridor(source, sinks)
+        if not result.paths:
+            self._display.status(f"{self.name()} could not reach any end of the route !")
+            return result
 
-    def __build_path_tiles(self, path: list[Tile], fan_out=False):
+        self.commit_net(source, sinks, result, net)
+
+        self._display.status(f"Done ! Wirelength : {result.wirelength} , Vias : {result.via_count}")
+        return result
+
+    def __route_in_corridor(self, source: int, sinks: list[int]) -> NetResult:
         """
-        Set the type and state of tiles in a path.
+        Build the tree of a net, inside its global routing corridor if a global router is set.
+
+        Nets that cannot be completed inside their corridor are routed again on the whole grid.
 
         Args:
-            path (list[Tile]): The path to process.
-            fan_out (bool, optional): Whether this is for a fan-out route. Defaults to False.
+            source (int): The node id of the net driver.
+            sinks (list[int]): The node ids of the net loads.
+
+        Returns:
+            NetResult: The routed tree.
+        """
+        if self._global_router is None:
+            return self._net_engine.route_net(self, source, sinks, self._show_updates)
+
+        route = self._global_router.route_net(source, sinks)
+        self.set_region(route.corridor)
+        try:
+            result = self._net_engine.route_net(self, source, sinks, self._show_updates)
+        finally:
+            self.set_region(None)
+            self._global_router.release(route)
+
+        reached = {node for path in result.paths for node in path}
+        if not reached.issuperset(sinks):
+            result = self._net_engine.route_net(self, source, sinks, self._show_updates)
+        return result
+
+    def commit_net(self, source: int, sinks: list[int], result: NetResult, net: int = None) -> int:
         """
+        Commit the tree of a net to the grid, turning its tiles into owned barriers.
 
-        if not path: 
-            return
+        Args:
+            source (int): The node id of the net driver.
+            sinks (list[int]): The node ids of the net loads.
+            result (NetResult): The routed tree of the net.
+            net (int, optional): The net id owning the tiles. Defaults to a new net id.
 
-        
-        if path[0].type == TileType.metal:
-            path[0].type = TileType.contact
-            path[0].state = TileState.barrier
-        if path[-1].type == TileType.metal:
-            path[-1].type = TileType.contact
-            path[-1].state = TileState.barrier
-
-        for i, tile in enumerate(path):
+        Returns:
+            int: The net id of the committed tree.
+        """
+        model = self._grid.model
+        display = self._display
+        observer = self._observer
+        if net is None:
+            net = model.new_net()
+
+        tree = []
+        for i, path in enumerate(result.paths):
+            if i > 0:
+                display.status("Constructing the minimum cost Fan out Route")
+                display.connection(self._grid, path, self.__calc_cost(path))
+            self.__build_path_tiles(path, net)
             if i > 0:
-                if path[i].layer.index != path[i - 1].layer.index:
-                    path[i].type = TileType.via
-                    path[i - 1].type = TileType.via
-            tile.state = TileState.barrier
-            tile.make_path()
+                model.set_type(path[0], TileType.contact)
+            if observer is not None:
+                observer.committed(path)
+            tree += path
+            display.path(self._grid, tree)
+            display.refresh()
+
+        # Mark contacts on top layer
+        top = model.layer_count - 2
+        for pin in [source, *sinks]:
+            row, col, _ = model.position(pin)
+            model.set_type(model.index(row, col, top), TileType.contact)
+            model.set_type(model.index(row, col, top - 1), TileType.metal)
+
+        for path in result.paths:
+            self.__build_path_tiles(path, net)
+
+        # The committed wires take tracks away from the GCells they cross
+        if self._global_router is not None:
+            self._global_router.update_capacity()
 
-    def fan_out_route(self, start: Tile, ends: list[Tile]):
+        return net
+
+    def remove_net(self, net: int):
         """
-        Route from a starting tile to multiple endpoints (fan-out).
+        Rip up every tile owned by a net, with the same reset as a removed path.
 
         Args:
-            start (Tile): The starting tile.
-            ends (list[Tile]): List of endpoint tiles.
-        
+            net (int): The net id to remove.
         """
-        
+        nodes = np.flatnonzero(self._grid.model.owners == net)
+        self.__remove_path([int(node) for node in nodes])
+        if self._global_router is not None:
+            self._global_router.update_capacity()
 
+    def workspace(self) -> SearchWorkspace:
+        """
+        Returns the search workspace of the router, allocating it on first use.
 
-        # Initialize grid neighbors
-        for grid_layer in self._grid.layers():
-            for row in grid_layer:
-                for tile in row:
-                    self._grid.update_tile_neighbors(tile)
-
-        paths = []
-        fan_out_list = []
-        temp_paths = []
-
-        UI.update.set_status(f"{self.name()} is currently running : Trying to find the best route !")
-        for i , end in enumerate(ends):
-            p = self.route(start, end, self._show_updates and i < 3)
-            temp_paths += [p]
-
-
-        i, first_opt_path = self.__find_opt_path(temp_paths)
-        most_close = ends[i]
-        Graphics.visualize_path(first_opt_path)
-        self._grid.idlize_tiles()
-        Graphics.update()
-
-        paths = [first_opt_path]
-        fan_out_list = [*first_opt_path]
-
-        for e in ends:
-            if e is not most_close:
-                all_paths = []
-                for v_start in fan_out_list:
-                    p = self.route(v_start, e, False)
-                    all_paths += [p]
-                    UI.update.set_status("Constructing the minimum cost Fan out Route")
-                    Graphics.line(v_start, e, 75, abs(self.__calc_cost(p) - 30) / 20 * 255)
-                
-                
-                i, opt_path = self.__find_opt_path(all_paths)
-                self.__build_path_tiles(opt_path)
-                fan_out_list[i].type = TileType.contact
-                fan_out_list += opt_path
-                paths += [opt_path]
-                Graphics.visualize_path(fan_out_list)
-                Graphics.update()
+        The workspace is reused by every search of this router and reallocated
+        only if the grid size changes.
 
-        # Mark contacts on top layer
-        top = LAYERS - 1
-        srow, scol, _ = start.get_position()
-        self._grid.layers()[top][srow][scol].type = TileType.contact
-        self._grid.layers()[top - 1][srow][scol].type = TileType.metal
-        for e in ends:
-            row, col, _ = e.get_position()
-            self._grid.layers()[top][row][col].type = TileType.contact
-            self._grid.layers()[top - 1 ][row][col].type = TileType.metal
+        Returns:
+            SearchWorkspace: The reusable search buffers.
+        """
+        size = self._grid.model.size
+        if self._workspace is None or self._workspace.size != size:
+            self._workspace = SearchWorkspace(size)
+        return self._workspace
 
-        self.__build_path_tiles(first_opt_path)
-        for path in paths:
-            self.__build_path_tiles(path)
+    def priority_queue(self) -> PriorityQueueEngine:
+        """
+        Returns the empty priority queue of the router, creating it on first use.
 
-        UI.update.set_status("Done !")
+        Returns:
+            PriorityQueueEngine: The reusable priority queue.
+        """
+        if self._queue is None:
+            self._queue = make_priority_queue(self._queue_engine)
+        else:
+            self._queue.clear()
+        return self._queue
 
-    def reconstruct_path(self, came_from, current, show_update=False) -> list[Tile]:
+    def reconstruct_path(self, current, show_update=False) -> list[int]:
         """
-        Reconstruct the path from a dictionary of visited tiles.
+        Reconstruct the path to a node from the predecessors stored in the search workspace.
 
         Args:
-            came_from (dict): Dictionary mapping tiles to their predecessors.
-            current (Tile): The end tile of the path.
+            current (int): The end node of the path.
             show_update (bool, optional): Whether to show updates during reconstruction. Defaults to False.
 
         Returns:
-            list[Tile]: The reconstructed path.
+            list[int]: The reconstructed path, from the search source to current.
         """
-
-
-        path = [current]
-        while current in came_from:
-            current = came_from[current]
-            path.append(current)
-            if show_update:
+        path = self.workspace().path(current)
+        if show_update:
+            for _ in path:
                 self.update()
         return path
 
     def update(self):
         """Update the graphical display."""
-        Graphics.update()
+        self._display.refresh()
@@ -0,0 +1,243 @@
+from array import array
+from enum import Enum
+
+import numpy as np
+
+from search_observer import GridPainter, SearchObserver
+
+
+class SearchEvent(Enum):
+    """
+    Enum representing the kinds of events kept in a SearchLog.
+
+    Attributes:
+        opened (int): A node joined the search frontier.
+        closed (int): A node was expanded.
+        finished (int): A search ended.
+        net_started (int): The routing of a net started, the node is its source.
+        committed (int): A node of a routed path was committed to the grid.
+    """
+    opened = 0
+    closed = 1
+    finished = 2
+    net_started = 3
+    committed = 4
+
+
+_OPENED = SearchEvent.opened.value
+_CLOSED = SearchEvent.closed.value
+_FINISHED = SearchEvent.finished.value
+_NET_STARTED = SearchEvent.net_started.value
+_COMMITTED = SearchEvent.committed.value
+
+
+class SearchLog(SearchObserver):
+    """
+    Records the progress of a router's searches, to be replayed later.
+
+    Installed as the router observer, the log appends every event to two
+    compact arrays, one byte for its kind and four for its node, so routing
+    runs at full speed without drawing anything. The tile arrays of the grid
+    are copied when recording starts, a SearchReplay shows the routing again
+    from that state at any speed.
+    """
+
+    def __init__(self, grid) -> None:
+        """
+        Initializes an empty log and copies the current state of the grid.
+
+        Args:
+            grid (Grid): The grid the recorded router routes on.
+        """
+        self.__grid = grid
+        self.__kinds = array("B")
+        self.__nodes = array("i")
+        self.__initial = None
+        self.clear()
+
+    @property
+    def grid(self):
+        """
+        Returns the grid the log was recorded on.
+        """
+        return self.__grid
+
+    @property
+    def initial(self) -> tuple[np.ndarray, ...]:
+        """
+        Returns the copies of the states, types, owners and paint of the grid when recording started.
+        """
+        return self.__initial
+
+    def __len__(self) -> int:
+        return len(self.__kinds)
+
+    def clear(self):
+        """
+        Drops the recorded events and copies the current state of the grid again.
+        """
+        model = self.__grid.model
+        del self.__kinds[:]
+        del self.__nodes[:]
+        self.__initial = tuple(values.copy() for values in (model.states, model.types, model.owners, model.paint))
+
+    def events(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the recorded events.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The SearchEvent value and the node id of every event, in order.
+                The arrays share the memory of the log until more events are recorded.
+        """
+        return np.frombuffer(self.__kinds, dtype=np.uint8), np.frombuffer(self.__nodes, dtype=np.int32)
+
+    def opened(self, node):
+        self.__kinds.append(_OPENED)
+        self.__nodes.append(node)
+
+    def closed(self, node):
+        self.__kinds.append(_CLOSED)
+        self.__nodes.append(node)
+
+    def wavefront(self, opened, closed):
+        self.__kinds.frombytes(bytes([_CLOSED]) * len(closed) + bytes([_OPENED]) * len(opened))
+        self.__nodes.frombytes(np.concatenate((closed, opened)).astype(np.int32).tobytes())
+
+    def finished(self):
+        self.__kinds.append(_FINISHED)
+        self.__nodes.append(-1)
+
+    def net_started(self, source, sinks):
+        self.__kinds.append(_NET_STARTED)
+        self.__nodes.append(source)
+
+    def committed(self, path):
+        self.__kinds.frombytes(bytes([_COMMITTED]) * len(path))
+        self.__nodes.extend(path)
+
+
+class SearchReplay:
+    """
+    Shows the routing recorded in a SearchLog again on its grid.
+
+    The replay starts from the state the grid had when recording started and
+    paints the search frontier as a GridPainter does. Committed tiles take the
+    state they have once the routing is over, which the replay copies when it
+    is created, and the end of the replay restores that state exactly. The
+    display redraws the grid as the replay moves on, seeking backwards starts
+    again from the beginning. Barriers are written straight into the grid
+    arrays, bypassing its barrier hash and adjacency, so nothing may be routed
+    on the grid until the replay is done.
+
+    Attributes:
+        position (int): The number of events shown.
+        nets (int): The number of nets started among the events shown.
+    """
+
+    def __init__(self, log: SearchLog) -> None:
+        """
+        Initializes the replay and resets the grid to the state recording started from.
+
+        Args:
+            log (SearchLog): The recorded events.
+        """
+        model = log.grid.model
+        self.__log = log
+        self.__kinds, self.__nodes = (values.copy() for values in log.events())
+        self.__arrays = (model.states, model.types, model.owners, model.paint)
+        self.__final = tuple(values.copy() for values in self.__arrays)
+        self.__painter = None
+        self.position = len(self.__kinds)
+        self.nets = 0
+        self.seek(0)
+
+    def __len__(self) -> int:
+        return len(self.__kinds)
+
+    @property
+    def done(self) -> bool:
+        """
+        Returns whether every event is shown.
+        """
+        return self.position == len(self.__kinds)
+
+    def advance(self, count: int):
+        """
+        Shows the next events.
+
+        Args:
+            count (int): The number of events to show.
+        """
+        self.seek(self.position + count)
+
+    def seek(self, position: int):
+        """
+        Shows the grid as it was after a number of events.
+
+        Args:
+            position (int): The number of events shown, clamped to the log.
+        """
+        position = min(max(position, 0), len(self.__kinds))
+        if position == self.position:
+            return
+
+        if position < self.position:
+            self.__restore(self.__log.initial)
+            self.__painter = GridPainter(self.__log.grid)
+            self.position = 0
+            self.nets = 0
+
+        kinds = self.__kinds[self.position:position]
+        nodes = self.__nodes[self.position:position]
+
+        # A finished search leaves no paint behind, and paths are only committed between searches: up to the
+        # last search ending here it is enough to end the search in progress and to commit the paths
+        finished = np.flatnonzero(kinds == _FINISHED)
+        if len(finished):
+            tail = int(finished[-1]) + 1
+            self.__painter.finished()
+            self.__apply(_NET_STARTED, nodes[:tail][kinds[:tail] == _NET_STARTED])
+            self.__apply(_COMMITTED, nodes[:tail][kinds[:tail] == _COMMITTED])
+            kinds, nodes = kinds[tail:], nodes[tail:]
+
+        # The events of the last search are shown in runs of the same kind
+        starts = np.flatnonzero(np.diff(kinds)) + 1
+        for start, run in zip([0, *starts.tolist()], np.split(nodes, starts)):
+            if len(run):
+                self.__apply(int(kinds[start]), run)
+        self.position = position
+
+        if self.done:
+            self.__restore(self.__final)
+            self.__painter = GridPainter(self.__log.grid)
+
+    def __apply(self, kind: int, nodes: np.ndarray):
+        """
+        Shows a run of events of the same kind.
+
+        Args:
+            kind (int): The SearchEvent value of the events.
+            nodes (np.ndarray): The node ids of the events.
+        """
+        empty = nodes[:0]
+        if kind == _OPENED:
+            self.__painter.wavefront(nodes, empty)
+        elif kind == _CLOSED:
+            self.__painter.wavefront(empty, nodes)
+        elif kind == _FINISHED:
+            self.__painter.finished()
+        elif kind == _NET_STARTED:
+            self.nets += len(nodes)
+        elif kind == _COMMITTED:
+            for values, final in zip(self.__arrays, self.__final):
+                values.reshape(-1)[nodes] = final.reshape(-1)[nodes]
+
+    def __restore(self, arrays: tuple[np.ndarray, ...]):
+        """
+        Copies saved states, types, owners and paint into the grid.
+
+        Args:
+            arrays (tuple[np.ndarray, ...]): The arrays to copy, in that order.
+        """
+        for values, saved in zip(self.__arrays, arrays):
+            values[...] = saved
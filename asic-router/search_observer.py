@@ -0,0 +1,109 @@
+import numpy as np
+
+import colors
+
+
+class SearchObserver:
+    """
+    Receives the progress of a router's searches, for visualization.
+
+    Searches keep their own bookkeeping in the router's workspace and never
+    write tile states; an observer only sees which nodes joined the frontier
+    and which were expanded, and when nets start and their paths are
+    committed. The base class ignores all events.
+    """
+
+    def opened(self, node: int) -> None:
+        """
+        Called when a node joins the search frontier.
+
+        Args:
+            node (int): The node id.
+        """
+
+    def closed(self, node: int) -> None:
+        """
+        Called when a node, other than a source, is expanded.
+
+        Args:
+            node (int): The node id.
+        """
+
+    def wavefront(self, opened: np.ndarray, closed: np.ndarray) -> None:
+        """
+        Called when a whole frontier is expanded at once.
+
+        Args:
+            opened (np.ndarray): Node ids that joined the frontier.
+            closed (np.ndarray): Node ids that were expanded.
+        """
+        for node in closed.tolist():
+            self.closed(node)
+        for node in opened.tolist():
+            self.opened(node)
+
+    def finished(self) -> None:
+        """
+        Called when a search ends, whether a path was found or not.
+        """
+
+    def net_started(self, source: int, sinks: list[int]) -> None:
+        """
+        Called when the router starts building the tree of a net.
+
+        Args:
+            source (int): The node id of the net driver.
+            sinks (list[int]): The node ids of the net loads.
+        """
+
+    def committed(self, path: list[int]) -> None:
+        """
+        Called when a routed path is committed to the grid.
+
+        Args:
+            path (list[int]): The node ids of the path.
+        """
+
+
+class GridPainter(SearchObserver):
+    """
+    Paints the search frontier into the display colors of the grid.
+
+    The original color of every painted tile is remembered, and when the search
+    ends only those tiles are restored, so no grid wide scan is needed and the
+    pin colors survive the search.
+    """
+
+    def __init__(self, grid) -> None:
+        """
+        Initializes the painter.
+
+        Args:
+            grid (Grid): The grid whose tiles are painted.
+        """
+        self.__paint = grid.model.paint.reshape(-1)
+        self.__green = grid.model.color_index(colors.GREEN)
+        self.__touched: dict[int, int] = {}
+
+    def opened(self, node):
+        paint = self.__paint
+        self.__touched.setdefault(node, int(paint[node]))
+        paint[node] = self.__green
+
+    def closed(self, node):
+        self.__touched.setdefault(node, int(self.__paint[node]))
+        self.__paint[node] = 0
+
+    def wavefront(self, opened, closed):
+        paint = self.__paint
+        touched = self.__touched
+        for node in np.concatenate((closed, opened)).tolist():
+            touched.setdefault(node, int(paint[node]))
+        paint[closed] = 0
+        paint[opened] = self.__green
+
+    def finished(self):
+        if self.__touched:
+            nodes = np.fromiter(self.__touched.keys(), dtype=np.int64, count=len(self.__touched))
+            self.__paint[nodes] = np.fromiter(self.__touched.values(), dtype=np.uint8, count=len(self.__touched))
+            self.__touched.clear()
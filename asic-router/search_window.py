@@ -0,0 +1,184 @@
+import numpy as np
+
+import config
+
+
+class WindowStats:
+    """
+    Counters of the windowed searches of a router.
+
+    Attributes:
+        searches (int): The number of windowed searches.
+        first_window (int): Searches that found a path in their first window.
+        grown (int): Searches that found a path after growing their window.
+        fallbacks (int): Searches that had to search the whole grid (or the whole region).
+        failed (int): Fallback searches that found no path at all.
+        attempts (int): The number of searches run over all windows, fallbacks included.
+    """
+
+    def __init__(self) -> None:
+        self.searches = 0
+        self.first_window = 0
+        self.grown = 0
+        self.fallbacks = 0
+        self.failed = 0
+        self.attempts = 0
+
+    @property
+    def fallback_rate(self) -> float:
+        """
+        Returns the share of the searches that fell back to the whole grid.
+        """
+        return self.fallbacks / self.searches if self.searches else 0.0
+
+    def reset(self):
+        """
+        Clears all counters.
+        """
+        self.__init__()
+
+    def __repr__(self):
+        return (
+            f"WindowStats(searches={self.searches}, first_window={self.first_window}, grown={self.grown}, "
+            f"fallbacks={self.fallbacks}, failed={self.failed}, fallback_rate={self.fallback_rate:.2f})"
+        )
+
+
+class SearchWindow:
+    """
+    Runs searches inside the bounding box of their end points before searching the whole grid.
+
+    The window is the bounding box of the sources and targets, grown by a
+    margin on every side and spanning all layers. When no path is found the
+    margin is multiplied by the growth factor and the search is repeated, and
+    after the last window the search runs without one. Windows are intersected
+    with the router's own region, such as a global routing corridor, and the
+    fallback searches that region.
+
+    Searches with node costs run without a window: their detours around
+    congestion are the point of the extra costs.
+    """
+
+    def __init__(self, margin: int = None, growth: int = None, attempts: int = None) -> None:
+        """
+        Initializes the window.
+
+        Args:
+            margin (int, optional): Tiles added around the bounding box. Defaults to config.WINDOW_MARGIN.
+            growth (int, optional): Factor applied to the margin after a failed search. Defaults to config.WINDOW_GROWTH.
+            attempts (int, optional): The number of windows tried before the fallback. Defaults to config.WINDOW_ATTEMPTS.
+        """
+        self.__margin = config.WINDOW_MARGIN if margin is None else margin
+        self.__growth = config.WINDOW_GROWTH if growth is None else growth
+        self.__attempts = config.WINDOW_ATTEMPTS if attempts is None else attempts
+        self.__stats = WindowStats()
+        self.__window: np.ndarray = None
+
+    @property
+    def stats(self) -> WindowStats:
+        """
+        Returns the counters of the searches run through this window.
+        """
+        return self.__stats
+
+    def bounds(self, model, nodes, margin: int) -> tuple[int, int, int, int]:
+        """
+        Computes the window of a set of nodes.
+
+        Args:
+            model (GridModel): The grid model the nodes belong to.
+            nodes (Iterable[int]): The node ids the window must contain.
+            margin (int): Tiles added around their bounding box.
+
+        Returns:
+            tuple[int, int, int, int]: The inclusive (min_row, max_row, min_col, max_col) of the window,
+                clamped to the grid. The window spans every layer.
+        """
+        layer_size, cols = model.layer_size, model.cols
+        rows = [node % layer_size // cols for node in nodes]
+        columns = [node % cols for node in nodes]
+        return (
+            max(0, min(rows) - margin), min(model.rows - 1, max(rows) + margin),
+            max(0, min(columns) - margin), min(model.cols - 1, max(columns) + margin),
+        )
+
+    def __buffer(self, model) -> np.ndarray:
+        """
+        Returns the (layers, rows, cols) mask the windows are drawn in, all False between searches.
+
+        The mask is allocated once per grid shape, each window only writes its own box.
+        """
+        shape = (model.layer_count, model.rows, model.cols)
+        if self.__window is None or self.__window.shape != shape:
+            self.__window = np.zeros(shape, dtype=bool)
+        return self.__window
+
+    def search(self, router, sources, targets, show_update=False) -> list[int]:
+        """
+        Searches with the router inside growing windows, then without a window.
+
+        Args:
+            router (Router): The router running the searches.
+            sources (Iterable[int] | dict[int, int]): The node ids the path may start from,
+                optionally mapped to the cost they are seeded with.
+            targets (set[int]): The node ids the path may end at.
+            show_update (bool, optional): Whether to show graphical updates. Defaults to False.
+
+        Returns:
+            list[int]: The node ids of the calculated path, or an empty list if no path is found.
+        """
+        if router.node_costs is not None:
+            return router.search(sources, targets, show_update)
+
+        model = router.grid.model
+        stats = self.__stats
+        stats.searches += 1
+        nodes = [*(source for source, _ in router.seeds(sources)), *targets]
+        region = router.region
+        window = self.__buffer(model)
+        outer = None if region is None else np.asarray(region).reshape(window.shape)
+        # Bounding box of the search area, only needed once a window failed
+        extent = (0, model.rows - 1, 0, model.cols - 1) if outer is None else False
+
+        margin = self.__margin
+        area = None
+        try:
+            for attempt in range(self.__attempts):
+                # Only the previous box is cleared, the rest of the mask is still False
+                if area is not None:
+                    window[area] = False
+                box = self.bounds(model, nodes, margin)
+                area = (slice(None), slice(box[0], box[1] + 1), slice(box[2], box[3] + 1))
+                window[area] = True if outer is None else outer[area]
+
+                router.set_region(window)
+                path = router.search(sources, targets, show_update)
+                stats.attempts += 1
+                if path:
+                    if attempt:
+                        stats.grown += 1
+                    else:
+                        stats.first_window += 1
+                    return path
+                if extent is False:
+                    rows, cols = np.flatnonzero(outer.any(axis=(0, 2))), np.flatnonzero(outer.any(axis=(0, 1)))
+                    extent = (rows[0], rows[-1], cols[0], cols[-1]) if rows.size else None
+                # A window covering the whole search area already was the fallback
+                if extent is None or (
+                    box[0] <= extent[0] and extent[1] <= box[1] and box[2] <= extent[2] and extent[3] <= box[3]
+                ):
+                    stats.fallbacks += 1
+                    stats.failed += 1
+                    return path
+                margin = max(margin * self.__growth, margin + 1)
+        finally:
+            if area is not None:
+                window[area] = False
+            router.set_region(outer)
+
+        stats.fallbacks += 1
+        stats.attempts += 1
+        path = router.search(sources, targets, show_update)
+        if not path:
+            stats.failed += 1
+        return path
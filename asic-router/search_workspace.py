@@ -0,0 +1,178 @@
+import numpy as np
+
+
+# Parent value of a node that was reached without a predecessor (a search source)
+NO_PARENT = -1
+
+
+class SearchWorkspace:
+    """
+    Preallocated per-router buffers for graph searches over a GridModel.
+
+    The cost and parent buffers cover the whole grid but are never cleared.
+    Each search bumps a generation counter instead, and a node only counts as
+    reached when its stamp equals the current generation. Setting up a search
+    is therefore O(1) and its cost scales with the nodes it actually touches.
+
+    Attributes:
+        generation (int): The stamp of the current search.
+        cost_view (memoryview): Flat view of the best known cost of each node.
+        parent_view (memoryview): Flat view of the predecessor of each node.
+        stamp_view (memoryview): Flat view of the generation that last reached each node.
+        closed_view (memoryview): Flat view of the generation that last expanded each node.
+    """
+
+    def __init__(self, size: int) -> None:
+        """
+        Allocates the search buffers.
+
+        Args:
+            size (int): The number of nodes in the grid.
+        """
+        self.__size = size
+        self.__cost = np.zeros(size, dtype=np.int32)
+        self.__parent = np.full(size, NO_PARENT, dtype=np.int32)
+        self.__stamp = np.zeros(size, dtype=np.uint32)
+        self.__closed = np.zeros(size, dtype=np.uint32)
+        self.__generation = 0
+
+        self.__cost_view = memoryview(self.__cost)
+        self.__parent_view = memoryview(self.__parent)
+        self.__stamp_view = memoryview(self.__stamp)
+        self.__closed_view = memoryview(self.__closed)
+
+    @property
+    def size(self) -> int:
+        """
+        Returns the number of nodes covered by the workspace.
+        """
+        return self.__size
+
+    @property
+    def generation(self) -> int:
+        """
+        Returns the stamp of the current search.
+        """
+        return self.__generation
+
+    @property
+    def cost_view(self) -> memoryview:
+        """
+        Returns a flat memoryview over the node costs.
+        """
+        return self.__cost_view
+
+    @property
+    def parent_view(self) -> memoryview:
+        """
+        Returns a flat memoryview over the node predecessors.
+        """
+        return self.__parent_view
+
+    @property
+    def stamp_view(self) -> memoryview:
+        """
+        Returns a flat memoryview over the node generation stamps.
+        """
+        return self.__stamp_view
+
+    @property
+    def closed_view(self) -> memoryview:
+        """
+        Returns a flat memoryview over the node expansion stamps.
+        """
+        return self.__closed_view
+
+    def reset(self) -> int:
+        """
+        Starts a new search by advancing the generation stamp.
+
+        The stamp arrays are only cleared when the counter wraps around.
+
+        Returns:
+            int: The generation of the new search.
+        """
+        self.__generation += 1
+        if self.__generation > np.iinfo(np.uint32).max:
+            self.__stamp.fill(0)
+            self.__closed.fill(0)
+            self.__generation = 1
+        return self.__generation
+
+    def reached(self, node: int) -> bool:
+        """
+        Checks whether a node was reached by the current search.
+
+        Args:
+            node (int): The node id.
+
+        Returns:
+            bool: True if the node has a cost in the current generation.
+        """
+        return self.__stamp_view[node] == self.__generation
+
+    def closed(self, node: int) -> bool:
+        """
+        Checks whether a node was already expanded by the current search.
+
+        Args:
+            node (int): The node id.
+
+        Returns:
+            bool: True if the node was closed in the current generation.
+        """
+        return self.__closed_view[node] == self.__generation
+
+    def close(self, node: int) -> None:
+        """
+        Marks a node as expanded in the current search.
+
+        Args:
+            node (int): The node id.
+        """
+        self.__closed_view[node] = self.__generation
+
+    def cost(self, node: int) -> float:
+        """
+        Returns the best known cost of a node in the current search.
+
+        Args:
+            node (int): The node id.
+
+        Returns:
+            float: The cost, or infinity if the node was not reached.
+        """
+        if self.__stamp_view[node] != self.__generation:
+            return float("inf")
+        return self.__cost_view[node]
+
+    def visit(self, node: int, cost: int, parent: int = NO_PARENT) -> None:
+        """
+        Records a cost and predecessor for a node in the current search.
+
+        Args:
+            node (int): The node id.
+            cost (int): The cost to reach the node.
+            parent (int, optional): The predecessor node. Defaults to NO_PARENT.
+        """
+        self.__stamp_view[node] = self.__generation
+        self.__cost_view[node] = cost
+        self.__parent_view[node] = parent
+
+    def path(self, node: int) -> list[int]:
+        """
+        Follows the predecessor chain of a node back to its search source.
+
+        Args:
+            node (int): The last node of the path.
+
+        Returns:
+            list[int]: The path from the source to the node.
+        """
+        parent = self.__parent_view
+        path = [node]
+        while parent[node] != NO_PARENT:
+            node = parent[node]
+            path.append(node)
+        path.reverse()
+        return path
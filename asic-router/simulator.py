@@ -1,13 +1,18 @@
 import colors
-from config import LAYERS, ROWS, SCREEN_WIDTH, VIA_COST
+from config import LAYERS, RENDER_FPS, REPLAY_SEEK, REPLAY_SPEED, ROWS, VIA_COST, VIEW_ZOOM_STEP
 from from_json import RouteLoader
+from global_router import GlobalRouter
 from graphics import Graphics
 from grid import Grid
 import pygame
-from initializer import Initializer
+from negotiated_router import NegotiatedCongestionRouter
+from parallel_router import ParallelNetRouter
+from render_scheduler import RenderScheduler
+from route_display import RouteDisplay
 from router import Router
+from search_log import SearchLog, SearchReplay
 from tile import TileState
-from ui import UI
+from ui import UI, UIDisplay
 import random 
 
 from threading import Thread , Semaphore
@@ -23,13 +28,15 @@ class RouterSimulator:
         _ui (UI): The user interface for interacting with the simulation.
         _current_layer (int): The index of the current layer in the grid.
         _router (Router): The router instance used for routing tiles.
+        _renderer (RenderScheduler): Caps and coalesces the window redraws.
+        _replay (SearchReplay): The recorded routing being replayed, None when nothing is replayed.
 
     Methods:
         __init__(self, grid: Grid, router: Router):
             Initializes the RouterSimulator with the grid and router objects.
         
         _drawer_stack(self, context=""):
-            Draws the current grid and user interface on the screen.
+            Draws the changes to the grid and user interface on the screen.
 
         upper_layer(self):
             Increases the current layer index to move up to the next layer.
@@ -37,8 +44,14 @@ class RouterSimulator:
         bottm_layer(self):
             Decreases the current layer index to move down to the previous layer.
 
-        get_clicked_tile(pos, rows, width) -> tuple[int, int]:
-            Converts the mouse click position to row and column indices of the clicked tile.
+        get_clicked_tile(self, pos) -> tuple[int, int] | None:
+            Converts the mouse click position to row and column indices of the clicked tile, through the viewport.
+
+        record_routes(self):
+            Routes at full speed while recording the searches, then replays them.
+
+        finish_replay(self):
+            Shows the end of the replay, if any, and stops it.
 
         loop(self):
             Main simulation loop that listens for events and updates the simulation.
@@ -58,37 +71,38 @@ class RouterSimulator:
         self._ui = UI()
         self._current_layer = 0
         self._router: Router = router
+        self._renderer = RenderScheduler(grid, self._ui, line_color=(100, 0, 0, 0))
+        router.set_display(UIDisplay(self._renderer))
         RouterSimulator.update_method = self._drawer_stack
-        Graphics.update = lambda: self._drawer_stack("Graphics Drawer")
+        Graphics.update = self._renderer.refresh
         self.__start = None
         self.__end = None
         self.__routes = None
+        self.__nets = []
+        self._replay: SearchReplay = None
+        self.__replay_speed = REPLAY_SPEED
 
         assert VIA_COST >= 1 
 
     def _drawer_stack(self, context=""):
         """
-        Draws the current grid and user interface on the window.
+        Draws the changes to the grid and user interface on the window now.
 
         Args:
             context (str, optional): A string that can be used to differentiate drawing contexts. Defaults to an empty string.
         """
         if context != "":
             pass 
-        Initializer.win.fill(colors.SLATE_GRAY)
-        self._ui.draw_grid(color=(100, 0, 0, 0)) 
-        self._grid.draw() 
-        self._ui.draw_ui() 
-        pygame.display.update()
+        self._renderer.flush()
 
     def upper_layer(self):
         """
         Increases the current layer index to move up to the next layer, updating the UI.
         """
         self._current_layer += 1
-        self._current_layer = min(LAYERS, self._current_layer)
+        self._current_layer = min(self._grid.model.layer_count - 1, self._current_layer)
         self._ui.update_current_layer(self._current_layer)
-        self._ui.draw_ui()
+        self._renderer.set_layer(self._current_layer)
 
     def bottm_layer(self):
         """
@@ -97,27 +111,82 @@ class RouterSimulator:
         self._current_layer -= 1
         self._current_layer = max(0, self._current_layer)
         self._ui.update_current_layer(self._current_layer)
-        self._ui.draw_ui()
+        self._renderer.set_layer(self._current_layer)
 
-    @staticmethod
-    def get_clicked_tile(pos, rows, width) -> tuple[int, int]:
+    def get_clicked_tile(self, pos) -> tuple[int, int] | None:
         """
         Converts the mouse click position to row and column indices of the clicked tile.
 
         Args:
             pos (tuple[int, int]): The mouse click position (x, y).
-            rows (int): The number of rows in the grid.
-            width (int): The width of the grid.
 
         Returns:
-            tuple[int, int]: The (row, column) indices of the clicked tile.
+            tuple[int, int] | None: The (row, column) indices of the clicked tile, None outside the grid.
         """
-        gap = width // rows
-        x, y = pos
-        col = y // gap
-        row = x // gap
-        return row % rows, col % rows
+        return self._renderer.viewport.tile_at(pos)
     
+    def route_selected_net(self):
+        """
+        Routes the net of the selected start and end tiles.
+        """
+        self._router.fan_out_route(self.__start, self.__end)
+        self.__start.state = TileState.barrier
+        for e in self.__end: 
+            e.state = TileState.barrier     
+        self.__start = None
+        self.__end = None
+
+    def record_routes(self):
+        """
+        Routes the nets loaded from JSON with negotiated congestion, or else the selected net, at full speed
+        while recording the searches, then replays them.
+        """
+        if not self.__nets and (self.__start is None or not self.__end):
+            return
+
+        router = self._router
+        observer, display = router.observer, router.display
+        log = SearchLog(self._grid)
+        router.set_observer(log)
+        router.set_display(RouteDisplay())
+        router.disable_graphics_updates()
+        try:
+            if self.__nets:
+                self.negotiate_routes()
+            else:
+                self.route_selected_net()
+        finally:
+            router.set_observer(observer)
+            router.set_display(display)
+            router.enable_graphics_updates()
+        self._replay = SearchReplay(log)
+
+    def finish_replay(self):
+        """
+        Shows the end of the replay, if any, and stops it.
+        """
+        replay = self._replay
+        if replay is not None:
+            replay.seek(len(replay))
+            self._replay = None
+            self._ui.set_status(f"Replayed {len(replay)} events , {replay.nets} nets")
+
+    def __show_replay(self, elapsed: int):
+        """
+        Moves the replay on by the events of the time elapsed.
+
+        Args:
+            elapsed (int): The time since the last frame, in milliseconds.
+        """
+        replay = self._replay
+        replay.advance(max(1, round(self.__replay_speed * elapsed / 1000)))
+        if replay.done:
+            self.finish_replay()
+        else:
+            self._ui.set_status(
+                f"Replay : {replay.position}/{len(replay)} events , {replay.nets} nets at {self.__replay_speed} events/s"
+            )
+
     def generate_routes(self): 
         self._router.disable_graphics_updates() 
         for i in range(3): 
@@ -126,7 +195,7 @@ class RouterSimulator:
             y  = random.randint(0 , ROWS -1 )
             z  = random.randint(0 , LAYERS -1 )
 
-            start = self._grid.layers()[z][x][y]
+            start = self._grid.tile(x, y, z)
 
             if start.state == TileState.barrier: 
                 continue 
@@ -141,7 +210,7 @@ class RouterSimulator:
                             y  = random.randint(0 , ROWS -1 )
                             z  = random.randint(0 , LAYERS -1 )
 
-                            tile = self._grid.layers()[z][x][y]
+                            tile = self._grid.tile(x, y, z)
 
                             if tile.state == TileState.barrier: 
                                 continue 
@@ -155,6 +224,55 @@ class RouterSimulator:
 
             self._ui.set_status(f"currently building a random route {i /10 }%")
             
+    def negotiate_routes(self):
+        """
+        Routes all nets loaded from JSON together with negotiated congestion.
+        """
+        result = NegotiatedCongestionRouter(self._router).route(self.__nets)
+        for start, ends in self.__nets:
+            start.state = TileState.barrier
+            for e in ends:
+                e.state = TileState.barrier
+        self.__start = None
+        self.__end = None
+
+        routed = sum(1 for net in result.nets if net.paths)
+        self._ui.set_status(
+            f"Negotiated {routed}/{len(result.nets)} nets in {result.iterations} iterations"
+            + ("" if result.legal else f" , {len(result.fallback)} rerouted")
+        )
+
+    def route_in_parallel(self):
+        """
+        Routes all nets loaded from JSON in batches of independent nets over a process pool.
+        """
+        result = ParallelNetRouter(self._router).route(self.__nets)
+        for start, ends in self.__nets:
+            start.state = TileState.barrier
+            for e in ends:
+                e.state = TileState.barrier
+        self.__start = None
+        self.__end = None
+
+        routed = sum(1 for net in result.nets if net.paths)
+        self._ui.set_status(
+            f"Routed {routed}/{len(result.nets)} nets in {len(result.batches)} batches"
+            f" on {result.workers} workers , {len(result.fallback)} rerouted"
+        )
+
+    def plan_global_routes(self):
+        """
+        Plans all nets loaded from JSON on the GCell grid and reports their congestion.
+        """
+        planner = GlobalRouter(self._grid)
+        routes = planner.plan([(start.node, [e.node for e in ends]) for start, ends in self.__nets])
+        congestion = planner.congestion()
+        peak = congestion.max() if congestion.size else 0
+        self._ui.set_status(
+            f"Global routing : {sum(r.complete for r in routes)}/{len(routes)} nets planned ,"
+            f" overflow {planner.overflow()} , peak usage {peak:.0%}"
+        )
+
     def build_control_menu(self): 
         win = ControlWindow() 
         win.addButton("Run" , lambda : print("Run"))
@@ -185,7 +303,7 @@ class RouterSimulator:
 
             x , y , layer = start_point
 
-            tile = self._grid.layers()[layer][x][y]
+            tile = self._grid.tile(x, y, layer)
 
 
             tile.state = TileState.start 
@@ -195,12 +313,13 @@ class RouterSimulator:
             route_ends = []
             for end_point in route[1:]: 
                 x , y , layer = end_point
-                end_tile = self._grid.layers()[layer][x][y]
+                end_tile = self._grid.tile(x, y, layer)
                 end_tile.color = colors.BLUE
                 end_tile.state = TileState.end 
                 route_ends.append(end_tile)
 
             self.__end = route_ends
+            self.__nets.append((tile, route_ends))
 
 
         
@@ -217,14 +336,19 @@ class RouterSimulator:
 
         This loop handles quitting the simulation, navigating between layers, and routing tiles
         when the spacebar is pressed. Mouse clicks are used to select start and end tiles for routing.
+        The mouse wheel zooms, dragging with the right button pans, F fits the grid in the window
+        and H shows or hides the vias of the neighboring layers. R routes at full speed and replays
+        the recorded searches: the left and right arrows seek, + and - change the speed and Escape
+        skips to the end.
         """
         running = True
         edge_trigger_flg = True  
 
         startup = False 
+        clock = pygame.time.Clock()
 
         while running:
-            self._drawer_stack()
+            self._renderer.refresh()
 
 
             for event in pygame.event.get():
@@ -233,50 +357,89 @@ class RouterSimulator:
 
                 if pygame.mouse.get_pressed()[0]:
                     if edge_trigger_flg: 
+                        self.finish_replay()
                         pos = pygame.mouse.get_pos()
-                        r, c = RouterSimulator.get_clicked_tile(pos, ROWS, SCREEN_WIDTH)
-                        clicked_tile = self._grid.layers()[self._current_layer][r][c]
+                        clicked = self.get_clicked_tile(pos)
 
-                        if self.__start is None:
-                            clicked_tile.color = colors.RED
-                            self.__start = clicked_tile
-                            self.__start.state = TileState.start
+                        if clicked is not None:
+                            clicked_tile = self._grid.tile(*clicked, self._current_layer)
 
-                        elif self.__end is None and self.__start is not None:
-                            clicked_tile.color = colors.BLUE
-                            self.__end = [clicked_tile]
-                            clicked_tile.state = TileState.end
+                            if self.__start is None:
+                                clicked_tile.color = colors.RED
+                                self.__start = clicked_tile
+                                self.__start.state = TileState.start
 
-                        else: 
-                            clicked_tile.color = colors.BLUE
-                            clicked_tile.state = TileState.end
-                            self.__end.append(clicked_tile)
+                            elif self.__end is None and self.__start is not None:
+                                clicked_tile.color = colors.BLUE
+                                self.__end = [clicked_tile]
+                                clicked_tile.state = TileState.end
+
+                            else: 
+                                clicked_tile.color = colors.BLUE
+                                clicked_tile.state = TileState.end
+                                self.__end.append(clicked_tile)
 
                         edge_trigger_flg = False 
                 else:
                     edge_trigger_flg = True
 
+                if event.type == pygame.MOUSEWHEEL:
+                    self._renderer.viewport.zoom(VIEW_ZOOM_STEP ** event.y, pygame.mouse.get_pos())
+
+                if event.type == pygame.MOUSEMOTION and event.buttons[2]:
+                    self._renderer.viewport.pan(*event.rel)
+
                 if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_f:
+                        self._renderer.viewport.fit()
+
+                    if event.key == pygame.K_h:
+                        self._renderer.set_via_hints(not self._renderer.via_hints)
+
                     if event.key == pygame.K_UP:
                         self.upper_layer()
                     if event.key == pygame.K_DOWN:
                         self.bottm_layer()
 
+                    # The replay writes the grid arrays directly: it ends before any routing key runs
+                    if self._replay is not None:
+                        step = max(1, round(len(self._replay) * REPLAY_SEEK))
+                        if event.key == pygame.K_RIGHT:
+                            self._replay.advance(step)
+                        if event.key == pygame.K_LEFT:
+                            self._replay.seek(self._replay.position - step)
+                        if event.key == pygame.K_EQUALS:
+                            self.__replay_speed *= 2
+                        if event.key == pygame.K_MINUS:
+                            self.__replay_speed = max(1, self.__replay_speed // 2)
+                        if event.key in (pygame.K_ESCAPE, pygame.K_SPACE, pygame.K_q, pygame.K_r,
+                                         pygame.K_n, pygame.K_g, pygame.K_p):
+                            self.finish_replay()
+
                     if event.key == pygame.K_q: 
                         self.generate_routes() 
 
                     if event.key == pygame.K_SPACE:
-                        self._router.fan_out_route(self.__start, self.__end)
-                        self.__start.state = TileState.barrier
-                        for e in self.__end: 
-                            e.state = TileState.barrier     
-                        self.__start = None
-                        self.__end = None
+                        self.route_selected_net()
+
+                    if event.key == pygame.K_r:
+                        self.record_routes()
+
+                    if event.key == pygame.K_n and self.__nets:
+                        self.negotiate_routes()
+
+                    if event.key == pygame.K_g and self.__nets:
+                        self.plan_global_routes()
+
+                    if event.key == pygame.K_p and self.__nets:
+                        self.route_in_parallel()
 
             if not startup: 
                 if self.__routes: 
                     self.__apply_json_routes()
                 startup = True  
-            pygame.display.update()
+            elapsed = clock.tick(RENDER_FPS)
+            if self._replay is not None:
+                self.__show_replay(elapsed)
 
         pygame.quit()
@@ -0,0 +1,32 @@
+from headless import make_router, route_netlist
+from predefined_grids import CrossGrid
+from tile import TileState
+
+
+def test_routes_reach_layers_past_the_color_map():
+    grid = CrossGrid(12, 6)
+    routes = [[[1, 1, 0], [9, 8, 5]]]
+
+    report = route_netlist(routes, make_router(grid, "dijkstra"))
+
+    assert report["summary"]["complete"] == 1
+
+
+def test_net_crossing_another_pin_is_not_complete():
+    grid = CrossGrid(12, 2)
+    model = grid.model
+    # A single free row on layer 0, and a via above the pin of the second net
+    for node in range(model.size):
+        row, col, layer = model.position(node)
+        if row != 5 or layer != 0 and col != 5:
+            model.set_state(node, TileState.barrier)
+    routes = [
+        [[5, 0, 0], [5, 10, 0]],
+        [[5, 5, 0], [5, 5, 1]],
+    ]
+
+    report = route_netlist(routes, make_router(grid))
+
+    crossing, net = report["nets"]
+    assert crossing["routed"] and not crossing["complete"]
+    assert net["complete"]
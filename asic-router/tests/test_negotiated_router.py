@@ -0,0 +1,17 @@
+from headless import make_router, route_netlist
+from predefined_grids import CrossGrid
+
+
+def test_negotiated_skips_nets_without_sinks():
+    grid = CrossGrid(12, 3)
+    router = make_router(grid)
+    routes = [
+        [[2, 2, 0], [2, 2, 0]],
+        [[1, 1, 0], [9, 8, 1]],
+    ]
+
+    report = route_netlist(routes, router, "negotiated")
+
+    duplicate, net = report["nets"]
+    assert not duplicate["routed"] and duplicate["complete"]
+    assert net["routed"] and net["complete"]
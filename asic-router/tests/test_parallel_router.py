@@ -0,0 +1,23 @@
+import numpy as np
+
+from grid_model import NO_NET
+from headless import make_router, route_netlist
+from predefined_grids import CrossGrid
+
+
+def test_parallel_rips_up_nets_routed_before():
+    grid = CrossGrid(20, 3)
+    router = make_router(grid)
+    routes = [
+        [[1, 1, 0], [9, 8, 1]],
+        [[15, 2, 0], [12, 17, 1], [18, 10, 0]],
+    ]
+
+    route_netlist(routes, router, "sequential")
+    owned = int((grid.model.owners != NO_NET).sum())
+    report = route_netlist(routes, router, "parallel")
+
+    owners = grid.model.owners
+    assert all(net["complete"] for net in report["nets"])
+    assert np.unique(owners[owners != NO_NET]).size == len(routes)
+    assert int((owners != NO_NET).sum()) == owned
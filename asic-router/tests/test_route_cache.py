@@ -0,0 +1,52 @@
+import random
+
+from predefined_grids import CrossGrid
+from predefined_routers import AStarRouter, DijkstraRouter
+from route_cache import RouteCache
+from tile import TileState
+
+
+def make_grid(seed=3):
+    rng = random.Random(seed)
+    grid = CrossGrid(30, 4)
+    model = grid.model
+    for node in rng.sample(range(model.size), model.size // 5):
+        model.set_state(node, TileState.barrier)
+    free = [node for node in range(model.size) if model.get_state(node) != TileState.barrier]
+    return grid, [tuple(rng.sample(free, 2)) for _ in range(40)]
+
+
+def test_cache_is_cleared_when_the_weight_changes():
+    grid, pairs = make_grid()
+    model = grid.model
+    router = AStarRouter(grid, weight=3.0)
+    router.set_observer(None)
+    reference = DijkstraRouter(grid)
+    reference.set_observer(None)
+    reference.set_route_cache(None)
+    for source, target in pairs:
+        router.route(source, target)
+
+    router.set_weight(1.0)
+    for source, target in pairs:
+        path, optimal = router.route(source, target), reference.route(source, target)
+        assert bool(path) == bool(optimal)
+        if path:
+            assert RouteCache.cost(model, path) == RouteCache.cost(model, optimal)
+            assert router.bound == 1.0
+
+
+def test_cache_hit_restores_the_bound():
+    grid, pairs = make_grid()
+    router = AStarRouter(grid, weight=2.0)
+    router.set_observer(None)
+    bounds = []
+    for source, target in pairs:
+        router.route(source, target)
+        bounds.append(router.bound)
+
+    hits = router.route_cache.hits
+    for (source, target), bound in zip(pairs, bounds):
+        router.route(source, target)
+        assert router.bound == bound
+    assert router.route_cache.hits > hits
@@ -1,186 +1,160 @@
 from drawable import Drawable, DrawableShape
-from enum import Enum
 import colors
-from config import PADDING, WIDTH, layer_color_map
-from graphics import Graphics
+from config import PADDING, layer_color_map
+from grid_model import GridModel, Layer, LayerOrientation, TileState, TileType
 
-class LayerOrientation(Enum):
-    """
-    Enum representing the orientation of a layer in the grid.
-
-    Attributes:
-        horizontal (int): Indicates a horizontal layer orientation.
-        vertical (int): Indicates a vertical layer orientation.
-        both (int): Indicates a layer that can route a net in both orientations horizontal and vertical.
-    """
-    horizontal = 0
-    vertical = 1
-    both = 2
-
-
-class TileState(Enum):
-    """
-    Enum representing the various states a tile can have.
-
-    Attributes:
-        idle (int): Represents a tile in an idle state.
-        closed (int): Represents a tile that is closed.
-        open (int): Represents a tile that is open.
-        barrier (int): Represents a tile that is a barrier.
-        start (int): Represents a tile designated as the start of a route.
-        end (int): Represents a tile designated as the end of a route.
-    """
-    idle = 0
-    closed = 1
-    open = 2
-    barrier = 3
-    start = 4
-    end = 5
-
-
-class TileType(Enum):
-    """
-    Enum representing the different types of tiles.
-
-    Attributes:
-        via (int): Represents a via tile.
-        metal (int): Represents a metal tile.
-        contact (int): Represents a contact tile.
-    """
-    via = 0
-    metal = 1
-    contact = 2
-
-
-class Layer:
-    """
-    A class representing a layer in the grid.
-
-    Attributes:
-        index (int): The index of the layer.
-        orientation (LayerOrientation): The orientation of the layer (horizontal/vertical).
-    """
-
-    def __init__(self, index, orientation) -> None:
-        """
-        Initializes the Layer with the given index and orientation.
-
-        Args:
-            index (int): The index of the layer.
-            orientation (LayerOrientation): The orientation of the layer.
-        """
-        self.__index = index
-        self.__orientation = orientation
-
-    @property
-    def index(self):
-        """
-        Returns the index of the layer.
-        """
-        return self.__index
-
-    @property
-    def orientation(self):
-        """
-        Returns the orientation of the layer.
-        """
-        return self.__orientation
 
+# Width of the tiles the via inset and the metal PADDING are given for, other widths are scaled
+BASE_WIDTH = 20
 
 class Tile(Drawable):
     """
-    A class representing a tile in the grid, which is drawable and has specific states and types.
+    A drawable view of a single tile stored in a GridModel.
+
+    The tile does not own any routing data; its type, state, owner and color are
+    read from and written to the grid model arrays, so views can be created on demand
+    and thrown away once they have been drawn.
 
     Attributes:
         row (int): The row index of the tile.
         col (int): The column index of the tile.
         layer (Layer): The layer the tile belongs to.
         width (int): The width of the tile.
+        node (int): The node id of the tile in the grid model.
         type (TileType): The type of the tile (via, metal, contact).
         state (TileState): The current state of the tile (idle, open, closed, etc.).
-        neighbors (list): A list of neighboring tiles.
     """
 
-    def __init__(self, row, col, layer, width, type=TileType.metal, **kwargs) -> None:
+    def __init__(self, model: GridModel, row, col, layer, width, **kwargs) -> None:
         """
-        Initializes the Tile with its position, layer, type, and other properties.
+        Initializes the Tile view with its position, layer and backing grid model.
 
         Args:
+            model (GridModel): The grid model storing the tile data.
             row (int): The row index of the tile.
             col (int): The column index of the tile.
             layer (Layer): The layer the tile belongs to.
             width (int): The width of the tile.
-            type (TileType, optional): The type of the tile (default is metal).
-            kwargs: Additional keyword arguments (e.g., padding).
+            kwargs: Additional keyword arguments (e.g., padding, or origin, the (x, y) screen
+                position of the grid origin).
         """
+        self.__model = model
         self.__row = row
         self.__col = col
         self.__layer: Layer = layer
-        self.__neighbors = []
-        self.__state = TileState.idle
-        self.__type = type
+        self.__node = model.index(row, col, layer.index)
         self.__width = width
-        super().__init__(row * width, col * width, width, width)
+        self.__origin = kwargs.get("origin", (0, 0))
+        super().__init__(row * width + self.__origin[0], col * width + self.__origin[1], width, width)
         self.__padding = kwargs.get("padding", 0)
-        self.color = None
 
-    def draw(self):
+    def __eq__(self, other):
+        """Two views are equal when they look at the same tile of the same model."""
+        return isinstance(other, Tile) and other.__model is self.__model and other.__node == self.__node
+
+    def __hash__(self):
+        return hash(self.__node)
+
+    def __repr__(self):
+        return f"Tile(row={self.__row}, col={self.__col}, layer={self.__layer.index})"
+
+    def draw(self, surface=None):
         """
         Draws the tile on the screen with appropriate styling based on its type and state.
 
         The drawing properties change depending on whether the tile is a via, contact, or metal.
         The tile's size and position are adjusted based on the layer's orientation.
+        Graphics, and with it Pygame, is imported on first draw. Pin labels are not
+        antialiased, so a pin can be drawn again over itself without changing.
+
+        Args:
+            surface (pygame.Surface, optional): The surface to draw on. Defaults to the window.
+
+        Returns:
+            pygame.Rect | None: The screen area drawn, label included, or None if the tile has no color.
         """
+        from graphics import Graphics
+
         padding = self.__padding
-        self.height = WIDTH
-        self.width = WIDTH
-        self.y = self.__col * self.__width - padding
-        self.x = self.__row * self.__width - padding
+        width = self.__width
+        left = self.__row * width + self.__origin[0]
+        top = self.__col * width + self.__origin[1]
+        self.height = width
+        self.width = width
+        self.y = top - padding
+        self.x = left - padding
         
-        # Adjustments based on tile type
-        if self.__type == TileType.via:
+        # Adjustments based on tile type, scaled from BASE_WIDTH wide tiles
+        inset = 2 * width // BASE_WIDTH
+        if self.type == TileType.via:
             self.color = colors.SILVER_VIA
-            self.height = WIDTH - 4
-            self.width = WIDTH - 4
-            self.y = self.__col * self.__width - padding + 2
-            self.x = self.__row * self.__width - padding + 2
+            self.height = width - 2 * inset
+            self.width = width - 2 * inset
+            self.y = top - padding + inset
+            self.x = left - padding + inset
 
-        elif self.__type == TileType.contact:
+        elif self.type == TileType.contact:
             self.color = colors.BLACK_CONTACT
-            self.height = WIDTH - 4
-            self.width = WIDTH - 4
-            self.y = self.__col * self.__width - padding + 2
-            self.x = self.__row * self.__width - padding + 2
+            self.height = width - 2 * inset
+            self.width = width - 2 * inset
+            self.y = top - padding + inset
+            self.x = left - padding + inset
 
-        elif self.__type == TileType.metal:
-            padding = PADDING
+        elif self.type == TileType.metal:
+            padding = PADDING * width // BASE_WIDTH
             if self.__layer.orientation == LayerOrientation.vertical:
-                self.height = self.__width - 2 * padding
-                self.y = self.__col * self.__width + padding
+                self.height = width - 2 * padding
+                self.y = top + padding
             elif self.__layer.orientation == LayerOrientation.horizontal:
-                self.width = self.__width - 2 * padding
-                self.x = self.__row * self.__width + padding
+                self.width = width - 2 * padding
+                self.x = left + padding
 
         # Draw the tile if it has a color
         if self.color is not None:
+            label = None
             if self.state == TileState.start: 
-                Graphics.draw_text("Start" , self.x , self.y  - 10 , 14)
+                label = Graphics.draw_text("Start" , self.x , self.y  - 10 , 14, antialias=False, surface=surface)
                 self.shape = DrawableShape.circle 
 
             elif self.state == TileState.end: 
-                Graphics.draw_text("End" , self.x , self.y  - 10 , 14)
+                label = Graphics.draw_text("End" , self.x , self.y  - 10 , 14, antialias=False, surface=surface)
                 self.shape = DrawableShape.circle 
             else : 
                 self.shape = DrawableShape.rect
 
-            return super().draw()
+            rect = super().draw(surface)
+            return rect if label is None else rect.union(label)
+
+    @property
+    def node(self) -> int:
+        """
+        Returns the node id of the tile in the grid model.
+        """
+        return self.__node
+
+    @property
+    def color(self):
+        """
+        Returns the display color of the tile stored in the grid model.
+        """
+        return self.__model.get_color(self.__node)
+
+    @color.setter
+    def color(self, new_color) -> None:
+        """
+        Sets the display color of the tile in the grid model.
+
+        Args:
+            new_color (tuple[int, int, int] | None): The new RGB color.
+        """
+        self.__model.set_color(self.__node, new_color)
 
     @property
     def type(self) -> TileType:
         """
         Returns the type of the tile.
         """
-        return self.__type
+        return self.__model.get_type(self.__node)
 
     @type.setter
     def type(self, t: TileType) -> None:
@@ -190,14 +164,14 @@ class Tile(Drawable):
         Args:
             t (TileType): The new type of the tile.
         """
-        self.__type = t
+        self.__model.set_type(self.__node, t)
 
     @property
     def state(self) -> TileState:
         """
         Returns the current state of the tile.
         """
-        return self.__state
+        return self.__model.get_state(self.__node)
 
     @state.setter
     def state(self, s: TileState) -> None:
@@ -207,7 +181,7 @@ class Tile(Drawable):
         Args:
             s (TileState): The new state of the tile.
         """
-        self.__state = s
+        self.__model.set_state(self.__node, s)
 
     @property
     def padding(self):
@@ -233,29 +207,6 @@ class Tile(Drawable):
         """
         return self.__layer
 
-    @property
-    def neighbors(self) -> list:
-        """
-        Returns the list of neighboring tiles.
-        """
-        return self.__neighbors
-
-    @neighbors.setter
-    def neighbors(self, s: list):
-        """
-        Sets the list of neighboring tiles.
-
-        Args:
-            s (list): The list of neighboring tiles.
-        """
-        self.__neighbors = s
-
-    def clear_neighbors(self):
-        """
-        Clears the list of neighbors for the tile.
-        """
-        self.__neighbors.clear()
-
     def get_cordinates(self):
         """
         Returns the screen coordinates (x, y) of the tile.
@@ -279,50 +230,49 @@ class Tile(Drawable):
         Sets the tile to the closed state and removes its color.
         """
         self.color = None
-        self.__state = TileState.closed
+        self.state = TileState.closed
 
     def set_idle_state(self):
         """
         Sets the tile to the idle state and removes its color.
         """
         self.color = None
-        self.__state = TileState.idle
+        self.state = TileState.idle
 
     def set_open_state(self):
         """
         Sets the tile to the open state and assigns it a green color.
         """
         self.color = colors.GREEN
-        self.__state = TileState.open
+        self.state = TileState.open
 
     def set_start_state(self):
         """
         Sets the tile to the start state.
         """
-        self.__state = TileState.start
+        self.state = TileState.start
 
     def set_barrier_state(self):
         """
         Sets the tile to the barrier state.
         """
-        self.__state = TileState.barrier
+        self.state = TileState.barrier
 
     def set_end_state(self):
         """
         Sets the tile to the end state.
         """
-        self.__state = TileState.end
+        self.state = TileState.end
 
     def make_path(self):
         """
         Sets the color of the tile to the color associated with its layer.
         """
-        print(f"Current Layer index {self.__layer.index}")
-        self.color = layer_color_map[self.__layer.index]
+        self.color = layer_color_map[self.__layer.index % len(layer_color_map)]
 
 
     def reset(self):
         """
         Resets the tile to its idle state.
         """
-        self.__state = TileState.idle
+        self.state = TileState.idle
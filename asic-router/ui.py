@@ -2,47 +2,134 @@ import colors
 import pygame
 from graphics import Graphics
 from initializer import Initializer 
-from config import SCREEN_HEIGHT, SCREEN_WIDTH, WIDTH , ROWS , GRID_COLOR , layer_color_map
+from config import SCREEN_HEIGHT, SCREEN_WIDTH, GRID_COLOR , layer_color_map
+from route_display import RouteDisplay
 
 class UI (): 
 
     update = None 
 
+    # Size of the layer legend and of the status bar, at the bottom of the window
+    SIDE_WIDTH = 85
+    SIDE_HEIGHT = 180
+    BOTTOM_HEIGHT = 20
+    # Size of the color samples of the legend, the tile width of the default 30 row grid
+    SWATCH_WIDTH = 20
+
     def __init__(self, ):
         self.__current_layer = 0
         self.__current_status = "" 
+        self.__revision = 0
+        self.__lines = None
+        self.__lines_key = None
+        self.__panels = None
+        self.__panels_key = None
         UI.update = self 
     
+    @property
+    def revision(self) -> int:
+        """
+        Returns a counter increased whenever the shown layer or status changes.
+        """
+        return self.__revision
+
     def update_current_layer(self, layer): 
         self.__current_layer = layer 
-
-
-    def draw_grid(self, **kwarg):
-
-        gap = SCREEN_WIDTH // ROWS
-
-        color = kwarg.get("color", GRID_COLOR)
-        win  = Initializer.win 
-        for i in range(ROWS):
+        self.__revision += 1
+
+
+    def draw_grid(self, viewport, **kwarg):
+        """
+        Draws the grid lines of the tiles in view.
+
+        Args:
+            viewport (Viewport): The view of the grid.
+        """
+        Initializer.win.blit(self.__grid_lines(viewport, kwarg.get("color", GRID_COLOR)), (0, 0))
+
+    def draw_grid_cell(self, viewport, row, col, **kwarg):
+        """
+        Draws the grid lines on the left and top edges of one tile, as draw_grid does.
+
+        Args:
+            viewport (Viewport): The view of the grid.
+            row (int): The row index of the tile.
+            col (int): The column index of the tile.
+        """
+        rect = viewport.rect(row, col)
+        Initializer.win.blit(self.__grid_lines(viewport, kwarg.get("color", GRID_COLOR)), rect, rect)
+
+    def __grid_lines(self, viewport, color) -> pygame.Surface:
+        """
+        Returns the grid lines of the tiles in view, drawing them again only when the view, the color or the window size changed.
+
+        Args:
+            viewport (Viewport): The view of the grid.
+            color (tuple[int, int, int]): The color of the lines.
+
+        Returns:
+            pygame.Surface: A window sized surface with the lines, transparent elsewhere.
+        """
+        win = Initializer.win
+        key = (viewport.revision, tuple(color), win.get_size())
+        if self.__lines_key == key:
+            return self.__lines
+
+        # Color keyed rather than per pixel alpha: the line color may carry an alpha of 0
+        blank = colors.WHITE if tuple(color[:3]) == (0, 0, 0) else (0, 0, 0)
+        lines = pygame.Surface(win.get_size())
+        lines.fill(blank)
+        lines.set_colorkey(blank)
+
+        gap = int(viewport.cell)
+        min_row, max_row, min_col, max_col = viewport.window()
+        top, bottom = min_col * gap + viewport.y, max_col * gap + viewport.y
+        left, right = min_row * gap + viewport.x, max_row * gap + viewport.x
+        for i in range(min_row, max_row):
             pygame.draw.line(
-                win,
+                lines,
                 color,
-                (i * gap, 0),
-                (i * gap, SCREEN_WIDTH),
+                (i * gap + viewport.x, top),
+                (i * gap + viewport.x, bottom),
             )
 
-        for i in range(ROWS):
-            pygame.draw.line(win, color, (0, i * gap), (SCREEN_WIDTH, i * gap))
+        for i in range(min_col, max_col):
+            pygame.draw.line(lines, color, (left, i * gap + viewport.y), (right, i * gap + viewport.y))
+
+        self.__lines = lines
+        self.__lines_key = key
+        return lines
+
+    def panels(self) -> list:
+        """
+        Returns the screen areas the user interface is drawn in.
+
+        Returns:
+            list[pygame.Rect]: The layer legend and the status bar.
+        """
+        return [
+            pygame.Rect(0, SCREEN_HEIGHT - UI.SIDE_HEIGHT, UI.SIDE_WIDTH, UI.SIDE_HEIGHT),
+            pygame.Rect(0, SCREEN_HEIGHT - UI.BOTTOM_HEIGHT, SCREEN_WIDTH, UI.BOTTOM_HEIGHT),
+        ]
 
     def draw_ui(self): 
-        self._draw_side_layers_info()
-        self._draw_bottom_info()
-        self._draw_status()
-
-    def _draw_bottom_info(self): 
-        font = pygame.font.SysFont("Arial", 13)
-        win = Initializer.win 
-        height = 20
+        """
+        Draws the layer legend and the status bar, from surfaces drawn again only when the layer,
+        the status or the window size changed.
+        """
+        key = (self.__current_layer, self.__current_status, Initializer.win.get_size())
+        if self.__panels_key != key:
+            self.__panels = pygame.Surface(Initializer.win.get_size())
+            self._draw_side_layers_info(self.__panels)
+            self._draw_bottom_info(self.__panels)
+            self._draw_status(self.__panels)
+            self.__panels_key = key
+
+        for panel in self.panels():
+            Initializer.win.blit(self.__panels, panel, panel)
+
+    def _draw_bottom_info(self, win): 
+        height = UI.BOTTOM_HEIGHT
         width  = SCREEN_WIDTH
         x_s, y_s = 0, SCREEN_HEIGHT - height
 
@@ -52,18 +139,17 @@ class UI ():
 
     def set_status(self , status): 
         self.__current_status = status 
+        self.__revision += 1
 
 
-    def _draw_status(self):
-        h = SCREEN_HEIGHT
-        Graphics.draw_text(f"Status : {self.__current_status}" , 20 , SCREEN_HEIGHT - 10  , 15) 
+    def _draw_status(self, win):
+        Graphics.draw_text(f"Status : {self.__current_status}" , 20 , SCREEN_HEIGHT - 10  , 15, surface=win) 
         
 
-    def _draw_side_layers_info(self):
-        font = pygame.font.SysFont("Arial", 13)
-        win = Initializer.win 
-        height = 180
-        width = 85
+    def _draw_side_layers_info(self, win):
+        font = Graphics.font(13)
+        height = UI.SIDE_HEIGHT
+        width = UI.SIDE_WIDTH
         x_s, y_s = 0, SCREEN_HEIGHT - height
 
         pygame.draw.rect(win, colors.BEIGE_FILL_LAYER, [x_s, y_s, width, height])
@@ -72,7 +158,7 @@ class UI ():
             text = font.render(f"METAL {i + 1}", False, colors.BLACK_CONTACT)
             w, h = text.get_size()
             win.blit(text, (x_s, y_s + 10 + i * h))
-            small_r_w = SCREEN_WIDTH // ROWS
+            small_r_w = UI.SWATCH_WIDTH
             pygame.draw.rect(
                 win,
                 layer_color_map[i],
@@ -84,30 +170,65 @@ class UI ():
 
         y_cursor = y_s + 15 + len(layer_color_map) * h
         win.blit(text, (x_s, y_cursor - 5))
-        small_r_w = SCREEN_WIDTH // ROWS
+        small_r_w = UI.SWATCH_WIDTH
         pygame.draw.rect(
             win, colors.SILVER_VIA, [x_s + max(w, 50), y_cursor, small_r_w, small_r_w]
         )
 
         y_cursor += h
-        font = pygame.font.SysFont("Arial", 10)
+        font = Graphics.font(10)
         text = font.render("CONTACT", False, colors.BLACK_CONTACT)
         w, h = text.get_size()
 
         y_cursor = y_s + 45 + len(layer_color_map) * h
         win.blit(text, (x_s, y_cursor ))
-        small_r_w = SCREEN_WIDTH // ROWS
+        small_r_w = UI.SWATCH_WIDTH
         pygame.draw.rect(
             win, colors.BLACK_CONTACT, [x_s + max(w, 50), y_cursor, small_r_w, small_r_w]
         )
 
         y_cursor += h
 
-        font = pygame.font.SysFont("Arial", 13)
+        font = Graphics.font(13)
 
         text = font.render(
             f"Current Layer : {self.__current_layer +1}", False, colors.BLACK_CONTACT
         )
         w, h = text.get_size()
 
-        win.blit(text, (x_s, y_cursor + 5))        
\ No newline at end of file
+        win.blit(text, (x_s, y_cursor + 5))        
+
+
+class UIDisplay(RouteDisplay):
+    """
+    Shows the routing progress in the simulator window.
+    """
+
+    def __init__(self, renderer=None) -> None:
+        """
+        Initializes the display.
+
+        Args:
+            renderer (RenderScheduler, optional): The scheduler of the window redraws. Defaults to None,
+                which redraws through Graphics.update.
+        """
+        self.__renderer = renderer
+
+    def status(self, text):
+        UI.update.set_status(text)
+
+    def connection(self, grid, path, cost):
+        viewport = self.__renderer.viewport if self.__renderer is not None else None
+        Graphics.line(grid.tile_at(path[0], viewport), grid.tile_at(path[-1], viewport), 75, abs(cost - 30) / 20 * 255)
+        # The line is drawn straight into the window, only a full redraw removes it
+        if self.__renderer is not None:
+            self.__renderer.invalidate()
+
+    def path(self, grid, nodes):
+        Graphics.visualize_path([grid.tile_at(node) for node in nodes])
+
+    def refresh(self):
+        if self.__renderer is not None:
+            self.__renderer.refresh()
+        else:
+            Graphics.update()
@@ -0,0 +1,168 @@
+import math
+
+import numpy as np
+
+import config
+
+
+class Viewport:
+    """
+    The part of the grid shown in the window, with zoom and pan.
+
+    A tile at (row, col) is drawn at x = row * cell + x, y = col * cell + y,
+    where cell is the size of a tile in pixels and (x, y) the screen position
+    of the grid origin. Zoomed in the cell size is a whole number of pixels,
+    so tiles line up; zoomed out it can drop below one pixel, and the view is
+    only detailed while it is at least config.VIEW_DETAIL_CELL.
+
+    Attributes:
+        cell (float): The size of a tile in pixels.
+        x (int): The horizontal screen position of the grid origin.
+        y (int): The vertical screen position of the grid origin.
+    """
+
+    def __init__(self, rows: int, cols: int, width: int, height: int) -> None:
+        """
+        Initializes a viewport showing the whole grid.
+
+        Args:
+            rows (int): The number of rows of the grid, along the screen x axis.
+            cols (int): The number of columns of the grid, along the screen y axis.
+            width (int): The width of the view in pixels.
+            height (int): The height of the view in pixels.
+        """
+        self.__rows = rows
+        self.__cols = cols
+        self.__width = width
+        self.__height = height
+        self.__revision = 0
+        self.cell = 1.0
+        self.x = 0
+        self.y = 0
+        self.fit()
+
+    @property
+    def revision(self) -> int:
+        """
+        Returns a counter increased whenever the view moves or zooms.
+        """
+        return self.__revision
+
+    @property
+    def detailed(self) -> bool:
+        """
+        Returns whether tiles are large enough to be drawn one by one.
+        """
+        return self.cell >= config.VIEW_DETAIL_CELL
+
+    def fit(self):
+        """
+        Shows the whole grid, from the top left corner of the view.
+        """
+        cell = min(self.__width / self.__rows, self.__height / self.__cols)
+        self.cell = float(math.floor(cell)) if cell >= 1 else cell
+        self.x = 0
+        self.y = 0
+        self.__revision += 1
+
+    def zoom(self, factor: float, pos: tuple[int, int] = None):
+        """
+        Scales the view, keeping the grid point under a screen position in place.
+
+        Args:
+            factor (float): The scale factor, above 1 to zoom in.
+            pos (tuple[int, int], optional): The screen position kept in place. Defaults to the center of the view.
+        """
+        px, py = pos if pos is not None else (self.__width // 2, self.__height // 2)
+        cell = self.cell * factor
+        if cell >= 1:
+            # Whole pixel sizes, moving at least one pixel in the asked direction
+            cell = math.floor(cell) if factor > 1 else math.ceil(cell)
+            if cell == self.cell:
+                cell += 1 if factor > 1 else -1
+        smallest = min(self.__width / self.__rows, self.__height / self.__cols) / 2
+        cell = min(max(cell, smallest), config.VIEW_MAX_CELL)
+        cell = float(math.floor(cell)) if cell >= 1 else cell
+        if cell == self.cell:
+            return
+        row, col = (px - self.x) / self.cell, (py - self.y) / self.cell
+        self.cell = cell
+        self.x = round(px - row * cell)
+        self.y = round(py - col * cell)
+        self.__revision += 1
+
+    def pan(self, dx: int, dy: int):
+        """
+        Moves the view by a number of pixels.
+
+        Args:
+            dx (int): The horizontal move of the grid on screen.
+            dy (int): The vertical move of the grid on screen.
+        """
+        if dx or dy:
+            self.x += dx
+            self.y += dy
+            self.__revision += 1
+
+    def window(self) -> tuple[int, int, int, int]:
+        """
+        Returns the tiles in view.
+
+        Returns:
+            tuple[int, int, int, int]: The (min_row, max_row, min_col, max_col) bounds, the maxima excluded.
+                The range is empty when the grid is out of view.
+        """
+        cell = self.cell
+        min_row = min(max(0, math.floor(-self.x / cell)), self.__rows)
+        max_row = min(max(0, math.ceil((self.__width - self.x) / cell)), self.__rows)
+        min_col = min(max(0, math.floor(-self.y / cell)), self.__cols)
+        max_col = min(max(0, math.ceil((self.__height - self.y) / cell)), self.__cols)
+        return min_row, max(min_row, max_row), min_col, max(min_col, max_col)
+
+    def nodes(self, model, layers) -> np.ndarray:
+        """
+        Returns the node ids of the tiles in view.
+
+        Args:
+            model (GridModel): The grid model.
+            layers (Iterable[int]): The layers to list.
+
+        Returns:
+            np.ndarray: The node ids, layer by layer.
+        """
+        min_row, max_row, min_col, max_col = self.window()
+        rows = np.arange(min_row, max_row, dtype=np.int64)
+        cols = np.arange(min_col, max_col, dtype=np.int64)
+        cells = (rows[:, None] * model.cols + cols).reshape(-1)
+        layers = np.fromiter(layers, dtype=np.int64)
+        return (layers[:, None] * model.layer_size + cells).reshape(-1)
+
+    def rect(self, row: int, col: int) -> tuple[int, int, int, int]:
+        """
+        Returns the screen area of a tile.
+
+        Args:
+            row (int): The row index of the tile.
+            col (int): The column index of the tile.
+
+        Returns:
+            tuple[int, int, int, int]: The (x, y, width, height) of the tile on screen.
+        """
+        cell = int(self.cell)
+        return row * cell + self.x, col * cell + self.y, cell, cell
+
+    def tile_at(self, pos: tuple[int, int]):
+        """
+        Finds the tile under a screen position.
+
+        Args:
+            pos (tuple[int, int]): The screen position (x, y).
+
+        Returns:
+            tuple[int, int] | None: The (row, col) of the tile, None outside the grid.
+        """
+        row = math.floor((pos[0] - self.x) / self.cell)
+        col = math.floor((pos[1] - self.y) / self.cell)
+        if 0 <= row < self.__rows and 0 <= col < self.__cols:
+            return row, col
+        return None